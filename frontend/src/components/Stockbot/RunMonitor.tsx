@@ -114,7 +114,7 @@ export default function RunMonitor({ runId }: { runId: string }) {
     es.onmessage = (ev) => {
       try {
         const j = JSON.parse((ev as MessageEvent).data as any);
-        if (j && (j.t || j.pnl || j.symbols)) {
+        if (j && (j.t_ms || j.t || j.pnl || j.symbols)) {
           lastRef.current = j;
           barsBufRef.current.push(j);
         }
@@ -281,6 +281,8 @@ export default function RunMonitor({ runId }: { runId: string }) {
     const parsed = Date.parse(t);
     return Number.isNaN(parsed) ? Number(t) || 0 : parsed;
   };
+  // Bars carry epoch-ms `t_ms`; runs written before that only have ISO `t`
+  const barTime = (b: any): number => parseTime(b?.t_ms ?? b?.t);
 
   const cleanMonotonic = <T extends { t: number }>(arr: T[]): T[] => {
     // sort ascending by t and drop non-finite/duplicates/backwards
@@ -300,7 +302,7 @@ export default function RunMonitor({ runId }: { runId: string }) {
 
   const pnlSeries = useMemo(() => {
     const raw = bars.map((b) => ({
-      t: parseTime(b?.t),
+      t: barTime(b),
       cum: Number(b?.pnl?.cum_pct ?? 0),
       dd: Number(b?.pnl?.dd_pct ?? 0),
     }));
@@ -315,7 +317,7 @@ export default function RunMonitor({ runId }: { runId: string }) {
 
   const expoSeries = useMemo(() => {
     const raw = bars.map((b) => ({
-      t: parseTime(b?.t),
+      t: barTime(b),
       gross: Number(b?.leverage?.gross ?? b?.gross_leverage ?? b?.info?.gross_leverage ?? 0),
     }));
     for (const p of raw) if (!Number.isFinite(p.gross)) p.gross = 0;
@@ -324,7 +326,7 @@ export default function RunMonitor({ runId }: { runId: string }) {
 
   const slipTurnSeries = useMemo(() => {
     const raw = bars.map((b) => ({
-      t: parseTime(b?.t),
+      t: barTime(b),
       slip: Number(b?.slippage_bps?.arrival ?? 0),
       to: Number(b?.turnover?.bar_pct ?? 0),
     }));
@@ -486,7 +488,7 @@ export default function RunMonitor({ runId }: { runId: string }) {
             const start = Math.max(0, bars.length - 50);
             return bars.slice(start).map((b, i) => (
               <option key={i} value={start + i}>
-                {new Date(parseTime(b?.t)).toLocaleTimeString([], { hour12: false, hour: '2-digit', minute: '2-digit', second: '2-digit' })}
+                {new Date(barTime(b)).toLocaleTimeString([], { hour12: false, hour: '2-digit', minute: '2-digit', second: '2-digit' })}
               </option>
             ));
           })()}
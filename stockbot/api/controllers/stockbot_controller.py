@@ -320,7 +320,8 @@ def _load_yaml(path: str | Path) -> Dict[str, Any]:
     if not p.exists():
         raise HTTPException(status_code=400, detail=f"config_path not found: {p}")
     try:
-        return yaml.safe_load(p.read_text()) or {}
+        from stockbot.env.config import load_yaml
+        return load_yaml(p) or {}
     except Exception as e:
         raise HTTPException(status_code=400, detail=f"Failed to parse YAML: {e}")
 
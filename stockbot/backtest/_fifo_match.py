@@ -0,0 +1,114 @@
+"""
+FIFO lot-matching kernel behind ``trades.build_trades_fifo``.
+
+Kept free of numpy/pandas and typed with plain ints/floats/lists so it can be
+compiled ahead of time without changes. Building it in place, e.g.::
+
+    cythonize -i stockbot/backtest/_fifo_match.py
+
+drops a ``_fifo_match.*.so`` next to this file; the import system loads an
+extension module in preference to the ``.py`` of the same name, so the compiled
+matcher is used automatically and pure-Python installs need nothing.
+"""
+from __future__ import annotations
+import math
+from collections import deque
+from typing import Dict, List
+
+# Columns filled by match_fifo (holding_days is left to the caller)
+_OUT_COLUMNS = (
+    "symbol", "side", "qty", "entry_ts", "exit_ts", "entry_price", "exit_price",
+    "gross_pnl", "commission_entry", "commission_exit", "net_pnl", "holding_days",
+)
+
+
+def _sign(x: float) -> int:
+    return 1 if x > 0 else (-1 if x < 0 else 0)
+
+def _same_side(a: float, b: float) -> bool:
+    return _sign(a) == _sign(b)
+
+
+def match_fifo(codes: List[int], qtys: List[float], pxs: List[float], coms: List[float], tss: List[int]) -> Dict[str, list]:
+    """FIFO-match sorted fills into round trips; returns output columns as lists.
+
+    ``tss`` are int64 epoch-ns; entry/exit timestamps come back as ints and
+    ``holding_days`` is left empty for the caller to fill vectorized.
+
+    Each symbol's open lots live in parallel deques (qty / price / commission / ts),
+    so closing the oldest lot is a ``popleft`` rather than a list shift.
+
+    Only the zero/sign of a book's net quantity decides open-vs-close, and with
+    finite quantities that is the newest lot's: non-zero lots in a book always
+    share one sign (opposite fills close before anything is added), zero-qty
+    lots are only ever added to an all-zero book, and a lot that drains to zero
+    is popped. So the check is O(1) instead of summing every open lot. Any
+    non-finite quantity (NaN/inf lots break that invariant) falls back to the sum.
+    """
+    exact = not all(map(math.isfinite, qtys))
+    out: Dict[str, list] = {k: [] for k in _OUT_COLUMNS}
+    o_sym, o_side, o_qty = out["symbol"], out["side"], out["qty"]
+    o_ets, o_xts, o_epx, o_xpx = out["entry_ts"], out["exit_ts"], out["entry_price"], out["exit_price"]
+    o_gross, o_ce, o_cx, o_net = out["gross_pnl"], out["commission_entry"], out["commission_exit"], out["net_pnl"]
+    books: Dict[int, tuple] = {}
+
+    for code, qty, px, com, ts in zip(codes, qtys, pxs, coms, tss):
+        book = books.get(code)
+        if book is None:
+            book = books[code] = (deque(), deque(), deque(), deque())
+        lq, lp, lc, lt = book
+        if exact:
+            inv_qty = sum(lq)
+        else:
+            inv_qty = lq[-1] if lq else 0.0  # same zero/sign as sum(lq)
+
+        # Same side or no inventory -> open/extend
+        if inv_qty == 0 or _same_side(inv_qty, qty):
+            lq.append(qty); lp.append(px); lc.append(com); lt.append(ts)
+            continue
+
+        # Opposite side -> close against FIFO lots
+        remaining = qty
+        while abs(remaining) > 1e-12 and lq:
+            lot_qty, lot_px, lot_ts = lq[0], lp[0], lt[0]
+            match_qty = min(abs(lot_qty), abs(remaining))
+            # direction: if lot>0 (long) we close with a sell (remaining<0), else short closed by buy
+            if lot_qty > 0:
+                gross = (px - lot_px) * match_qty
+                o_side.append("long")
+            else:
+                gross = (lot_px - px) * match_qty
+                o_side.append("short")
+
+            # allocate entry commission proportionally; exit commission all to this match
+            com_entry = lc[0] * (match_qty / max(abs(lot_qty), 1e-12))
+            o_sym.append(code)
+            o_qty.append(match_qty)
+            o_ets.append(lot_ts)
+            o_xts.append(ts)
+            o_epx.append(lot_px)
+            o_xpx.append(px)
+            o_gross.append(gross)
+            o_ce.append(com_entry)
+            o_cx.append(com)  # per-fill exit commission
+            o_net.append(gross - (com_entry + com))
+
+            # consume matched qty from lot and remaining (keep signs straight)
+            if lot_qty > 0:
+                lot_qty -= match_qty
+                remaining += match_qty  # remaining is negative here
+            else:
+                lot_qty += match_qty
+                remaining -= match_qty  # remaining is positive here
+
+            if abs(lot_qty) < 1e-12:
+                lq.popleft(); lp.popleft(); lc.popleft(); lt.popleft()
+            else:
+                lq[0] = lot_qty
+
+        # Leftover becomes new inventory on the side of the remaining
+        if abs(remaining) > 1e-12:
+            # remaining keeps the sign of the action (buy +, sell −)
+            lq.append(remaining); lp.append(px); lc.append(com); lt.append(ts)
+
+    return out
@@ -5,15 +5,23 @@ Examples (single-line, Windows-friendly):
 
   # RL policy zip (SB3)
   python -m stockbot.backtest.run --config stockbot/env/env.example.yaml --policy stockbot/runs/ppo_cnn_norm/ppo_policy.zip --start 2022-01-01 --end 2022-12-31 --out ppo_cnn_norm_eval
+  # (set STOCKBOT_POLICY_ONNX=1 to run its deterministic inference through ONNX Runtime)
 
   # Baseline (built-ins: flat | equal | first_long | random | buy_hold)
   python -m stockbot.backtest.run --config stockbot/env/env.example.yaml --policy equal --start 2022-01-01 --end 2022-12-31 --out equal_eval
+
+  # Several policies in parallel (one report each under stockbot/runs/<out>/<policy>/report)
+  python -m stockbot.backtest.run --config stockbot/env/env.example.yaml --policy equal flat stockbot/runs/ppo_cnn_norm/ppo_policy.zip --start 2022-01-01 --end 2022-12-31 --out compare_eval
 """
 from __future__ import annotations
 import argparse
+import hashlib
 import json
+import os
+from concurrent.futures import ProcessPoolExecutor, as_completed
 from dataclasses import replace
 from datetime import datetime
+from operator import itemgetter
 from pathlib import Path
 from typing import Dict, List, Tuple, Optional
 
@@ -26,10 +34,25 @@ from stable_baselines3.common.save_util import load_from_zip_file
 from stockbot.rl.utils import make_env, Split, make_strategy, episode_rollout  # strategy-aware
 from stockbot.backtest.metrics import compute_all, save_metrics
 from stockbot.backtest.trades import build_trades_fifo
+from stockbot.telemetry.rolling import RollingReturnStats
 from stockbot.telemetry.writer import TelemetryWriter
 
+try:  # optional: columnar companions for the CSV reports
+    import pyarrow as pa  # type: ignore
+    import pyarrow.parquet as pq  # type: ignore
+except Exception:  # pragma: no cover - pyarrow is not a hard dependency
+    pa = pq = None
+
 BASE_RUNS = Path(__file__).resolve().parents[1] / "runs"  # stockbot/runs
 
+# Per-bar ledger columns, in equity.csv order (after "ts"); all but cash come from step info
+_LEDGER_COLS = (
+    "equity", "cash", "drawdown", "gross_leverage", "net_leverage", "turnover",
+    "r_base", "pen_turnover", "pen_drawdown", "pen_vol", "pen_leverage",
+)
+# One packed record per bar; fields follow _LEDGER_COLS so a row is a single tuple store
+_LEDGER_DTYPE = np.dtype([(k, np.float64) for k in _LEDGER_COLS])
+
 
 def _policy_kind(s: str) -> str:
     s = str(s).lower()
@@ -54,6 +77,571 @@ def _as_strategy(policy_arg: str, env):
     return make_strategy(policy_arg, env)
 
 
+def _episode_capacity(u) -> int:
+    """Upper bound on bars in one episode: the length of the env's data source."""
+    src = getattr(u, "src", None)
+    for attr in ("index", "df"):
+        data = getattr(src, attr, None)
+        if data is not None:
+            return max(len(data), 1)
+    return 1024
+
+
+class _BarLedger:
+    """
+    Structure-of-arrays store for per-bar snapshots, preallocated once per episode.
+    Each bar writes into row ``n`` of fixed-dtype arrays instead of appending Python
+    objects to lists; frames are built once at the end of the run.
+    Timestamps are kept as int64 epoch values and viewed as ``ts_dtype`` (the env
+    index's dtype, tz included) only when the frame is built.
+    """
+
+    def __init__(self, capacity: int, n_assets: int, ts_dtype=np.dtype("M8[ns]")) -> None:
+        self.n = 0
+        self.ts = np.zeros(capacity, dtype=np.int64)
+        self.ts_dtype = ts_dtype
+        self.rows = np.full(capacity, np.nan, dtype=_LEDGER_DTYPE)
+        self.weights: Optional[np.ndarray] = None  # (capacity, width), sized on first weights vector
+        self.prices = np.full((capacity, n_assets), np.nan)
+        self.pos_qty = np.zeros((capacity, n_assets))
+        self.pos_mv = np.zeros((capacity, n_assets))
+        # bar-over-bar and cumulative simple returns of equity (telemetry PnL)
+        self.bar_ret = np.zeros(capacity)
+        self.cum_ret = np.zeros(capacity)
+        self._bind()
+
+    def _bind(self) -> None:
+        self._eq = self.rows["equity"]
+
+    @property
+    def capacity(self) -> int:
+        return len(self.ts)
+
+    def _grow(self) -> None:
+        # Only reached for envs that do not expose their data length up front.
+        cap = self.capacity * 2
+
+        def _resized(a: np.ndarray, fill) -> np.ndarray:
+            out = np.full((cap,) + a.shape[1:], fill, dtype=a.dtype)
+            out[: len(a)] = a
+            return out
+
+        self.ts = _resized(self.ts, 0)
+        self.rows = _resized(self.rows, np.nan)
+        if self.weights is not None:
+            self.weights = _resized(self.weights, np.nan)
+        self.prices = _resized(self.prices, np.nan)
+        self.pos_qty = _resized(self.pos_qty, 0.0)
+        self.pos_mv = _resized(self.pos_mv, 0.0)
+        self.bar_ret = _resized(self.bar_ret, 0.0)
+        self.cum_ret = _resized(self.cum_ret, 0.0)
+        self._bind()
+
+    def record(self, ts_i8: int, info: dict, cash: float) -> int:
+        """Store one bar's ledger snapshot (``ts_i8``: int64 epoch value); returns its row index."""
+        i = self.n
+        if i >= self.capacity:
+            self._grow()
+        self.ts[i] = ts_i8
+        get = info.get
+        self.rows[i] = (  # same field order as _LEDGER_COLS
+            get("equity", np.nan), cash, get("drawdown", np.nan), get("gross_leverage", np.nan),
+            get("net_leverage", np.nan), get("turnover", np.nan), get("r_base", np.nan),
+            get("pen_turnover", np.nan), get("pen_drawdown", np.nan), get("pen_vol", np.nan),
+            get("pen_leverage", np.nan),
+        )
+        eq = float(self._eq[i])
+        if i:
+            eq_prev = float(self._eq[i - 1])
+            r = (eq - eq_prev) / max(eq_prev, 1e-9)
+            self.bar_ret[i] = r
+            self.cum_ret[i] = self.cum_ret[i - 1] + r
+        if "weights" in info:
+            w = np.asarray(info["weights"], dtype=np.float64).reshape(-1)
+            if self.weights is None and w.size:
+                self.weights = np.full((self.capacity, w.size), np.nan)
+            if self.weights is not None:
+                m = min(w.size, self.weights.shape[1])
+                self.weights[i, :m] = w[:m]
+        self.n = i + 1
+        return i
+
+    def equity_frame(self, symbols: Optional[List[str]]) -> pd.DataFrame:
+        n = self.n
+        cols = {"ts": self._ts_column(n)}
+        rows = self.rows[:n]
+        cols.update({k: rows[k] for k in _LEDGER_COLS})
+        # Weight columns are views into the (T, N) matrix; no concat(axis=1) copy.
+        if self.weights is not None:
+            width = self.weights.shape[1]
+            if symbols is not None and width == len(symbols):
+                names = list(symbols)
+            else:
+                names = [f"w{j}" for j in range(width)]
+            cols.update({name: self.weights[:n, j] for j, name in enumerate(names)})
+        return pd.DataFrame(cols, copy=False)
+
+    def _ts_column(self, n: int):
+        ts, dt = self.ts[:n], self.ts_dtype
+        if isinstance(dt, pd.DatetimeTZDtype):
+            # tz-aware index values are UTC epochs; restore the wall-clock zone
+            return pd.DatetimeIndex(ts.view(f"M8[{dt.unit}]")).tz_localize("UTC").tz_convert(dt.tz)
+        return ts.view(dt)
+
+
+def _manifest_hash(u) -> Optional[str]:
+    """Short dataset fingerprint (symbols|start|end|interval), matching the training telemetry."""
+    cfg = getattr(u, "cfg", None)
+    if cfg is None:
+        return None
+    key = f"{list(getattr(cfg, 'symbols', []))}|{cfg.start}|{cfg.end}|{cfg.interval}"
+    return hashlib.sha1(key.encode()).hexdigest()[:12]
+
+
+def _schema_obs(u) -> Optional[str]:
+    try:
+        obs_space = u.observation_space
+        win_shape = list(obs_space["window"].shape)
+        port_shape = list(obs_space["portfolio"].shape)
+        return f"win{win_shape}-port{port_shape}"
+    except Exception:
+        return None
+
+
+def _vec(info: dict, key: str) -> Optional[List[float]]:
+    v = info.get(key)
+    return None if v is None else np.asarray(v, dtype=np.float64).reshape(-1).tolist()
+
+
+def _last_trade_costs(trades) -> Tuple[Optional[dict], Optional[dict]]:
+    """Cost breakdown and arrival slippage (bps) of the most recent trade, if any."""
+    if not trades:
+        return None, None
+    last_tr = trades[-1]
+    br = {
+        "commission": float(last_tr.get("commission", 0.0)),
+        "spread": float(last_tr.get("spread", 0.0)),
+        "impact": float(last_tr.get("impact", 0.0)),
+    }
+    total = br["commission"] + br["spread"] + br["impact"] + float(last_tr.get("fees", 0.0))
+    costs_bps = {**br, "total": float(total)}
+    slippage_bps = None
+    arr = float(last_tr.get("planned_px", last_tr.get("planned_price", 0.0)))
+    rel = float(last_tr.get("realized_px", last_tr.get("realized_price", 0.0)))
+    if arr and rel:
+        slippage_bps = {"arrival": float((rel - arr) / arr * 10_000.0)}
+    return costs_bps, slippage_bps
+
+
+def _ts_ns(rec: dict) -> int:
+    """Epoch-ns timestamp of a trade/event record, parsed once and cached on the record."""
+    v = rec.get("ts_ns")
+    if v is None:
+        v = rec["ts_ns"] = pd.Timestamp(rec.get("ts")).value
+    return v
+
+
+# Numeric trade fields packed into one float64 block for orders.csv (None/missing -> NaN)
+_ORDER_NUM_KEYS = (
+    "qty", "planned_px", "realized_px", "commission", "fees",
+    "spread", "impact", "cost_bps", "participation",
+)
+# One packed record per trade: epoch-ns plus the numeric fields, in _ORDER_NUM_KEYS order
+_ORDER_REC_DTYPE = np.dtype([("ts_ns", np.int64)] + [(k, np.float64) for k in _ORDER_NUM_KEYS])
+_order_fields = itemgetter("ts_ns", *_ORDER_NUM_KEYS)
+
+
+def _order_records(trades: list) -> np.ndarray:
+    """Trade records as a ``_ORDER_REC_DTYPE`` array, filled in one ``fromiter`` pass.
+
+    The env writes every field as a float plus ``ts_ns``; records that lack a
+    field or hold None take the slower per-key path (None/missing -> NaN).
+    """
+    T = len(trades)
+    try:
+        return np.fromiter(map(_order_fields, trades), dtype=_ORDER_REC_DTYPE, count=T)
+    except (KeyError, TypeError, ValueError):
+        pass
+    rec = np.empty(T, dtype=_ORDER_REC_DTYPE)
+    rec["ts_ns"] = np.fromiter(map(_ts_ns, trades), dtype=np.int64, count=T)
+    rows = [tuple(map(t.get, _ORDER_NUM_KEYS)) for t in trades]
+    # object -> float64 cast is one C pass over the block (None -> NaN)
+    block = np.array(rows, dtype=object).astype(np.float64)
+    for j, k in enumerate(_ORDER_NUM_KEYS):
+        rec[k] = block[:, j]
+    return rec
+
+
+def _orders_frame(trades: list) -> pd.DataFrame:
+    """Orders table packed column-wise from the env's trade records.
+
+    Timestamps and numeric fields land in one structured array (see
+    ``_order_records``); symbol/side are gathered by C-level iteration, so the
+    per-trade work stays out of Python bytecode.
+    """
+    T = len(trades)
+    if T == 0:
+        return pd.DataFrame(columns=["ts", "symbol", "qty", "price", "commission"])
+    num = _order_records(trades)
+    ts_ns = num["ts_ns"]
+    sym = np.array([t.get("symbol") for t in trades], dtype=object)
+    side = np.array([t.get("side") for t in trades], dtype=object)
+    # commission column folds in fees; absent fields count as zero
+    commission = np.nan_to_num(num["commission"]) + np.nan_to_num(num["fees"])
+
+    ts = pd.DatetimeIndex(ts_ns.view("datetime64[ns]"))
+    tz = getattr(trades[0].get("ts"), "tz", None)
+    if tz is not None:
+        ts = ts.tz_localize("UTC").tz_convert(tz)
+    odf = pd.DataFrame({
+        "ts": ts,
+        "symbol": sym,
+        "side": side,
+        "qty": num["qty"],
+        "planned_px": num["planned_px"],
+        "price": num["realized_px"],
+        "commission": commission,
+        "fees": num["fees"],
+        "spread": num["spread"],
+        "impact": num["impact"],
+        "cost_bps": num["cost_bps"],
+        "participation": num["participation"],
+    })
+    # The env appends trades bar by bar, so they are normally already in time order
+    if T > 1 and not bool(np.all(ts_ns[1:] >= ts_ns[:-1])):
+        odf = odf.sort_values("ts", kind="stable")
+    return odf
+
+
+class _EnvRefs:
+    """Env attributes the backtest loop reads every bar, looked up once after reset.
+
+    ``env.unwrapped`` walks the wrapper chain, and the lists below are only ever
+    mutated in place during an episode, so binding them up front is safe.
+    """
+
+    __slots__ = ("u", "syms", "idx", "idx_ns", "port", "trades", "risk_events",
+                 "gamma_seq", "sizing_trace", "prices_fn", "prices_arr_fn", "gross_cap")
+
+    def __init__(self, u) -> None:
+        self.u = u
+        self.syms = getattr(u, "syms", None)
+        src = getattr(u, "src", None)
+        self.idx = getattr(src, "index", None)
+        self.idx_ns = self.idx.asi8 if self.idx is not None else None
+        self.port = getattr(u, "port", None)
+        self.trades = getattr(u, "trades", None)
+        self.risk_events = getattr(u, "risk_events", None)
+        self.gamma_seq = getattr(u, "_gamma_seq", None)
+        self.sizing_trace = getattr(u, "sizing_trace", None)
+        self.prices_fn = getattr(u, "_prices", None)
+        self.prices_arr_fn = getattr(u, "_prices_array", None)
+        cfg = getattr(u, "cfg", None)
+        self.gross_cap = float(getattr(getattr(cfg, "margin", object()), "max_gross_leverage", 1.0)) or 1.0
+
+
+def _snapshot_positions(refs: _EnvRefs, ledger: _BarLedger, bar_idx: int) -> bool:
+    """Fill the ledger's price/position rows for ``bar_idx``; False if the env lacks them."""
+    port = refs.port
+    if port is None:
+        return False
+    i = refs.u._i - 1
+    row_px = ledger.prices[bar_idx]
+    row_q = ledger.pos_qty[bar_idx]
+    if refs.prices_arr_fn is not None and hasattr(port, "qty_array"):
+        row_px[:] = refs.prices_arr_fn(i)
+        row_q[:] = port.qty_array(refs.syms)
+    elif refs.prices_fn is not None:
+        pc = refs.prices_fn(i)
+        positions = port.positions
+        for j, s in enumerate(refs.syms):
+            row_px[j] = pc.get(s, np.nan)
+            pos = positions.get(s)
+            row_q[j] = pos.qty if pos else 0.0
+    else:
+        return False
+    np.multiply(row_q, np.nan_to_num(row_px), out=ledger.pos_mv[bar_idx])
+    return True
+
+
+# Telemetry sections that never change in a backtest. Every bar's payload references
+# these same objects, so they must never be mutated (the writer only reads them).
+_TELEM_CANARY = {
+    "stage": 0,
+    "deployable_capital_pct": 1.0,
+    "gates": {
+        "slippage_ok": True,
+        "hit_rate_ok": True,
+        "vol_ok": True,
+        "heartbeat_ok": True,
+        "drawdown_ok": True,
+        "reject_rate_ok": True,
+    },
+    "action": "hold",
+    "reason": None,
+    "last_promotion_at": None,
+}
+_TELEM_LATENCY = {"data_to_decision": None, "decision_to_send": None, "send_to_fill": None}
+_TELEM_HEALTH = {"heartbeat_ms": 0, "status": "OK"}
+
+
+def _telem_template(meta: dict) -> Dict:
+    """Per-episode bar payload skeleton: every key in wire order, constants filled in.
+
+    ``_build_telem`` copies it (one C-level dict copy) and assigns the per-bar
+    fields, instead of rebuilding the full literal every bar. The constant
+    sections are shared by reference and never mutated.
+    """
+    return {
+        "t_ms": None,
+        "bar_idx": None,
+        "symbols": meta["symbols"],
+        "prices": None,
+        "positions": None,
+        "policy": None,
+        "regime": None,
+        "weights": None,
+        "risk": None,
+        "leverage": None,
+        "canary": _TELEM_CANARY,
+        "orders": None,
+        "costs_bps": None,
+        "slippage_bps": None,
+        "latency_ms": _TELEM_LATENCY,
+        "pnl": None,
+        "rolling": None,
+        "turnover": None,
+        "health": _TELEM_HEALTH,
+        "model": {"git_sha": meta["git_sha"]},
+        "data": {"manifest_hash": meta["manifest_hash"]},
+        "schema": {"obs": meta["schema_obs"]},
+        "errors": (),
+    }
+
+
+def _build_telem(
+    refs: _EnvRefs,
+    info: dict,
+    ledger: _BarLedger,
+    bar_idx: int,
+    bar_ms: int,
+    bar_fills: list,
+    has_positions: bool,
+    bar_ret: float,
+    cum_ret: float,
+    rolling: dict,
+    template: dict,
+) -> Dict:
+    """Assemble the per-bar telemetry payload (only called when the bar will be written)."""
+    weights_raw = _vec(info, "weights_raw")
+    weights_regime = _vec(info, "weights_regime")
+    weights_kelly_vol = _vec(info, "weights_kelly_vol")
+    weights_capped = _vec(info, "weights_capped")
+    if weights_capped is None:
+        weights_capped = _vec(info, "weights")
+
+    applied_layers = list(info.get("risk_applied") or [])
+    gamma_scale = 1.0
+    trace = refs.sizing_trace
+    if trace and isinstance(trace[-1], dict):
+        last_t = trace[-1]
+        gamma_scale = float(last_t.get("gamma", 1.0))
+        if not applied_layers:
+            # best-effort fallback
+            if float(last_t.get("f_kelly", 1.0)) != 1.0 or float(last_t.get("vol_scale", 1.0)) != 1.0:
+                applied_layers.extend(["kelly", "vol_target"])
+    # Env exposes regime beliefs if configured; gamma scalar used is embedded in apply_sizing_layers, but
+    # we can still annotate that regime was present when _gamma_seq exists.
+    gamma_vec = None
+    gamma_state = None
+    gamma_seq = refs.gamma_seq
+    if gamma_seq is not None:
+        applied_layers.append("regime")
+        i = refs.u._i
+        if i < len(gamma_seq):
+            # Kept as an ndarray; the telemetry writer serializes it once at emit time
+            gamma_vec = np.asarray(gamma_seq[i], dtype=np.float64).reshape(-1)
+            gamma_state = int(gamma_vec.argmax()) if gamma_vec.size else None
+
+    costs_bps, slippage_bps = None, None
+    if "bar_costs_bps" not in info or "slippage_bps" not in info:
+        costs_bps, slippage_bps = _last_trade_costs(refs.trades)
+
+    # Copy the episode template (key order + constant sections) and fill per-bar fields
+    telem = template.copy()
+    telem["t_ms"] = bar_ms  # epoch milliseconds (UI falls back to ISO "t" for older runs)
+    telem["bar_idx"] = int(bar_idx)
+    telem["prices"] = {"close": ledger.prices[bar_idx].tolist() if has_positions else []}
+    telem["positions"] = {
+        "qty": ledger.pos_qty[bar_idx].tolist() if has_positions else [],
+        "mkt_value": ledger.pos_mv[bar_idx].tolist() if has_positions else [],
+        "cash": float(getattr(refs.port, "cash", 0.0)),
+        "nav": float(info.get("equity", 0.0)),
+    }
+    telem["policy"] = {
+        # Use pre-overlay weights if available
+        "action_raw": weights_raw if weights_raw is not None else weights_capped,
+        "entropy": None,
+        "value_pred": None,
+    }
+    telem["regime"] = {"gamma": gamma_vec, "state": gamma_state, "scaler": gamma_scale}
+    telem["weights"] = {
+        "raw": weights_raw,
+        "regime": weights_regime,
+        "kelly_vol": weights_kelly_vol,
+        "capped": weights_capped,
+    }
+    telem["risk"] = {"applied": applied_layers, "flags": ()}
+    telem["leverage"] = {"gross": float(info.get("gross_leverage", 0.0)), "net": float(info.get("net_leverage", 0.0))}
+    telem["orders"] = {
+        # For backtest, intended==sent best-effort
+        "intended": list(info.get("orders_intended") or ()) if "orders_intended" in info else (),
+        "sent": list(info.get("orders_sent") or ()) if "orders_sent" in info else (),
+        # Orders and fills from the env's last step plan (trades recorded at this bar)
+        "fills": [
+            {
+                "sym": t.get("symbol"),
+                "qty": float(t.get("qty", 0.0)),
+                "price": float(t.get("realized_px", t.get("realized_price", 0.0))),
+                "liq": "taker",
+                "fee_bps": float(t.get("cost_bps", 0.0)),
+            }
+            for t in bar_fills
+        ] if bar_fills else (),
+        "rejects": (),
+    }
+    # Costs/slippage: env info wins over the last-trade breakdown
+    telem["costs_bps"] = dict(info.get("bar_costs_bps") or {}) if "bar_costs_bps" in info else costs_bps
+    telem["slippage_bps"] = dict(info.get("slippage_bps") or {}) if "slippage_bps" in info else slippage_bps
+    telem["pnl"] = {
+        "bar_bps": float(bar_ret * 10_000.0),
+        "cum_pct": float(cum_ret),
+        "dd_pct": float(-abs(info.get("drawdown", 0.0))),
+    }
+    telem["rolling"] = rolling
+    telem["turnover"] = {"bar_pct": float(info.get("turnover", 0.0) * 100.0)}
+    if "markouts_bps" in info:
+        telem["markouts_bps"] = dict(info.get("markouts_bps") or {})
+    if "participation_pct" in info:
+        telem["participation"] = {"sym_pct": info.get("participation_pct")}
+    return telem
+
+
+class _BarTelemetry:
+    """
+    Per-bar telemetry for one backtest episode.
+
+    Which stages run is fixed for the whole episode (what the writer will record,
+    whether the env exposes an index, trades, risk events), so the stage list is
+    selected once here and the loop just calls ``hooks`` in order. With telemetry
+    off the list is empty and a bar costs only the env step and the ledger store.
+    """
+
+    def __init__(self, tw: TelemetryWriter, refs: _EnvRefs, ledger: _BarLedger, meta: dict, indexed: bool) -> None:
+        self.tw = tw
+        self.refs = refs
+        self.ledger = ledger
+        self.template = _telem_template(meta)
+        self.rolling = RollingReturnStats(window=60)
+        # Trades and risk events only ever get appended within an episode, so each is
+        # consumed with a forward-only cursor instead of rescanning the whole list.
+        self.trade_cursor = 0
+        self.event_cursor = 0
+        self.gross_hist: list[float] = []
+        self.guard_counts = {"daily_dd_halt": 0, "per_name_cap": 0, "gross_leverage_cap": 0}
+        self.nbar = 0
+
+        emit_bars = tw.should_emit("bar")
+        self.emit_events = tw.should_emit("event")
+        emit_rollups = tw.should_emit("rollup")
+        self.hooks: List = []
+        if emit_bars:
+            self.track_fills = bool(indexed and refs.trades is not None)
+            self.hooks.append(self._bar)
+        if self.emit_events:
+            self.hooks.append(self._slippage_event)
+        if (self.emit_events or emit_rollups) and indexed and refs.risk_events is not None:
+            self.hooks.append(self._risk_events)
+        if emit_rollups:
+            self.hooks.append(self._rollup)
+
+    def _bar(self, pos: int, bar_idx: int, bar_ms: int, info: dict) -> None:
+        refs, ledger = self.refs, self.ledger
+        has_positions = _snapshot_positions(refs, ledger, bar_idx)
+        bar_fills = []
+        if self.track_fills:
+            trades = refs.trades
+            bar_ns = refs.idx_ns[pos]
+            c = self.trade_cursor
+            while c < len(trades) and _ts_ns(trades[c]) <= bar_ns:
+                if trades[c]["ts_ns"] == bar_ns:
+                    bar_fills.append(trades[c])
+                c += 1
+            self.trade_cursor = c
+
+        # PnL (accumulated by the ledger)
+        bar_ret = float(ledger.bar_ret[bar_idx])
+        cum_ret = float(ledger.cum_ret[bar_idx])
+        self.rolling.push(bar_ret)
+        rolling = self.rolling.snapshot()
+
+        self.tw.emit_bar_supplier(
+            lambda: _build_telem(
+                refs, info, ledger, bar_idx, bar_ms, bar_fills, has_positions, bar_ret, cum_ret, rolling, self.template
+            )
+        )
+
+    def _slippage_event(self, pos: int, bar_idx: int, bar_ms: int, info: dict) -> None:
+        if "slippage_bps" in info:
+            arr_slip = (info.get("slippage_bps") or {}).get("arrival")
+        else:
+            _costs, slip = _last_trade_costs(self.refs.trades)
+            arr_slip = slip["arrival"] if slip else None
+        if arr_slip is not None and abs(float(arr_slip)) > 20.0:
+            self.tw.emit_event({
+                "event": "ABNORMAL_SLIPPAGE",
+                "details": {"gate": "slippage_ok", "threshold": 20.0, "observed": float(arr_slip)},
+                "at": bar_ms,
+            })
+
+    def _risk_events(self, pos: int, bar_idx: int, bar_ms: int, info: dict) -> None:
+        # Guardrail/risk events flagged this bar: counted for rollups, emitted as events
+        revents = self.refs.risk_events
+        bar_s = int(self.refs.idx_ns[pos] // 1_000_000_000)  # events carry epoch seconds
+        while self.event_cursor < len(revents) and int(revents[self.event_cursor].get("ts", 0)) <= bar_s:
+            ev = revents[self.event_cursor]
+            self.event_cursor += 1
+            if int(ev.get("ts", 0)) != bar_s:
+                continue
+            et = str(ev.get("type", "")).lower()
+            if et in self.guard_counts:
+                self.guard_counts[et] += 1
+            if self.emit_events:
+                self.tw.emit_event({
+                    "event": str(ev.get("type", "RISK_EVENT")).upper(),
+                    "details": ev.get("detail") or {},
+                    "at": bar_s * 1000,
+                })
+
+    def _rollup(self, pos: int, bar_idx: int, bar_ms: int, info: dict) -> None:
+        # Rollups every 20 bars
+        self.gross_hist.append(float(info.get("gross_leverage", 0.0)))
+        self.nbar += 1
+        if self.nbar % 20 == 0:
+            cap = self.refs.gross_cap
+            last60 = self.gross_hist[-60:]
+            util = float(np.mean(last60)) / cap if cap > 0 else float(np.mean(last60))
+            self.tw.emit_rollup({
+                "summary": {"window": 60, "exposure_utilization": util},
+                "capacity": {"usage": util},
+                "guardrail": {"counters": dict(self.guard_counts)},  # serialized later; snapshot now
+                "at": bar_ms,
+            })
+
+    def close(self) -> None:
+        self.tw.close()  # drain queued telemetry before the caller reads the files
+
+
 def _run_backtest(env, strategy) -> Tuple[pd.DataFrame, pd.DataFrame]:
     """
     Run a single deterministic episode with a Strategy.
@@ -63,482 +651,177 @@ def _run_backtest(env, strategy) -> Tuple[pd.DataFrame, pd.DataFrame]:
     obs, info = env.reset(seed=42)
     done = trunc = False
 
-    ts_list: List[datetime] = []
-    eq_list: List[float] = []
-    cash_list: List[float] = []
-    dd_list: List[float] = []
-    gl_list: List[float] = []
-    nl_list: List[float] = []
-    to_list: List[float] = []
-    rbase_list: List[float] = []
-    pto_list: List[float] = []
-    pdd_list: List[float] = []
-    pvol_list: List[float] = []
-    plev_list: List[float] = []
-    weights_list: List[Dict[str, float]] = []
-
     # Inform strategy the episode is starting
     if hasattr(strategy, "reset"):
         strategy.reset()
 
-    symbols = getattr(env.unwrapped, "syms", None)
-
-    # Telemetry state
-    tw = TelemetryWriter()
-    last_cum_ret = 0.0
-    roll_window = 60
-    roll_vals: list[float] = []
-    last_rolling = {
-        "sharpe": None,
-        "sortino": None,
-        "vol_realized": None,
-        "hit_rate": None,
+    u = env.unwrapped
+    refs = _EnvRefs(u)
+    symbols = refs.syms
+    idx, idx_ns, port = refs.idx, refs.idx_ns, refs.port
+    ledger = _BarLedger(
+        _episode_capacity(u),
+        len(symbols) if symbols is not None else 0,
+        idx.dtype if idx is not None else np.dtype("M8[ns]"),
+    )
+    # Static for the env's lifetime: checked once rather than via hasattr every bar
+    indexed = idx is not None and hasattr(u, "_i")
+    # Bar timestamps on the wire are epoch milliseconds, taken straight from the index
+    ts_ms = idx_ns // 1_000_000 if idx_ns is not None else None
+
+    # Telemetry: decide once what will be written; build nothing otherwise
+    meta = {
+        "symbols": list(symbols) if symbols else None,
+        "schema_obs": _schema_obs(u),
+        "git_sha": os.environ.get("STOCKBOT_GIT_SHA"),
+        "manifest_hash": _manifest_hash(u),
     }
+    telem = _BarTelemetry(TelemetryWriter(), refs, ledger, meta, indexed)
+    hooks = telem.hooks
+
+    # Bound methods resolved once; the loop body runs per bar
+    predict, step, record = strategy.predict, env.step, ledger.record
+    has_cash = hasattr(port, "cash")
 
-    gross_hist: list[float] = []
-    guard_counts = {"daily_dd_halt": 0, "per_name_cap": 0, "gross_leverage_cap": 0}
-    nbar = 0
+    pos = -1
     while not (done or trunc):
-        action, _a_info = strategy.predict(obs, deterministic=True)
-        obs, r, done, trunc, info = env.step(action)
-
-        # timestamp for this step
-        ts = (
-            env.unwrapped.src.index[env.unwrapped._i - 1]
-            if hasattr(env.unwrapped, "_i") and hasattr(env.unwrapped, "src")
-            else datetime.utcnow()
-        )
-        ts_list.append(ts)
-
-        # ledger snapshots
-        eq_list.append(float(info.get("equity", np.nan)))
-        cash_list.append(float(getattr(getattr(env.unwrapped, "port", None), "cash", np.nan)))
-        dd_list.append(float(info.get("drawdown", np.nan)))
-        gl_list.append(float(info.get("gross_leverage", np.nan)))
-        nl_list.append(float(info.get("net_leverage", np.nan)))
-        to_list.append(float(info.get("turnover", np.nan)))
-        rbase_list.append(float(info.get("r_base", np.nan)))
-        pto_list.append(float(info.get("pen_turnover", np.nan)))
-        pdd_list.append(float(info.get("pen_drawdown", np.nan)))
-        pvol_list.append(float(info.get("pen_vol", np.nan)))
-        plev_list.append(float(info.get("pen_leverage", np.nan)))
-
-        # weights, if provided in info
-        if "weights" in info:
-            w = info["weights"]
-            if symbols is not None and len(w) == len(symbols):
-                weights_list.append({symbols[i]: float(w[i]) for i in range(len(symbols))})
-            else:
-                weights_list.append({f"w{i}": float(w[i]) for i in range(len(w))})
+        action, _a_info = predict(obs, deterministic=True)
+        obs, r, done, trunc, info = step(action)
+
+        # timestamp for this step (row of the close that was just processed)
+        if indexed:
+            pos = u._i - 1
+            ts_i8 = idx_ns[pos]
+            bar_ms = int(ts_ms[pos])
         else:
-            weights_list.append({})
+            ts_i8 = pd.Timestamp(datetime.utcnow()).value
+            bar_ms = ts_i8 // 1_000_000
 
-        # ---- emit telemetry (best-effort, per-bar) ----
-        try:
-            # decision/valuation timestamps
-            bar_ts = ts  # close time for the step (as chosen above)
-            bar_idx = len(eq_list) - 1
+        # ledger snapshot (one row store per bar)
+        bar_idx = record(ts_i8, info, float(port.cash) if has_cash else np.nan)
 
-            # Build prices in view order
-            prices_close = []
+        for hook in hooks:
             try:
-                pc = env.unwrapped._prices(env.unwrapped._i - 1)
-                prices_close = [float(pc.get(s, float("nan"))) for s in env.unwrapped.syms]
+                hook(pos, bar_idx, bar_ms, info)
             except Exception:
-                pass
+                pass  # never break the backtest on telemetry failures
 
-            # Positions snapshot
-            pos_qty = []
-            pos_mv = []
-            try:
-                prices_map = env.unwrapped._prices(env.unwrapped._i - 1)
-                for s in env.unwrapped.syms:
-                    pos = env.unwrapped.port.positions.get(s)
-                    q = float(pos.qty) if pos else 0.0
-                    mv = q * float(prices_map.get(s, 0.0))
-                    pos_qty.append(q)
-                    pos_mv.append(float(mv))
-            except Exception:
-                pass
-
-            # Access internals from env step for sizing path
-            weights_raw = None
-            weights_regime = None
-            weights_kelly_vol = None
-            weights_capped = None
-            applied_layers: list[str] = []
-            flags: list[str] = []
-            gross = float(info.get("gross_leverage", 0.0))
-            net = float(info.get("net_leverage", 0.0))
-            gamma_vec = None
-            gamma_state = None
-            gamma_scale = 1.0
-            try:
-                # If env provided full decision path, use it
-                if "weights_raw" in info:
-                    weights_raw = list(map(float, list(info.get("weights_raw") or [])))
-                if "weights_regime" in info:
-                    weights_regime = list(map(float, list(info.get("weights_regime") or [])))
-                if "weights_kelly_vol" in info:
-                    weights_kelly_vol = list(map(float, list(info.get("weights_kelly_vol") or [])))
-                if "weights_capped" in info:
-                    weights_capped = list(map(float, list(info.get("weights_capped") or [])))
-                if weights_capped is None and "weights" in info:
-                    weights_capped = list(map(float, list(info.get("weights") or [])))
-                applied_layers = list(info.get("risk_applied") or [])
-                trace = getattr(env.unwrapped, "sizing_trace", None)
-                if trace and len(trace) > 0:
-                    last_t = trace[-1]
-                    gamma_scale = float(last_t.get("gamma", getattr(last_t, "gamma", 1.0))) if isinstance(last_t, dict) else 1.0
-                    f_kelly = float(last_t.get("f_kelly", 1.0))
-                    vol_scale = float(last_t.get("vol_scale", 1.0))
-                    if not applied_layers:
-                        # best-effort fallback
-                        if f_kelly != 1.0 or vol_scale != 1.0:
-                            applied_layers.extend(["kelly", "vol_target"]) 
-                # Env exposes regime beliefs if configured; gamma scalar used is embedded in apply_sizing_layers, but
-                # we can still annotate that regime was present when _gamma_seq exists.
-                if getattr(env.unwrapped, "_gamma_seq", None) is not None:
-                    applied_layers.append("regime")
-                    gamma = env.unwrapped._gamma_seq[env.unwrapped._i]  # type: ignore[index]
-                    try:
-                        import numpy as _np
-                        gamma_vec = [float(x) for x in _np.asarray(gamma).reshape(-1)]
-                        gamma_state = int(max(range(len(gamma_vec)), key=lambda i: gamma_vec[i])) if gamma_vec else None
-                    except Exception:
-                        pass
-                # For raw/regime/kelly_vol approximations, we lack the pre-cap arrays; set to None when unavailable
-            except Exception:
-                pass
+    telem.close()
 
-            # Costs / slippage (best-effort from last trade in env.trades)
-            costs_bps = None
-            slippage_bps = None
-            try:
-                last_tr = env.unwrapped.trades[-1] if getattr(env.unwrapped, "trades", None) else None
-                if last_tr:
-                    br = {
-                        "commission": float(last_tr.get("commission", 0.0)),
-                        "spread": float(last_tr.get("spread", 0.0)),
-                        "impact": float(last_tr.get("impact", 0.0)),
-                    }
-                    total = br["commission"] + br["spread"] + br["impact"] + float(last_tr.get("fees", 0.0))
-                    costs_bps = {**br, "total": float(total)}
-                    arr = float(last_tr.get("planned_px", last_tr.get("planned_price", 0.0)))
-                    rel = float(last_tr.get("realized_px", last_tr.get("realized_price", 0.0)))
-                    if arr and rel:
-                        slippage_bps = {"arrival": float((rel - arr) / arr * 10_000.0)}
-            except Exception:
-                pass
-
-            # PnL
-            eq = float(info.get("equity", 0.0))
-            eq_prev = float(eq_list[-2]) if len(eq_list) >= 2 else eq
-            bar_ret = (eq - eq_prev) / max(eq_prev, 1e-9)
-            last_cum_ret += bar_ret
-            roll_vals.append(bar_ret)
-            if len(roll_vals) > roll_window:
-                roll_vals.pop(0)
-            try:
-                import math
-                import numpy as _np
-                arr = _np.array(roll_vals, dtype=float)
-                vol = float(arr.std() * (252 ** 0.5)) if arr.size > 1 else 0.0
-                mean = float(arr.mean()) if arr.size > 0 else 0.0
-                sharpe = float((mean / (arr.std() + 1e-12)) * (252 ** 0.5)) if arr.size > 1 else 0.0
-                downside = float(arr[arr < 0].std()) if arr.size > 1 and (arr < 0).any() else 0.0
-                sortino = float((mean / (downside + 1e-12)) * (252 ** 0.5)) if downside > 0 else 0.0
-                hit_rate = float((arr > 0).mean()) if arr.size > 0 else 0.0
-                last_rolling = {
-                    "sharpe": sharpe,
-                    "sortino": sortino,
-                    "vol_realized": vol,
-                    "hit_rate": hit_rate,
-                }
-            except Exception:
-                pass
+    eqdf = ledger.equity_frame(symbols)
+    # Rows are recorded bar by bar, so they are already in time order; sorting would
+    # only copy the whole frame.
+    if not eqdf["ts"].is_monotonic_increasing:
+        eqdf = eqdf.sort_values("ts")
 
-            # Schema/metadata
-            try:
-                obs_space = env.unwrapped.observation_space
-                win_shape = list(obs_space["window"].shape)
-                port_shape = list(obs_space["portfolio"].shape)
-                schema_obs = f"win{win_shape}-port{port_shape}"
-            except Exception:
-                schema_obs = None
-            try:
-                import os as _os
-                git_sha = _os.environ.get("STOCKBOT_GIT_SHA")
-            except Exception:
-                git_sha = None
-
-            telem = {
-                "t": (pd.Timestamp(bar_ts).to_pydatetime().isoformat() if bar_ts else None),
-                "bar_idx": int(bar_idx),
-                "symbols": list(env.unwrapped.syms) if getattr(env.unwrapped, "syms", None) else None,
-                "prices": {"close": prices_close},
-                "positions": {
-                    "qty": pos_qty,
-                    "mkt_value": pos_mv,
-                    "cash": float(getattr(env.unwrapped.port, "cash", 0.0)),
-                    "nav": float(eq),
-                },
-                "policy": {
-                    # Use pre-overlay weights if available
-                    "action_raw": weights_raw if weights_raw is not None else weights_capped,
-                    "entropy": None,
-                    "value_pred": None,
-                },
-                "regime": {
-                    "gamma": gamma_vec,
-                    "state": gamma_state,
-                    "scaler": gamma_scale,
-                },
-                "weights": {
-                    "raw": weights_raw,
-                    "regime": weights_regime,
-                    "kelly_vol": weights_kelly_vol,
-                    "capped": weights_capped,
-                },
-                "risk": {
-                    "applied": applied_layers,
-                    "flags": [],
-                },
-                "leverage": {"gross": gross, "net": net},
-                "canary": {
-                    "stage": 0,
-                    "deployable_capital_pct": 1.0,
-                    "gates": {
-                        "slippage_ok": True,
-                        "hit_rate_ok": True,
-                        "vol_ok": True,
-                        "heartbeat_ok": True,
-                        "drawdown_ok": True,
-                        "reject_rate_ok": True,
-                    },
-                    "action": "hold",
-                    "reason": None,
-                    "last_promotion_at": None,
-                },
-                "orders": {
-                    # For backtest, intended==sent best-effort
-                    "intended": [],
-                    "sent": [],
-                    "fills": [],
-                    "rejects": [],
-                },
-                "costs_bps": costs_bps,
-                "slippage_bps": slippage_bps,
-                "latency_ms": {"data_to_decision": None, "decision_to_send": None, "send_to_fill": None},
-                "pnl": {"bar_bps": float(bar_ret * 10_000.0), "cum_pct": float(last_cum_ret), "dd_pct": float(-abs(info.get("drawdown", 0.0)))},
-                "rolling": last_rolling,
-                "turnover": {"bar_pct": float(info.get("turnover", 0.0) * 100.0)},
-                "health": {"heartbeat_ms": 0, "status": "OK"},
-                "model": {"git_sha": git_sha},
-                "data": {"manifest_hash": manifest_hash},
-                "schema": {"obs": schema_obs},
-                "errors": [],
-            }
+    odf = _orders_frame(refs.trades or [])
 
-            # Orders and fills from the env's last step plan (if available)
-            try:
-                # The env recorded trades into env.unwrapped.trades; filter ones matching this ts
-                ts_trade = env.unwrapped.src.index[env.unwrapped._i - 1]
-                recent = [t for t in env.unwrapped.trades if str(t.get("ts")) == str(ts_trade)]
-                fills = []
-                for t in recent:
-                    fills.append({
-                        "sym": t.get("symbol"),
-                        "qty": float(t.get("qty", 0.0)),
-                        "price": float(t.get("realized_px", t.get("realized_price", 0.0))),
-                        "liq": "taker",
-                        "fee_bps": float(t.get("cost_bps", 0.0)),
-                    })
-                telem["orders"]["fills"] = fills  # type: ignore[index]
-                # Intended/Sent & costs/slippage from env info
-                if "orders_intended" in info:
-                    telem["orders"]["intended"] = list(info.get("orders_intended") or [])  # type: ignore[index]
-                if "orders_sent" in info:
-                    telem["orders"]["sent"] = list(info.get("orders_sent") or [])  # type: ignore[index]
-                if "bar_costs_bps" in info:
-                    telem["costs_bps"] = dict(info.get("bar_costs_bps") or {})
-                if "slippage_bps" in info:
-                    telem["slippage_bps"] = dict(info.get("slippage_bps") or {})
-                if "markouts_bps" in info:
-                    telem["markouts_bps"] = dict(info.get("markouts_bps") or {})
-                if "participation_pct" in info:
-                    telem["participation"] = {"sym_pct": info.get("participation_pct")}
-            except Exception:
-                pass
+    return eqdf, odf
 
-            tw.emit_bar(telem)
-            try:
-                arr = telem.get("slippage_bps", {}).get("arrival") if isinstance(telem.get("slippage_bps"), dict) else None
-                if arr is not None and abs(float(arr)) > 20.0:
-                    tw.emit_event({
-                        "event": "ABNORMAL_SLIPPAGE",
-                        "details": {"gate": "slippage_ok", "threshold": 20.0, "observed": float(arr)},
-                        "at": int(pd.Timestamp(bar_ts).timestamp() * 1000) if bar_ts else None,
-                    })
-            except Exception:
-                pass
-            # Rollups every 20 bars
-            try:
-                gross_hist.append(gross)
-                nbar += 1
-                if nbar % 20 == 0:
-                    import numpy as _np
-                    cap = float(getattr(getattr(env.unwrapped.cfg, "margin", object()), "max_gross_leverage", 1.0)) or 1.0
-                    last60 = gross_hist[-60:]
-                    util = float(_np.mean(last60)) / cap if cap > 0 else float(_np.mean(last60))
-                    roll = {
-                        "summary": {"window": 60, "exposure_utilization": util},
-                        "capacity": {"usage": util},
-                        "guardrail": {"counters": guard_counts},
-                        "at": pd.Timestamp(bar_ts).to_pydatetime().isoformat() if bar_ts else None,
-                    }
-                    tw.emit_rollup(roll)
-            except Exception:
-                pass
-            # Emit guardrail/risk events (if any flagged this bar)
-            try:
-                revents = getattr(env.unwrapped, "risk_events", [])
-                if revents:
-                    recent_ts = env.unwrapped.src.index[env.unwrapped._i - 1]
-                    for ev in revents[-5:]:  # only last few
-                        if str(ev.get("ts")) == str(int(pd.Timestamp(recent_ts).timestamp())):
-                            et = str(ev.get("type", "")).lower()
-                            if et in guard_counts:
-                                guard_counts[et] += 1
-                            tw.emit_event({
-                                "event": str(ev.get("type", "RISK_EVENT")).upper(),
-                                "details": ev.get("detail") or {},
-                                "at": int(pd.Timestamp(recent_ts).timestamp() * 1000),
-                            })
-            except Exception:
-                pass
-        except Exception:
-            # never break the backtest on telemetry failures
-            pass
-
-    base = pd.DataFrame({
-        "ts": ts_list,
-        "equity": eq_list,
-        "cash": cash_list,
-        "drawdown": dd_list,
-        "gross_leverage": gl_list,
-        "net_leverage": nl_list,
-        "turnover": to_list,
-        "r_base": rbase_list,
-        "pen_turnover": pto_list,
-        "pen_drawdown": pdd_list,
-        "pen_vol": pvol_list,
-        "pen_leverage": plev_list,
+
+def _write_report_frame(df: pd.DataFrame, out_dir: Path, name: str, fmt: str = "csv") -> None:
+    """Write ``<name>.csv``, or only a zstd ``<name>.parquet`` with ``fmt="parquet"``.
+
+    The CSV stays on the pandas writer: the UI splits it on commas and parses the
+    pandas timestamp text, which pyarrow's CSV writer (quoted, different format)
+    would break. Parquet skips the per-cell CSV formatting, for runs nobody opens
+    in the UI.
+    """
+    if fmt == "parquet":
+        pq.write_table(pa.Table.from_pandas(df, preserve_index=False), out_dir / f"{name}.parquet", compression="zstd")
+        return
+    df.to_csv(out_dir / f"{name}.csv", index=False)
+
+
+def _rolling_metrics(eqdf: pd.DataFrame, win: int = 63, dd_win: int = 252) -> pd.DataFrame:
+    """Rolling sharpe/vol over ``win`` bars and max drawdown over ``dd_win`` bars.
+
+    Works on the raw equity array with sliding-window views, so each statistic
+    is one vectorized reduction and the rolling std is computed only once.
+    Matches pandas ``rolling(win).std()`` (ddof=1, NaN until the window fills).
+    """
+    df = eqdf.sort_values("ts")
+    eq = df["equity"].to_numpy(dtype=np.float64)
+    n = eq.shape[0]
+    rets = np.zeros(n, dtype=np.float64)
+    if n > 1:
+        with np.errstate(divide="ignore", invalid="ignore"):
+            rets[1:] = eq[1:] / eq[:-1] - 1.0
+        rets[~np.isfinite(rets)] = 0.0
+
+    roll_std = np.full(n, np.nan)
+    roll_mean = np.full(n, np.nan)
+    if n >= win:
+        windows = np.lib.stride_tricks.sliding_window_view(rets, win)
+        roll_mean[win - 1:] = windows.mean(axis=1)
+        roll_std[win - 1:] = windows.std(axis=1, ddof=1)
+    ann = np.sqrt(252)
+
+    # Rolling max with min_periods=1: pad the head so early windows are partial
+    padded = np.concatenate([np.full(dd_win - 1, -np.inf), eq])
+    roll_max = np.lib.stride_tricks.sliding_window_view(padded, dd_win).max(axis=1)
+
+    return pd.DataFrame({
+        "ts": df["ts"].to_numpy(),
+        "roll_sharpe_63": (roll_mean / (roll_std + 1e-12)) * ann,
+        "roll_vol_63": roll_std * ann,
+        "roll_maxdd_252": 1.0 - (eq / (roll_max + 1e-9)),
     })
-    if weights_list and any(len(d) for d in weights_list):
-        wdf = pd.DataFrame(weights_list)
-        eqdf = pd.concat([base, wdf], axis=1)
-    else:
-        eqdf = base
-    eqdf = eqdf.sort_values("ts")
-
-    trades = getattr(env.unwrapped, "trades", [])
-    if trades:
-        # include richer cost/impact fields if present
-        orders_rows = []
-        for t in trades:
-            row = {
-                "ts": t.get("ts"),
-                "symbol": t.get("symbol"),
-                "side": t.get("side"),
-                "qty": t.get("qty"),
-                "planned_px": t.get("planned_px"),
-                "price": t.get("realized_px"),
-                "commission": float(t.get("commission", 0.0) + t.get("fees", 0.0)),
-                "fees": t.get("fees"),
-                "spread": t.get("spread"),
-                "impact": t.get("impact"),
-                "cost_bps": t.get("cost_bps"),
-                "participation": t.get("participation"),
-            }
-            orders_rows.append(row)
-        odf = pd.DataFrame(orders_rows).sort_values("ts")
-    else:
-        odf = pd.DataFrame(columns=["ts", "symbol", "qty", "price", "commission"])
 
-    return eqdf, odf
 
+def _obs_layout(policy: str, cfg: EnvConfig) -> Tuple[bool, bool]:
+    """(append_gamma, recompute_gamma) so the eval env's observations match a model ZIP."""
+    if _policy_kind(policy) != "rl":
+        return False, False
+    try:
+        data, _params, _vars = load_from_zip_file(policy)
+        obs_space = data.get("observation_space")
+        if isinstance(obs_space, spaces.Dict) and "window" in obs_space.spaces and "portfolio" in obs_space.spaces:
+            win_shape = obs_space.spaces["window"].shape  # (L, N, F)
+            port_size = int(obs_space.spaces["portfolio"].shape[0])
+            has_gamma_key = "gamma" in obs_space.spaces
+            # Compute baseline portfolio size 7+N from model meta
+            try:
+                N = int(win_shape[1])
+            except Exception:
+                N = len(list(cfg.symbols)) if hasattr(cfg, "symbols") else 1
+            base_port = 7 + N
+            if has_gamma_key:
+                return False, True
+            # If portfolio bigger than baseline, it's appended beliefs
+            append_gamma = port_size > base_port
+            return append_gamma, append_gamma
+    except Exception:
+        # fallback: no layout inference
+        pass
+    return False, False
 
-def main():
-    p = argparse.ArgumentParser()
-    p.add_argument("--config", type=str, default="stockbot/env/env.example.yaml")
-    p.add_argument(
-        "--policy",
-        type=str,
-        required=True,
-        help="Baseline name (flat|equal|first_long|random|buy_hold) or path to PPO .zip",
-    )
-    p.add_argument("--start", type=str, required=True)
-    p.add_argument("--end", type=str, required=True)
-    p.add_argument(
-        "--symbols",
-        type=str,
-        nargs="*",
-        default=None,
-        help="Override symbols from YAML, e.g. --symbols AAPL MSFT",
-    )
-    p.add_argument("--out", type=str, required=True, help="Run tag under stockbot/runs/<out>/report")
-    p.add_argument("--normalize", action="store_true", help="Use ObsNorm (frozen in eval).")
-    args = p.parse_args()
 
-    cfg = EnvConfig.from_yaml(args.config)
-    if args.symbols:
-        cfg = replace(cfg, symbols=args.symbols)
-    cfg = replace(cfg, start=args.start, end=args.end)
+def _policy_tag(policy: str) -> str:
+    """Folder name for one policy's report in a multi-policy run."""
+    return Path(policy).stem if _policy_kind(policy) == "rl" else str(policy).lower()
 
-    split = Split(train=(args.start, args.end), eval=(args.start, args.end))
 
-    # Build eval env with observation layout matching the model ZIP when provided.
-    append_gamma = False
-    recompute_gamma = False
-    if _policy_kind(args.policy) == "rl":
-        try:
-            data, _params, _vars = load_from_zip_file(args.policy)
-            obs_space = data.get("observation_space")
-            if isinstance(obs_space, spaces.Dict) and "window" in obs_space.spaces and "portfolio" in obs_space.spaces:
-                win_shape = obs_space.spaces["window"].shape  # (L, N, F)
-                port_size = int(obs_space.spaces["portfolio"].shape[0])
-                has_gamma_key = "gamma" in obs_space.spaces
-                # Compute baseline portfolio size 7+N from model meta
-                try:
-                    N = int(win_shape[1])
-                except Exception:
-                    N = len(list(cfg.symbols)) if hasattr(cfg, "symbols") else 1
-                base_port = 7 + N
-                if has_gamma_key:
-                    append_gamma = False
-                    recompute_gamma = True
-                else:
-                    # If portfolio bigger than baseline, it's appended beliefs
-                    append_gamma = port_size > base_port
-                    recompute_gamma = append_gamma
-        except Exception:
-            # fallback: no layout inference
-            append_gamma = False
-            recompute_gamma = False
+def _backtest_policy(
+    cfg: EnvConfig, policy: str, normalize: bool, run_dir: Path, config_path: str, fmt: str = "csv"
+) -> Path:
+    """Build the eval env for ``policy``, run one episode and write its report under ``run_dir``."""
+    split = Split(train=(cfg.start, cfg.end), eval=(cfg.start, cfg.end))
 
+    # Build eval env with observation layout matching the model ZIP when provided.
+    append_gamma, recompute_gamma = _obs_layout(policy, cfg)
     env = make_env(
         cfg,
         split,
         mode="eval",
-        normalize=args.normalize,
+        normalize=normalize,
         append_gamma_to_obs=append_gamma,
         recompute_gamma=recompute_gamma,
-        run_dir=BASE_RUNS / args.out,
+        run_dir=run_dir,
     )
 
     # Strategy (baseline or SB3)
-    strategy = _as_strategy(args.policy, env)
+    strategy = _as_strategy(policy, env)
 
     # Run backtest
     eqdf, odf = _run_backtest(env, strategy)
@@ -547,45 +830,29 @@ def main():
     trades_df = build_trades_fifo(odf) if not odf.empty else pd.DataFrame()
 
     # Output folder
-    out_dir = BASE_RUNS / args.out / "report"
+    out_dir = run_dir / "report"
     out_dir.mkdir(parents=True, exist_ok=True)
 
     # Save ledgers
-    eqdf.to_csv(out_dir / "equity.csv", index=False)
-    odf.to_csv(out_dir / "orders.csv", index=False)
-    trades_df.to_csv(out_dir / "trades.csv", index=False)
+    _write_report_frame(eqdf, out_dir, "equity", fmt)
+    _write_report_frame(odf, out_dir, "orders", fmt)
+    _write_report_frame(trades_df, out_dir, "trades", fmt)
 
     # Rolling metrics (63-day sharpe/vol, 252-day max drawdown)
     try:
-        df = eqdf.copy()
-        df = df.sort_values("ts")
-        rets = df["equity"].pct_change().fillna(0.0)
-        win = 63
-        roll_vol = rets.rolling(win).std() * np.sqrt(252)
-        roll_mean = rets.rolling(win).mean()
-        roll_sharpe = (roll_mean / (rets.rolling(win).std() + 1e-12)) * np.sqrt(252)
-        # Rolling max drawdown over ~1y window (252 bars)
-        w2 = 252
-        roll_max = df["equity"].rolling(w2, min_periods=1).max()
-        roll_dd = 1.0 - (df["equity"] / (roll_max + 1e-9))
-        rmdf = pd.DataFrame({
-            "ts": df["ts"],
-            "roll_sharpe_63": roll_sharpe,
-            "roll_vol_63": roll_vol,
-            "roll_maxdd_252": roll_dd,
-        })
-        rmdf.to_csv(out_dir / "rolling_metrics.csv", index=False)
+        rmdf = _rolling_metrics(eqdf)
+        _write_report_frame(rmdf, out_dir, "rolling_metrics", fmt)
     except Exception:
         pass
 
     # Save summary (repro metadata)
     summary = {
-        "policy": args.policy,
+        "policy": policy,
         "symbols": list(cfg.symbols),
-        "start": args.start,
-        "end": args.end,
-        "config_path": str(Path(args.config).resolve()),
-        "normalize": bool(args.normalize),
+        "start": cfg.start,
+        "end": cfg.end,
+        "config_path": str(Path(config_path).resolve()),
+        "normalize": bool(normalize),
     }
     (out_dir / "summary.json").write_text(json.dumps(summary, indent=2))
 
@@ -593,7 +860,7 @@ def main():
     metrics = compute_all(eqdf, odf if not odf.empty else None, trades_df if not trades_df.empty else None)
     save_metrics(out_dir, metrics)
 
-    print(f">> Wrote equity.csv, orders.csv, trades.csv, rolling_metrics.csv, metrics.json to {out_dir}")
+    print(f">> Wrote equity.{fmt}, orders.{fmt}, trades.{fmt}, rolling_metrics.{fmt}, metrics.json to {out_dir}")
 
     # Save a lightweight live_metrics.json for UI downloads
     try:
@@ -605,6 +872,83 @@ def main():
         (out_dir / "live_metrics.json").write_text(json.dumps(live_metrics, indent=2))
     except Exception:
         pass
+    return out_dir
+
+
+def _init_backtest_worker() -> None:
+    # Workers share one run's telemetry paths; interleaved bars from N episodes
+    # would be meaningless to the Run Monitor, so parallel runs emit none.
+    os.environ["STOCKBOT_TELEMETRY_LEVEL"] = "off"
+    # One episode per process: keep torch from oversubscribing the cores
+    try:
+        import torch
+        torch.set_num_threads(1)
+    except Exception:
+        pass
+
+
+def main():
+    p = argparse.ArgumentParser()
+    p.add_argument("--config", type=str, default="stockbot/env/env.example.yaml")
+    p.add_argument(
+        "--policy",
+        type=str,
+        nargs="+",
+        required=True,
+        help="Baseline name (flat|equal|first_long|random|buy_hold) or path to PPO .zip; "
+             "several run in parallel, one report per policy under runs/<out>/<policy>/report",
+    )
+    p.add_argument("--start", type=str, required=True)
+    p.add_argument("--end", type=str, required=True)
+    p.add_argument(
+        "--symbols",
+        type=str,
+        nargs="*",
+        default=None,
+        help="Override symbols from YAML, e.g. --symbols AAPL MSFT",
+    )
+    p.add_argument("--out", type=str, required=True, help="Run tag under stockbot/runs/<out>/report")
+    p.add_argument("--normalize", action="store_true", help="Use ObsNorm (frozen in eval).")
+    p.add_argument("--workers", type=int, default=None, help="Processes for multi-policy runs (default: CPU count).")
+    p.add_argument(
+        "--format",
+        choices=("csv", "parquet"),
+        default="csv",
+        help="Report tables: csv (UI-readable) or parquet (requires pyarrow).",
+    )
+    args = p.parse_args()
+    if args.format == "parquet" and pq is None:
+        p.error("--format parquet requires pyarrow")
+
+    cfg = EnvConfig.from_yaml(args.config)
+    if args.symbols:
+        cfg = replace(cfg, symbols=args.symbols)
+    cfg = replace(cfg, start=args.start, end=args.end)
+
+    run_dir = BASE_RUNS / args.out
+    if len(args.policy) == 1:
+        _backtest_policy(cfg, args.policy[0], args.normalize, run_dir, args.config, args.format)
+        return
+
+    # Several policies: each episode is independent and CPU-bound (env stepping +
+    # inference), so whole backtests go to separate processes.
+    tags: Dict[str, int] = {}
+    jobs = []
+    for policy in args.policy:
+        tag = _policy_tag(policy)
+        tags[tag] = tags.get(tag, 0) + 1
+        if tags[tag] > 1:
+            tag = f"{tag}_{tags[tag]}"
+        jobs.append((policy, run_dir / tag))
+
+    workers = max(1, min(args.workers or os.cpu_count() or 1, len(jobs)))
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_backtest_worker) as ex:
+        futures = {
+            ex.submit(_backtest_policy, cfg, policy, args.normalize, prun, args.config, args.format): policy
+            for policy, prun in jobs
+        }
+        for fut in as_completed(futures):
+            print(f">> {futures[fut]}: {fut.result()}")
 
 
 if __name__ == "__main__":
@@ -1,20 +1,16 @@
 from __future__ import annotations
-from dataclasses import dataclass
-from typing import Dict, List
+import numpy as np
 import pandas as pd
 
-@dataclass
-class Lot:
-    qty: float           # signed (+ long, − short)
-    price: float         # fill price
-    commission: float    # commission paid on this lot
-    ts: pd.Timestamp
+from stockbot.backtest._fifo_match import match_fifo
 
-def _sign(x: float) -> int:
-    return 1 if x > 0 else (-1 if x < 0 else 0)
+_NS_PER_DAY = 86_400_000_000_000
+_NAT = np.iinfo(np.int64).min  # NaT as int64
 
-def _same_side(a: float, b: float) -> bool:
-    return _sign(a) == _sign(b)
+TRADE_COLUMNS = [
+    "symbol", "side", "qty", "entry_ts", "exit_ts", "entry_price", "exit_price",
+    "gross_pnl", "commission_entry", "commission_exit", "net_pnl", "holding_days",
+]
 
 def build_trades_fifo(fills_df: pd.DataFrame) -> pd.DataFrame:
     """
@@ -27,83 +23,44 @@ def build_trades_fifo(fills_df: pd.DataFrame) -> pd.DataFrame:
        'gross_pnl','commission_entry','commission_exit','net_pnl','holding_days']
     """
     if fills_df is None or fills_df.empty:
-        return pd.DataFrame(columns=[
-            "symbol","side","qty","entry_ts","exit_ts","entry_price","exit_price",
-            "gross_pnl","commission_entry","commission_exit","net_pnl","holding_days"
-        ])
-
-    df = fills_df.copy()
-    df["ts"] = pd.to_datetime(df["ts"])
-    df = df.sort_values(["symbol", "ts"]).reset_index(drop=True)
-
-    trades_rows: List[Dict] = []
-    books: Dict[str, List[Lot]] = {}
-
-    for _, row in df.iterrows():
-        sym = row["symbol"]
-        qty = float(row["qty"])              # signed
-        px  = float(row["price"])
-        com = float(row.get("commission", 0.0))
-        ts  = pd.Timestamp(row["ts"])
-
-        if sym not in books:
-            books[sym] = []
-
-        inv = books[sym]
-        inv_qty = sum(l.qty for l in inv)
-
-        # Same side or no inventory -> open/extend
-        if inv_qty == 0 or _same_side(inv_qty, qty):
-            inv.append(Lot(qty=qty, price=px, commission=com, ts=ts))
-            continue
-
-        # Opposite side -> close against FIFO lots
-        remaining = qty
-        while abs(remaining) > 1e-12 and inv:
-            lot = inv[0]
-            match_qty = min(abs(lot.qty), abs(remaining))
-            # direction: if lot>0 (long) we close with a sell (remaining<0), else short closed by buy
-            if lot.qty > 0:
-                gross = (px - lot.price) * match_qty
-                side = "long"
-            else:
-                gross = (lot.price - px) * match_qty
-                side = "short"
-
-            # allocate entry commission proportionally; exit commission all to this match
-            com_entry = lot.commission * (match_qty / max(abs(lot.qty), 1e-12))
-            com_exit = com  # per-fill exit commission
-            net = gross - (com_entry + com_exit)
-
-            trades_rows.append({
-                "symbol": sym,
-                "side": side,
-                "qty": float(match_qty),
-                "entry_ts": lot.ts,
-                "exit_ts": ts,
-                "entry_price": float(lot.price),
-                "exit_price": px,
-                "gross_pnl": float(gross),
-                "commission_entry": float(com_entry),
-                "commission_exit": float(com_exit),
-                "net_pnl": float(net),
-                "holding_days": float((ts - lot.ts).days),
-            })
-
-            # consume matched qty from lot and remaining (keep signs straight)
-            if lot.qty > 0:
-                lot.qty -= match_qty
-                remaining += match_qty  # remaining is negative here
-            else:
-                lot.qty += match_qty
-                remaining -= match_qty  # remaining is positive here
-
-            if abs(lot.qty) < 1e-12:
-                inv.pop(0)
-
-        # Leftover becomes new inventory on the side of the remaining
-        if abs(remaining) > 1e-12:
-            # remaining keeps the sign of the action (buy +, sell −)
-            inv.append(Lot(qty=remaining, price=px, commission=com, ts=ts))
-
-    return pd.DataFrame(trades_rows)
+        return pd.DataFrame(columns=TRADE_COLUMNS)
+
+    ts = pd.DatetimeIndex(pd.to_datetime(fills_df["ts"])).as_unit("ns")
+    # Symbols are factorized (sorted, so codes follow symbol order) and books are
+    # keyed by int code; ordering by (symbol, ts) is then a stable lexsort on two
+    # int64 keys instead of a string sort over the frame. NaT sorts last, as in
+    # sort_values.
+    sym_codes, sym_uniques = pd.factorize(fills_df["symbol"], sort=True, use_na_sentinel=False)
+    ts_key = np.where(ts.isna(), np.iinfo(np.int64).max, ts.asi8)
+    order = np.lexsort((ts_key, sym_codes))
+
+    # Pull columns out once as plain Python scalars; iterrows() would build a
+    # Series per fill.
+    qty_arr = fills_df["qty"].to_numpy(dtype=np.float64)[order].tolist()  # signed
+    px_arr = fills_df["price"].to_numpy(dtype=np.float64)[order].tolist()
+    if "commission" in fills_df.columns:
+        com_arr = fills_df["commission"].to_numpy(dtype=np.float64)[order].tolist()
+    else:
+        com_arr = [0.0] * len(fills_df)
+    ts_arr = ts.asi8[order].tolist()  # int64 epoch-ns; no Timestamp per fill
+
+    cols = match_fifo(sym_codes[order].tolist(), qty_arr, px_arr, com_arr, ts_arr)
+    if not cols["qty"]:
+        return pd.DataFrame()
+    cols["symbol"] = sym_uniques.take(cols["symbol"])
+
+    # Timestamps and holding periods are rebuilt from the int64 columns in one pass
+    entry_ns = np.array(cols["entry_ts"], dtype=np.int64)
+    exit_ns = np.array(cols["exit_ts"], dtype=np.int64)
+    with np.errstate(over="ignore"):
+        days = ((exit_ns - entry_ns) // _NS_PER_DAY).astype(np.float64)
+    days[(entry_ns == _NAT) | (exit_ns == _NAT)] = np.nan
+    cols["holding_days"] = days
+    cols["entry_ts"] = _as_ts(entry_ns, ts.tz)
+    cols["exit_ts"] = _as_ts(exit_ns, ts.tz)
+    return pd.DataFrame({k: cols[k] for k in TRADE_COLUMNS})
+
+
+def _as_ts(ns: np.ndarray, tz) -> pd.DatetimeIndex:
+    out = pd.DatetimeIndex(ns.view("M8[ns]"))
+    return out.tz_localize("UTC").tz_convert(tz) if tz is not None else out
@@ -1,24 +1,157 @@
 # stockbot/backtest/walkforward.py
 from __future__ import annotations
-import argparse, subprocess, os, sys
+import argparse, subprocess, os, shutil, sys
+from concurrent.futures import ProcessPoolExecutor
+from typing import List, Optional, Tuple
+import numpy as np
 import pandas as pd
-from datetime import datetime, timedelta
 
 from stockbot.backtest.infer import infer_probabilities
 from stockbot.backtest.backtest import backtest_long_flat, BTConfig
 from stockbot.ingestion.feature_engineering import prepare_dataset
 
 
-def _to_date(s: str) -> datetime:
-    return datetime.strptime(s, "%Y-%m-%d")
-
-def _next_month(d: datetime, months: int) -> datetime:
-    y = d.year + (d.month - 1 + months) // 12
-    m = (d.month - 1 + months) % 12 + 1
-    return d.replace(year=y, month=m, day=1)
+def _fold_windows(args) -> List[Tuple[int, str, str, str, str]]:
+    """(fold_id, train_start, train_end, test_start, test_end) for every fold, in order.
+
+    Folds step forward by ``test_months`` whole calendar months (the first fold
+    trains from ``--start`` itself, later ones from the 1st of the month); every
+    boundary comes from one monthly PeriodIndex rather than a rollover loop.
+    """
+    first = pd.Timestamp(args.start)
+    overall_end = pd.Timestamp(args.end)
+    starts = pd.period_range(first.to_period("M"), overall_end.to_period("M"), freq="M")[:: args.test_months]
+    test_start = (starts + args.train_months).start_time
+    test_end = (starts + (args.train_months + args.test_months - 1)).end_time.normalize()
+    train_end = test_start - pd.Timedelta(days=1)
+    train_start = starts.start_time.strftime("%Y-%m-%d").tolist()
+    if train_start:
+        train_start[0] = first.strftime("%Y-%m-%d")
+
+    keep = test_end <= overall_end
+
+    def _days(idx: pd.DatetimeIndex) -> List[str]:
+        return idx[keep].strftime("%Y-%m-%d").tolist()
+
+    rows = zip([d for d, k in zip(train_start, keep) if k], _days(train_end), _days(test_start), _days(test_end))
+    return [(fold_id, *row) for fold_id, row in enumerate(rows, start=1)]
+
+
+def _oos_metrics(eq: np.ndarray) -> Tuple[float, float, float]:
+    """(sharpe, max_drawdown, total_return) of a stitched equity curve, on the raw array.
+
+    Same numbers as ``pct_change().fillna(0)`` / ``std()`` (ddof=1) / ``cummax()``
+    on the Series, without pandas' per-op index alignment and NaN handling.
+    """
+    ret = np.empty_like(eq)
+    ret[0] = 0.0
+    np.divide(eq[1:], eq[:-1], out=ret[1:])
+    ret[1:] -= 1.0
+    std = ret.std(ddof=1) if ret.size > 1 else np.nan
+    sharpe = float((ret.mean() / (std + 1e-12)) * (252 ** 0.5))
+    dd = float((eq / np.maximum.accumulate(eq) - 1.0).min())
+    total_return = float(eq[-1] / eq[0] - 1.0)
+    return sharpe, dd, total_return
+
+
+def _run_pipeline_subprocess(args, s_train: str, e_train: str) -> None:
+    """Train on ``[s_train, e_train]`` through the pipeline CLI."""
+    cmd = [
+        sys.executable, "-m", "stockbot.run_pipeline",
+        "--ticker", args.ticker,
+        "--start-date", s_train, "--end-date", e_train,
+        "--window-size", str(args.window_size),
+        "--label-mode", args.label_mode,
+        "--pos-quantile", str(args.pos_quantile),
+        "--neg-quantile", str(args.neg_quantile),
+        "--model", args.model, "--epochs", str(args.epochs),
+        "--loss", args.loss, "--focal-gamma", str(args.focal_gamma),
+        "--lr", str(args.lr),
+    ]
+    if args.no_class_weights:
+        cmd.append("--no-class-weights")
+    subprocess.run(cmd, check=True)
+
+
+def _train_fold(args, fold_id: int, s_train: str, e_train: str) -> Tuple[str, str]:
+    """Train on the TRAIN window; returns this fold's private copy of (model, scaler)."""
+    # 1) Train model on the TRAIN window (call your pipeline)
+    _run_pipeline_subprocess(args, s_train, e_train)
+
+    # 2) Locate trained artifacts. Every fold trains to the same stub, so copy them
+    # aside before the next fold's training overwrites them.
+    model_stub = f"{args.ticker}_w{args.window_size}_h1_thr0.0_{args.label_mode}_{args.model}"
+    fold_dir = os.path.join("stockbot", "models", "walkforward", f"fold{fold_id}")
+    os.makedirs(fold_dir, exist_ok=True)
+    model_path = shutil.copy2(os.path.join("stockbot", "models", f"{model_stub}.pt"), fold_dir)
+    scaler_json = shutil.copy2(os.path.join("stockbot", "models", f"{model_stub}_scaler.json"), fold_dir)
+    return model_path, scaler_json
+
+
+def _eval_fold(
+    args, fold_id: int, s_test: str, e_test: str, model_path: str, scaler_json: str
+) -> Optional[Tuple[int, pd.Series, int]]:
+    """Features, inference and backtest on the TEST window; None if the fold is skipped."""
+    # 3) Build features for the TEST window (fresh features for test range)
+    test_csv = prepare_dataset(
+        ticker=args.ticker,
+        start_date=s_test,
+        end_date=e_test,
+        output_dir=os.path.join("stockbot", "data"),
+        window_size=args.window_size,
+        threshold=0.0,
+        horizon=1,
+        label_mode=args.label_mode,
+        pos_quantile=args.pos_quantile,
+        neg_quantile=args.neg_quantile,
+        auto_adjust=False,
+    )
+    df = pd.read_csv(test_csv, index_col=0, parse_dates=True)
+
+    # 4) Feature columns & guard
+    exclude = {"Open", "High", "Low", "Close", "Adj Close", "Volume", "label", "future_return"}
+    feature_cols = [c for c in df.columns if c not in exclude]
+
+    usable = df.dropna(subset=feature_cols).shape[0]
+    if usable <= args.window_size:
+        print(f"[skip fold {fold_id}] Not enough rows for test {s_test}→{e_test} after indicators "
+              f"(have {usable}, need > {args.window_size}).")
+        return None
+
+    # 5) Inference on the TEST window
+    p_up, _ = infer_probabilities(
+        df=df, feature_cols=feature_cols, window_size=args.window_size,
+        model_path=model_path, scaler_json=scaler_json, model_kind=args.model
+    )
 
-def _fmt(d: datetime) -> str:
-    return d.strftime("%Y-%m-%d")
+    # 5.1 Optional: auto threshold by quantile (per fold)
+    if 0.0 < args.auto_entry_quantile < 1.0:
+        q_val = float(p_up.quantile(args.auto_entry_quantile))
+        print(f"[auto] fold {fold_id} entry_thresh set to p_up quantile {args.auto_entry_quantile:.2f}: {q_val:.4f}")
+        entry_thresh = q_val
+    else:
+        entry_thresh = args.entry_thresh
+
+    # (Nice debug) quick signal report
+    desc = p_up.describe()
+    n_sig = int((p_up >= entry_thresh).sum())
+    first_sig = p_up.index[(p_up >= entry_thresh)].min() if n_sig > 0 else None
+    last_sig  = p_up.index[(p_up >= entry_thresh)].max() if n_sig > 0 else None
+    print(f"== Signal report (fold {fold_id}) ==\n{desc.to_string()}\n"
+          f"signals >= entry: {n_sig} | first: {first_sig} | last: {last_sig}")
+
+    # 6) Backtest
+    cfg = BTConfig(
+        entry_threshold=entry_thresh,
+        exit_threshold=args.exit_thresh,
+        atr_period=args.atr_period,
+        sl_atr=args.sl_atr,
+        tp_atr=(None if args.tp_atr == 0.0 else args.tp_atr),
+        slip_bps=args.slip_bps,
+        fee_bps=args.fee_bps,
+    )
+    res = backtest_long_flat(df, p_up, cfg)
+    return fold_id, res["equity_curve"], int(res["metrics"]["num_trades"])
 
 
 def main():
@@ -58,129 +191,38 @@ def main():
         help="If 0<q<1, set entry_thresh to the q-quantile of p_up for each fold (e.g., 0.70)."
     )
 
-    args = ap.parse_args()
+    ap.add_argument("--workers", type=int, default=None,
+                    help="Processes evaluating trained folds (default: CPU count).")
 
-    cur_train_start = _to_date(args.start)
-    overall_end = _to_date(args.end)
+    args = ap.parse_args()
 
-    equity = None
+    # Training runs one fold at a time (every fold writes the same model stub);
+    # each trained fold's features/inference/backtest then runs in a worker while
+    # the next fold trains. Results are stitched in fold order.
+    futures = []
+    with ProcessPoolExecutor(max_workers=args.workers) as ex:
+        for fold_id, s_train, e_train, s_test, e_test in _fold_windows(args):
+            print(f"\n== Fold {fold_id}: train {s_train}→{e_train} | test {s_test}→{e_test} ==")
+            model_path, scaler_json = _train_fold(args, fold_id, s_train, e_train)
+            futures.append(ex.submit(_eval_fold, args, fold_id, s_test, e_test, model_path, scaler_json))
+        results = [r for r in (f.result() for f in futures) if r is not None]
+    results.sort(key=lambda r: r[0])
+
+    # 7) Stitch equity curves across folds: rescale each piece to chain on, concat once
+    eq_pieces: list = []
     trades_total = 0
-    fold_id = 0
-
-    while True:
-        train_end = _next_month(cur_train_start, args.train_months) - timedelta(days=1)
-        test_start = _next_month(cur_train_start, args.train_months)
-        test_end = _next_month(test_start, args.test_months) - timedelta(days=1)
-        if test_end > overall_end:
-            break
-
-        s_train, e_train = _fmt(cur_train_start), _fmt(train_end)
-        s_test,  e_test  = _fmt(test_start), _fmt(test_end)
-        fold_id += 1
-
-        print(f"\n== Fold {fold_id}: train {s_train}→{e_train} | test {s_test}→{e_test} ==")
-
-        # 1) Train model on the TRAIN window (call your pipeline)
-        cmd = [
-            sys.executable, "-m", "stockbot.run_pipeline",
-            "--ticker", args.ticker,
-            "--start-date", s_train, "--end-date", e_train,
-            "--window-size", str(args.window_size),
-            "--label-mode", args.label_mode,
-            "--pos-quantile", str(args.pos_quantile),
-            "--neg-quantile", str(args.neg_quantile),
-            "--model", args.model, "--epochs", str(args.epochs),
-            "--loss", args.loss, "--focal-gamma", str(args.focal_gamma),
-            "--lr", str(args.lr),
-        ]
-        if args.no_class_weights:
-            cmd.append("--no-class-weights")
-        subprocess.run(cmd, check=True)
-
-        # 2) Locate trained artifacts
-        model_stub = f"{args.ticker}_w{args.window_size}_h1_thr0.0_{args.label_mode}_{args.model}"
-        model_path  = os.path.join("stockbot", "models", f"{model_stub}.pt")
-        scaler_json = os.path.join("stockbot", "models", f"{model_stub}_scaler.json")
-
-        # 3) Build features for the TEST window (fresh features for test range)
-        test_csv = prepare_dataset(
-            ticker=args.ticker,
-            start_date=s_test,
-            end_date=e_test,
-            output_dir=os.path.join("stockbot", "data"),
-            window_size=args.window_size,
-            threshold=0.0,
-            horizon=1,
-            label_mode=args.label_mode,
-            pos_quantile=args.pos_quantile,
-            neg_quantile=args.neg_quantile,
-            auto_adjust=False,
-        )
-        df = pd.read_csv(test_csv, index_col=0, parse_dates=True)
-
-        # 4) Feature columns & guard
-        exclude = {"Open", "High", "Low", "Close", "Adj Close", "Volume", "label", "future_return"}
-        feature_cols = [c for c in df.columns if c not in exclude]
-
-        usable = df.dropna(subset=feature_cols).shape[0]
-        if usable <= args.window_size:
-            print(f"[skip fold] Not enough rows for test {s_test}→{e_test} after indicators "
-                  f"(have {usable}, need > {args.window_size}).")
-            cur_train_start = _next_month(cur_train_start, args.test_months)
-            continue
-
-        # 5) Inference on the TEST window
-        p_up, _ = infer_probabilities(
-            df=df, feature_cols=feature_cols, window_size=args.window_size,
-            model_path=model_path, scaler_json=scaler_json, model_kind=args.model
-        )
-
-        # 5.1 Optional: auto threshold by quantile (per fold)
-        if 0.0 < args.auto_entry_quantile < 1.0:
-            q_val = float(p_up.quantile(args.auto_entry_quantile))
-            print(f"[auto] entry_thresh set to p_up quantile {args.auto_entry_quantile:.2f}: {q_val:.4f}")
-            entry_thresh = q_val
-        else:
-            entry_thresh = args.entry_thresh
-
-        # (Nice debug) quick signal report
-        desc = p_up.describe()
-        n_sig = int((p_up >= entry_thresh).sum())
-        first_sig = p_up.index[(p_up >= entry_thresh)].min() if n_sig > 0 else None
-        last_sig  = p_up.index[(p_up >= entry_thresh)].max() if n_sig > 0 else None
-        print("== Signal report ==")
-        print(desc.to_string())
-        print(f"signals >= entry: {n_sig} | first: {first_sig} | last: {last_sig}")
-
-        # 6) Backtest
-        cfg = BTConfig(
-            entry_threshold=entry_thresh,
-            exit_threshold=args.exit_thresh,
-            atr_period=args.atr_period,
-            sl_atr=args.sl_atr,
-            tp_atr=(None if args.tp_atr == 0.0 else args.tp_atr),
-            slip_bps=args.slip_bps,
-            fee_bps=args.fee_bps,
-        )
-        res = backtest_long_flat(df, p_up, cfg)
-
-        # 7) Stitch equity curves across folds
-        eq = res["equity_curve"]
-        if equity is None:
-            equity = eq
+    for _fold_id, eq, n_trades in results:
+        if not eq_pieces:
+            eq_pieces.append(eq)
         else:
             base = float(eq.iloc[0]) if float(eq.iloc[0]) != 0 else 1.0
-            scale = float(equity.iloc[-1] / base)
-            equity = pd.concat([equity, eq * scale])
-
-        trades_total += int(res["metrics"]["num_trades"])
-        cur_train_start = _next_month(cur_train_start, args.test_months)
+            scale = float(eq_pieces[-1].iloc[-1] / base)
+            eq_pieces.append(eq * scale)
+        trades_total += n_trades
 
     # Final OOS report
-    ret = equity.pct_change().fillna(0.0)
-    sharpe = float((ret.mean() / (ret.std() + 1e-12)) * (252 ** 0.5))
-    dd = float((equity / equity.cummax() - 1.0).min())
-    total_return = float(equity.iloc[-1] / equity.iloc[0] - 1.0)
+    equity = pd.concat(eq_pieces)
+    sharpe, dd, total_return = _oos_metrics(equity.to_numpy(dtype=np.float64))
 
     print("\n== Walk-forward OOS Metrics ==")
     print(f" total_return: {total_return:.4f}")
@@ -1,8 +1,16 @@
 from __future__ import annotations
+from concurrent.futures import Future, ThreadPoolExecutor
 from dataclasses import dataclass
 from typing import List, Dict, Optional, Tuple, Literal, Any
 from datetime import datetime
+import atexit
 import math
+import queue
+import threading
+import time
+import weakref
+
+import numpy as np
 
 from .orders import Order, Fill, OrderType, Side, TIF
 from .config import ExecConfig, FeeModel
@@ -12,6 +20,9 @@ from .config import ExecConfig, FeeModel
 # from stockbot.broker.schwab_provider import SchwabProvider
 # from stockbot.broker.base_provider import BaseProvider
 
+# Concurrent HTTP submissions per batch when parallel_submits is on (one round-trip each)
+_SUBMIT_WORKERS = 10
+
 @dataclass
 class SubmitResult:
     order_id: str
@@ -46,8 +57,13 @@ class SimBroker(BrokerAdapterBase):
         self.last_fills: List[Fill] = []   
 
     def place_orders(self, orders: List[Order]) -> List[Fill]:
-        prices, volumes = self._get_next_bar()  # dicts: symbol -> (O,H,L,C), symbol -> vol
-        fills = self.exec.simulate_fills(orders, prices, volumes)
+        # dicts: symbol -> (O,H,L,C), symbol -> vol; or an (N, 5) OHLCV array
+        # with its symbol -> row map
+        bar, cols = self._get_next_bar()
+        if isinstance(bar, np.ndarray):
+            fills = self.exec.simulate_fills_ohlcv(orders, bar, cols)
+        else:
+            fills = self.exec.simulate_fills(orders, bar, cols)
         self.last_fills = list(fills)     
         return fills
 
@@ -55,25 +71,68 @@ class SimBroker(BrokerAdapterBase):
 # Live/Paper broker adapter
 # ------------------------------
 
+SyncMode = Literal["sync", "async", "wait"]
+
+
 class LiveBrokerAdapter(BrokerAdapterBase):
-    """Wraps your BaseProvider (AlpacaProvider or SchwabProvider)."""
+    """Wraps your BaseProvider (AlpacaProvider or SchwabProvider).
+
+    ``sync_mode`` picks how ``place_orders`` submits:
+      - "sync": submit immediately and block until the broker accepted them
+      - "wait": queue into a batching window of ``flush_window_ms`` and block
+        until that batch has been submitted
+      - "async": queue into the batching window and return at once; call
+        ``flush`` to wait for everything queued so far
+    Orders queued within one window go to the broker as a single bulk submit.
+    ``close`` submits whatever is still queued and stops the flusher thread; it
+    also runs at interpreter exit.
+
+    Orders are submitted one after another in the caller's sequence. With
+    ``parallel_submits=True`` a batch fans out over a small thread pool instead,
+    which overlaps the HTTP round-trips but lets the broker see them in any order.
+    """
 
     def __init__(
         self,
         provider,              # BaseProvider subclass
         fees: FeeModel,
         default_tif: TIF = "DAY",
-        qty_rounding: int = 0  # equities share precision
+        qty_rounding: int = 0,  # equities share precision
+        sync_mode: SyncMode = "sync",
+        flush_window_ms: float = 20.0,
+        parallel_submits: bool = False,
     ):
         self.p = provider
         self.fees = fees
         self.default_tif = default_tif
         self.qty_rounding = qty_rounding
+        if sync_mode not in ("sync", "async", "wait"):
+            raise ValueError(f"unknown sync_mode: {sync_mode!r}")
+        self.sync_mode = sync_mode
+        self.flush_window_ms = float(flush_window_ms)
+        self.parallel_submits = bool(parallel_submits)
+        self._pending: Optional[queue.SimpleQueue] = None
+        self._flusher: Optional[threading.Thread] = None
+        self._flusher_lock = threading.Lock()
+        # "async" submissions nobody has waited on yet; flush() reports their errors
+        self._outstanding: List["Future[List[SubmitResult]]"] = []
 
         # Capabilities
         self.cap_submit = hasattr(self.p, "submit_order")
         self.cap_cancel = hasattr(self.p, "cancel_order")
         self.cap_open   = hasattr(self.p, "get_orders")
+        self.last_submits: List[SubmitResult] = []
+
+        # Resolve the provider-specific submit path once instead of per order
+        name = self.p.__class__.__name__
+        if not self.cap_submit:
+            self._submit_fn = self._submit_missing
+        elif name == "AlpacaProvider":
+            self._submit_fn = self._submit_alpaca
+        elif name == "SchwabProvider":
+            self._submit_fn = self._submit_schwab
+        else:
+            self._submit_fn = self._submit_generic
 
     # ---------- Public API ----------
 
@@ -83,17 +142,61 @@ class LiveBrokerAdapter(BrokerAdapterBase):
             raise NotImplementedError(f"{self.p.__class__.__name__} has no submit_order() implemented.")
 
         fills: List[Fill] = []
-        for o in orders:
-            sub = self._submit_single(o)
-            # Live brokers are async; we do not have fills yet.
-            # You can poll later and translate to Fill objects when fills arrive.
-            # Here we return an empty list to signal "accepted".
-            # If you want a synchronous paper fill against latest price, uncomment below:
-            # px = self.p.get_current_price(o.symbol)
-            # commission = self._commission(abs(o.qty), px)
-            # fills.append(Fill(order_id=-1, symbol=o.symbol, qty=o.qty, price=px, commission=commission))
+        if self.sync_mode == "sync":
+            outcomes = self._submit_each(list(orders))
+            # Keep the accepted orders' ids even if some submissions failed
+            self.last_submits = [r for r in outcomes if isinstance(r, SubmitResult)]
+            err = next((r for r in outcomes if isinstance(r, BaseException)), None)
+            if err is not None:
+                raise err
+        else:
+            fut = self._enqueue(list(orders))
+            if self.sync_mode == "wait":
+                fut.result()
+            else:
+                with self._flusher_lock:
+                    self._outstanding.append(fut)
+        # Live brokers are async; we do not have fills yet.
+        # You can poll later and translate to Fill objects when fills arrive.
+        # Here we return an empty list to signal "accepted".
+        # If you want a synchronous paper fill against latest price, uncomment below:
+        # for o in orders:
+        #     px = self.p.get_current_price(o.symbol)
+        #     commission = self._commission(abs(o.qty), px)
+        #     fills.append(Fill(order_id=-1, symbol=o.symbol, qty=o.qty, price=px, commission=commission))
         return fills
 
+    def flush(self) -> None:
+        """Block until every order queued by "async"/"wait" calls has been submitted.
+
+        Re-raises the first submission error among the "async" calls queued
+        since the previous flush.
+        """
+        if self._pending is not None:
+            # The flusher works FIFO, so an empty marker resolves after all prior batches
+            self._enqueue([]).result()
+        with self._flusher_lock:
+            done, self._outstanding = self._outstanding, []
+        for fut in done:
+            err = fut.exception()
+            if err is not None:
+                raise err
+
+    def close(self) -> None:
+        """Submit every queued order and stop the background flusher.
+
+        Submission errors are not raised here; a later ``flush`` reports them.
+        """
+        with self._flusher_lock:
+            q, t = self._pending, self._flusher
+            self._pending = self._flusher = None
+        if q is None:
+            return
+        q.put(None)
+        if t is not None:
+            t.join()
+        _LIVE_ADAPTERS.discard(self)
+
     def cancel_all(self) -> None:
         if not self.cap_open or not self.cap_cancel:
             return
@@ -128,60 +231,136 @@ class LiveBrokerAdapter(BrokerAdapterBase):
             return round(qty, self.qty_rounding)
         return int(round(qty))  # equities default
 
-    def _submit_single(self, o: Order) -> SubmitResult:
-        side = "buy" if o.side == "buy" else "sell"
-        tif  = (o.tif or self.default_tif)
+    def _enqueue(self, orders: List[Order]) -> "Future[List[SubmitResult]]":
+        fut: "Future[List[SubmitResult]]" = Future()
+        with self._flusher_lock:
+            if self._pending is None:
+                self._pending = queue.SimpleQueue()
+                self._flusher = threading.Thread(
+                    target=self._flush_loop, args=(self._pending,), name="order-flusher", daemon=True
+                )
+                self._flusher.start()
+                _LIVE_ADAPTERS.add(self)
+            self._pending.put((orders, fut))
+        return fut
 
+    def _flush_loop(self, pending: queue.SimpleQueue) -> None:
+        stop = False
+        while not stop:
+            item = pending.get()
+            if item is None:
+                return
+            batch = [item]
+            deadline = time.monotonic() + self.flush_window_ms / 1000.0
+            while True:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    item = pending.get(timeout=remaining)
+                except queue.Empty:
+                    break
+                if item is None:  # close(): submit what we have, then exit
+                    stop = True
+                    break
+                batch.append(item)
+            orders = [o for chunk, _ in batch for o in chunk]
+            outcomes = self._submit_each(orders)
+            if orders:
+                self.last_submits = [r for r in outcomes if isinstance(r, SubmitResult)]
+            # Each caller only sees the outcome of its own orders
+            start = 0
+            for chunk, fut in batch:
+                mine = outcomes[start:start + len(chunk)]
+                start += len(chunk)
+                err = next((r for r in mine if isinstance(r, BaseException)), None)
+                if err is not None:
+                    fut.set_exception(err)
+                else:
+                    fut.set_result(mine)
+
+    def _submit_each(self, orders: List[Order]) -> List[SubmitResult | BaseException]:
+        """Submit every order and return each one's result or error in place.
+
+        Results come back in ``orders`` order; a failed submission does not stop
+        the ones after it.
+        """
+
+        def one(o: Order) -> SubmitResult | BaseException:
+            try:
+                return self._submit_fn(o)
+            except Exception as e:
+                return e
+
+        if not self.parallel_submits or len(orders) <= 1:
+            return [one(o) for o in orders]
+        with ThreadPoolExecutor(max_workers=min(_SUBMIT_WORKERS, len(orders))) as ex:
+            return list(ex.map(one, orders))
+
+    def _submit_alpaca(self, o: Order) -> SubmitResult:
         # Alpaca-specific payload (works out of the box)
-        if self.p.__class__.__name__ == "AlpacaProvider":
-            typ = "market" if o.type == "market" else "limit"
-            body = {
-                "symbol": o.symbol,
-                "qty": self._round_qty(abs(o.qty)),
-                "side": side,
-                "type_": typ,
-                "time_in_force": tif,
-            }
-            if typ == "limit":
-                if o.limit_price is None:
-                    raise ValueError("limit order requires limit_price")
-                body["limit_price"] = float(o.limit_price)
-            resp = self.p.submit_order(**body)
-            oid = str(resp.get("id") or resp.get("client_order_id") or "")
-            return SubmitResult(order_id=oid, raw=resp)
+        typ = "market" if o.type == "market" else "limit"
+        body = {
+            "symbol": o.symbol,
+            "qty": self._round_qty(abs(o.qty)),
+            "side": "buy" if o.side == "buy" else "sell",
+            "type_": typ,
+            "time_in_force": o.tif or self.default_tif,
+        }
+        if typ == "limit":
+            if o.limit_price is None:
+                raise ValueError("limit order requires limit_price")
+            body["limit_price"] = float(o.limit_price)
+        resp = self.p.submit_order(**body)
+        oid = str(resp.get("id") or resp.get("client_order_id") or "")
+        return SubmitResult(order_id=oid, raw=resp)
 
+    def _submit_schwab(self, o: Order) -> SubmitResult:
         # Schwab-specific: you need to implement submit_order() in your SchwabProvider.
         # The adapter will call it here in the same signature as Alpaca:
-        if self.p.__class__.__name__ == "SchwabProvider":
-            if not hasattr(self.p, "submit_order"):
-                raise NotImplementedError("SchwabProvider.submit_order() not implemented yet.")
-            typ = "market" if o.type == "market" else "limit"
-            body = {
-                "symbol": o.symbol,
-                "qty": self._round_qty(abs(o.qty)),
-                "side": side,
-                "type_": typ,
-                "time_in_force": tif,
-            }
-            if typ == "limit":
-                if o.limit_price is None:
-                    raise ValueError("limit order requires limit_price")
-                body["price"] = float(o.limit_price)
-            resp = self.p.submit_order(**body)
-            oid = str(resp.get("orderId") or resp.get("id") or "")
-            return SubmitResult(order_id=oid, raw=resp)
+        typ = "market" if o.type == "market" else "limit"
+        body = {
+            "symbol": o.symbol,
+            "qty": self._round_qty(abs(o.qty)),
+            "side": "buy" if o.side == "buy" else "sell",
+            "type_": typ,
+            "time_in_force": o.tif or self.default_tif,
+        }
+        if typ == "limit":
+            if o.limit_price is None:
+                raise ValueError("limit order requires limit_price")
+            body["price"] = float(o.limit_price)
+        resp = self.p.submit_order(**body)
+        oid = str(resp.get("orderId") or resp.get("id") or "")
+        return SubmitResult(order_id=oid, raw=resp)
 
+    def _submit_generic(self, o: Order) -> SubmitResult:
         # Generic BaseProvider fallback (if you add another provider later)
-        if hasattr(self.p, "submit_order"):
-            resp = self.p.submit_order(
-                symbol=o.symbol,
-                qty=self._round_qty(abs(o.qty)),
-                side=side,
-                type_="market" if o.type == "market" else "limit",
-                time_in_force=tif,
-                **({"limit_price": float(o.limit_price)} if o.type == "limit" else {})
-            )
-            oid = str(resp.get("id") or resp.get("orderId") or "")
-            return SubmitResult(order_id=oid, raw=resp)
+        resp = self.p.submit_order(
+            symbol=o.symbol,
+            qty=self._round_qty(abs(o.qty)),
+            side="buy" if o.side == "buy" else "sell",
+            type_="market" if o.type == "market" else "limit",
+            time_in_force=o.tif or self.default_tif,
+            **({"limit_price": float(o.limit_price)} if o.type == "limit" else {})
+        )
+        oid = str(resp.get("id") or resp.get("orderId") or "")
+        return SubmitResult(order_id=oid, raw=resp)
 
+    def _submit_missing(self, o: Order) -> SubmitResult:
+        if self.p.__class__.__name__ == "SchwabProvider":
+            raise NotImplementedError("SchwabProvider.submit_order() not implemented yet.")
         raise NotImplementedError("Provider missing submit_order()")
+
+
+_LIVE_ADAPTERS: "weakref.WeakSet[LiveBrokerAdapter]" = weakref.WeakSet()
+
+
+@atexit.register
+def _close_live_adapters() -> None:
+    # The flusher is a daemon thread; submit whatever is still queued before exit.
+    for ad in list(_LIVE_ADAPTERS):
+        try:
+            ad.close()
+        except Exception:
+            pass
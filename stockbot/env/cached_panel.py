@@ -7,15 +7,83 @@ produced by env_builder.ensure_parquet/build_manifest, then applies the same
 feature pipeline as data_adapter.PanelSource.
 """
 
+import json
+import zipfile
 from dataclasses import dataclass
 from pathlib import Path
-from typing import Dict, Sequence
+from typing import Dict, Sequence, Tuple
 
 import numpy as np
 import pandas as pd
 
 from stockbot.env.config import EnvConfig
-from stockbot.env.data_adapter import _build_features  # reuse same feature builder
+from stockbot.env.data_adapter import (  # reuse same feature builder
+    _build_features, _common_index, _downcast_features, _expand_indicators,
+)
+
+try:
+    import orjson as _orjson  # type: ignore
+except Exception:  # pragma: no cover - optional fast JSON parser
+    _orjson = None
+
+# Bytes of windows.npz decompressed per read while extracting the current bar
+_WINDOW_READ_BYTES = 1 << 20
+
+
+def _load_current_bar(win_path: Path) -> Tuple[np.ndarray, Tuple[int, ...]]:
+    """Return ``X[:, -1]`` (T, N, F) from windows.npz plus the full shape of ``X``.
+
+    The archive is compressed, so it cannot be memory-mapped; instead the
+    ``X.npy`` member is streamed a few rows at a time and only the last bar of
+    each window is kept, so peak memory is ~1/L of loading ``X`` whole.
+    """
+    with zipfile.ZipFile(win_path) as zf, zf.open("X.npy") as f:
+        version = np.lib.format.read_magic(f)
+        if version == (1, 0):
+            shape, fortran, dtype = np.lib.format.read_array_header_1_0(f)
+        else:
+            shape, fortran, dtype = np.lib.format.read_array_header_2_0(f)
+        if len(shape) != 4 or fortran or dtype.hasobject:
+            X = np.load(win_path)["X"]
+            return (np.ascontiguousarray(X[:, -1]) if X.ndim == 4 else X), X.shape
+        T, L, N, F = shape
+        row_bytes = L * N * F * dtype.itemsize
+        out = np.empty((T, N, F), dtype=dtype)
+        step = max(1, _WINDOW_READ_BYTES // max(row_bytes, 1))
+        for t0 in range(0, T, step):
+            n = min(step, T - t0)
+            buf = f.read(n * row_bytes)
+            if len(buf) != n * row_bytes:
+                raise ValueError("windows.npz is truncated")
+            out[t0:t0 + n] = np.frombuffer(buf, dtype=dtype).reshape(n, L, N, F)[:, -1]
+    return out, tuple(shape)
+
+
+def _parse_timestamps(values: list) -> pd.DatetimeIndex:
+    """``pd.to_datetime(values)`` with C-level fast paths for uniform inputs.
+
+    Epoch-ns integers are viewed directly and offset-free ISO strings go through
+    numpy's datetime64 parser; anything else (offsets, other formats) is left to
+    pandas.
+    """
+    if values:
+        first = values[0]
+        try:
+            if isinstance(first, int) and not isinstance(first, bool):
+                return pd.DatetimeIndex(np.asarray(values, dtype=np.int64).view("M8[ns]"))
+            if isinstance(first, str):
+                tail = first[10:]
+                if first.endswith("Z") or "+" in tail or "-" in tail:
+                    return pd.to_datetime(values, format="ISO8601")
+                return pd.DatetimeIndex(np.asarray(values, dtype="M8[ns]"))
+        except (ValueError, TypeError, OverflowError):
+            pass
+    return pd.to_datetime(values)
+
+
+def _read_json(path: Path):
+    raw = path.read_bytes()
+    return _orjson.loads(raw) if _orjson is not None else json.loads(raw)
 
 
 @dataclass
@@ -25,6 +93,7 @@ class CachedPanelSource:
 
     def __init__(self, manifest_path: str | Path, cfg: EnvConfig):
         self.cfg = cfg
+        dtype = np.dtype(cfg.features.dtype)
         mp = Path(manifest_path)
         if not mp.exists():
             raise FileNotFoundError(f"dataset_manifest not found: {mp}")
@@ -35,23 +104,25 @@ class CachedPanelSource:
         meta_path = run_root / "meta.json"
         if win_path.exists() and meta_path.exists():
             try:
-                import json
-                X = np.load(win_path)["X"]  # (T, L, N, F)
-                meta = json.loads(meta_path.read_text())
-                ts = pd.to_datetime(meta.get("timestamps", []))
+                cur, x_shape = _load_current_bar(win_path)  # X[:, -1] of (T, L, N, F)
+                cur = cur.astype(dtype, copy=False)
+                # env_builder writes clean windows; one C-level scan confirms it so
+                # the per-frame NaN filtering below can be skipped
+                has_nan = bool(np.isnan(cur).any())
+                meta = _read_json(meta_path)
+                ts = _parse_timestamps(meta.get("timestamps", []))
                 syms = list(meta.get("symbols", []))
                 cols = list(meta.get("feature_names", []))
-                if X.ndim != 4:
+                if len(x_shape) != 4:
                     raise ValueError("windows.npz has unexpected shape")
-                T, L, N, F = X.shape
+                T, L, N, F = x_shape
                 if len(ts) != T:
                     raise ValueError("meta timestamps length mismatch with windows")
                 if len(syms) != N:
                     raise ValueError("meta symbols length mismatch with windows")
                 if len(cols) != F:
                     raise ValueError("meta feature_names length mismatch with windows")
-                # Current-bar features at each t
-                cur = X[:, -1, :, :]  # (T, N, F)
+                # cur holds the current-bar features at each t: (T, N, F)
                 frames: Dict[str, pd.DataFrame] = {}
                 for si, sym in enumerate(syms):
                     df = pd.DataFrame(cur[:, si, :], index=ts, columns=cols)
@@ -67,8 +138,7 @@ class CachedPanelSource:
 
         if not using_windows:
             # build from cached CSV files listed in manifest
-            import json
-            self._manifest = json.loads(mp.read_text())
+            self._manifest = _read_json(mp)
             parquet_map: Dict[str, str] = dict(self._manifest.get("parquet_map", {}))
             self.symbols = list(parquet_map.keys())
 
@@ -78,61 +148,44 @@ class CachedPanelSource:
                 if "timestamp" in df.columns:
                     df = df.rename(columns={"timestamp": "ts"})
                 df = df.sort_values("ts").set_index("ts")
-                frames[sym] = _build_features(df, cfg.features)
+                frames[sym] = _downcast_features(_build_features(df, cfg.features), dtype)
 
         # Align by intersection of original indexes first
-        idx = None
-        for df in frames.values():
-            idx = df.index if idx is None else idx.intersection(df.index)
-        if idx is None or len(idx) == 0:
+        idx = _common_index([frames[sym].index for sym in self.symbols])
+        if len(idx) == 0:
             raise RuntimeError("No overlapping timestamps across symbols in cached data")
 
         # Determine required columns
         if using_windows:
             required = required_cols  # use feature_names from meta/windows
         else:
-            base_cols = ["open", "high", "low", "close", "volume"]
-            expanded_inds: list[str] = []
-            alias_minimal = [
-                "logret",
-                "logret5",
-                "logret20",
-                "vol10",
-                "vol20",
-                "atr14",
-                "bb_width",
-                "keltner_width",
-                "vol_z20",
-                "amihud",
-            ]
-            for ind in list(cfg.features.indicators):
-                if ind in ("minimal", "minimal_core"):
-                    expanded_inds.extend(alias_minimal)
-                elif ind == "bbands":
-                    expanded_inds.extend(["bb_upper", "bb_lower"])
-                else:
-                    expanded_inds.append(ind)
-            required = base_cols + expanded_inds
-
-        # Filter and align all frames on common index after dropna on required
-        panel: Dict[str, pd.DataFrame] = {}
-        for sym in self.symbols:
-            df = frames[sym].reindex(idx)
-            df = df.dropna(subset=required)
-            panel[sym] = df
-
-        common = None
-        for df in panel.values():
-            common = df.index if common is None else common.intersection(df.index)
-        if common is None or len(common) == 0:
-            raise RuntimeError("No overlapping timestamps across symbols after feature engineering.")
+            required = list(_expand_indicators(tuple(cfg.features.indicators)))
 
-        for sym in self.symbols:
-            panel[sym] = panel[sym].reindex(common)
+        # One alignment pass: reindex to the shared index, then keep only rows where
+        # every symbol has all required features (what dropna + re-intersect did)
+        panel: Dict[str, pd.DataFrame] = {sym: frames[sym].reindex(idx) for sym in self.symbols}
+        if using_windows and not has_nan:
+            keep = np.ones(len(idx), dtype=bool)
+        else:
+            keep = np.logical_and.reduce(
+                [panel[sym][required].notna().to_numpy().all(axis=1) for sym in self.symbols]
+            )
+        if not keep.any():
+            raise RuntimeError("No overlapping timestamps across symbols after feature engineering.")
+        common = idx
+        if not keep.all():
+            common = idx[keep]
+            panel = {sym: df[keep] for sym, df in panel.items()}
 
         self.panel = panel
         self.index = common
         self._cols = required
+        # (T, N, F) copy of the required features in cfg.features.dtype, in
+        # self.symbols order, so per-step lookback windows are a single strided view
+        self._tensor = np.stack(
+            [panel[sym][required].to_numpy() for sym in self.symbols], axis=1
+        ).astype(dtype, copy=False)
+        self._tensor.flags.writeable = False
 
         # ensure enough rows
         min_needed = int(cfg.episode.lookback) + 2
@@ -145,5 +198,9 @@ class CachedPanelSource:
     def slice(self, start_idx: int, end_idx: int) -> Dict[str, pd.DataFrame]:
         return {s: df.iloc[start_idx:end_idx] for s, df in self.panel.items()}
 
+    def slice_ndarray(self, start_idx: int, end_idx: int) -> np.ndarray:
+        """Rows ``start_idx:end_idx`` as a read-only (rows, N, F) view in ``cfg.features.dtype``."""
+        return self._tensor[start_idx:end_idx]
+
     def cols_required(self) -> Sequence[str]:
         return self._cols
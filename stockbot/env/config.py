@@ -1,17 +1,117 @@
 # stockbot/env/config.py
 from __future__ import annotations
 
+import copy
+import functools
+import glob
+import hashlib
+import json
+import os
+import re
+import threading
+from collections import OrderedDict
 from dataclasses import dataclass, asdict
-from typing import Literal, Sequence, Optional, Dict, Any
+from typing import Literal, Sequence, Optional, Dict, Any, Tuple
 from pathlib import Path
 import yaml
 
+try:  # libyaml-backed loader; same SafeConstructor semantics, parses far faster
+    from yaml import CSafeLoader as _SafeLoader
+except ImportError:  # pragma: no cover - PyYAML built without libyaml
+    from yaml import SafeLoader as _SafeLoader
+
+
+# -----------------------------
+# YAML loading
+# -----------------------------
+
+# Parsed documents keyed by (path, mtime_ns, size); an edited file gets a new key
+_YAML_CACHE: "OrderedDict[Tuple[str, int, int], Any]" = OrderedDict()
+_YAML_CACHE_MAX = 100
+_YAML_LOCK = threading.Lock()
+
+
+def _yaml_sidecar_dir() -> Optional[Path]:
+    # Opt-in: sidecars are only written when a cache directory is configured
+    d = os.environ.get("STOCKBOT_YAML_CACHE_DIR", "").strip()
+    return Path(d) if d else None
+
+
+def _yaml_sidecar(cache_dir: Path, p: Path, raw: bytes) -> Path:
+    h = hashlib.blake2b(raw, digest_size=8).hexdigest()
+    return cache_dir / f"{p.name}.{h}.json"
+
+
+def _read_sidecar(side: Path) -> Tuple[bool, Any]:
+    try:
+        return True, json.loads(side.read_bytes())
+    except Exception:
+        return False, None
+
+
+def _write_sidecar(p: Path, side: Path, data: Any) -> None:
+    # Only documents that survive a JSON round trip unchanged (no dates, no
+    # non-string keys) get a sidecar; anything else always goes through YAML.
+    try:
+        text = json.dumps(data)
+        if json.loads(text) != data:
+            return
+        side.parent.mkdir(parents=True, exist_ok=True)
+        stale_name = re.compile(re.escape(p.name) + r"\.[0-9a-f]{16}\.json")
+        for stale in side.parent.glob(f"{glob.escape(p.name)}.*.json"):
+            if stale != side and stale_name.fullmatch(stale.name):
+                stale.unlink(missing_ok=True)
+        tmp = side.with_name(f"{side.name}.{os.getpid()}.tmp")
+        tmp.write_text(text)
+        os.replace(tmp, side)
+    except Exception:
+        pass  # best-effort; an unwritable cache dir simply skips the sidecar
+
+
+def load_yaml(path: str | Path) -> Any:
+    """Parse a YAML file, reusing the previous parse while the file is unchanged.
+
+    When ``STOCKBOT_YAML_CACHE_DIR`` is set, a ``<name>.<hash>.json`` sidecar
+    keyed by the file's content hash is kept in that directory so later
+    processes can skip YAML parsing entirely. Returns a deep copy so callers
+    may mutate the result freely.
+    """
+    p = Path(path)
+    st = p.stat()
+    key = (str(p.resolve()), st.st_mtime_ns, st.st_size)
+    with _YAML_LOCK:
+        if key in _YAML_CACHE:
+            _YAML_CACHE.move_to_end(key)
+            return copy.deepcopy(_YAML_CACHE[key])
+    raw = p.read_bytes()
+    cache_dir = _yaml_sidecar_dir()
+    found, data = False, None
+    if cache_dir is not None:
+        side = _yaml_sidecar(cache_dir, p, raw)
+        found, data = _read_sidecar(side)
+    if not found:
+        data = yaml.load(raw, Loader=_SafeLoader)
+        if cache_dir is not None:
+            _write_sidecar(p, side, data)
+    with _YAML_LOCK:
+        _YAML_CACHE[key] = data
+        while len(_YAML_CACHE) > _YAML_CACHE_MAX:
+            _YAML_CACHE.popitem(last=False)
+    return copy.deepcopy(data)
+
+
+def invalidate() -> None:
+    """Drop every cached YAML parse and EnvConfig (mainly for tests)."""
+    with _YAML_LOCK:
+        _YAML_CACHE.clear()
+    _env_config_from_yaml.cache_clear()
+
 
 # -----------------------------
 # Dataclasses (schema)
 # -----------------------------
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class FeeModel:
     commission_per_share: float = 0.0
     commission_pct_notional: float = 0.0005
@@ -25,7 +125,7 @@ class FeeModel:
     half_spread_bps: float = 0.0
 
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class MarginConfig:
     max_gross_leverage: float = 1.0
     maintenance_margin: float = 0.25
@@ -37,7 +137,7 @@ class MarginConfig:
     max_drawdown: float = 0.0              # fraction of equity; kill if exceeded
 
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class ExecConfig:
     order_type: Literal["market", "limit"] = "market"
     limit_offset_bps: float = 0.0
@@ -50,7 +150,7 @@ class ExecConfig:
     fill_policy: Literal["next_open", "vwap_window"] = "next_open"
 
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class RewardConfig:
     mode: Literal["delta_nav", "log_nav"] = "delta_nav"
     w_drawdown: float = 0.0
@@ -63,7 +163,7 @@ class RewardConfig:
     sharpe_scale: float = 0.0
 
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class EpisodeConfig:
     # Core
     lookback: int = 64
@@ -82,14 +182,22 @@ class EpisodeConfig:
     min_hold_bars: int = 0                # minimum bars to hold before flipping position
 
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class FeatureConfig:
     use_custom_pipeline: bool = True
     indicators: Sequence[str] = ("logret", "rsi14")
     window: int = 64
+    dtype: Literal["float32", "float64"] = "float32"   # storage dtype of cached panel features
+
+
+# Field names per sub-config, resolved once for _filter_kwargs
+_FIELDS: Dict[type, frozenset] = {
+    c: frozenset(c.__dataclass_fields__)  # type: ignore[attr-defined]
+    for c in (FeeModel, MarginConfig, ExecConfig, RewardConfig, EpisodeConfig, FeatureConfig)
+}
 
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class EnvConfig:
     symbols: Sequence[str] = ("AAPL", "MSFT")
     interval: str = "1d"
@@ -116,13 +224,20 @@ class EnvConfig:
         """
         if not isinstance(data, dict):
             return {}
-        valid = cls.__dataclass_fields__.keys()  # type: ignore[attr-defined]
+        valid = _FIELDS.get(cls)
+        if valid is None:
+            valid = frozenset(cls.__dataclass_fields__)  # type: ignore[attr-defined]
         return {k: v for k, v in data.items() if k in valid}
 
     @classmethod
     def from_yaml(cls, path: str | Path) -> "EnvConfig":
-        d = yaml.safe_load(Path(path).read_text()) or {}
+        # Frozen and never mutated, so one instance per file version is shared
+        p = Path(path)
+        st = p.stat()
+        return _env_config_from_yaml(str(p.resolve()), st.st_mtime_ns, st.st_size)
 
+    @classmethod
+    def _from_dict(cls, d: Dict[str, Any]) -> "EnvConfig":
         def mk(subcls, key):
             subraw = d.get(key, {})
             return subcls(**cls._filter_kwargs(subcls, subraw))
@@ -144,3 +259,8 @@ class EnvConfig:
 
     def to_dict(self) -> Dict[str, Any]:
         return asdict(self)
+
+
+@functools.lru_cache(maxsize=64)
+def _env_config_from_yaml(path: str, mtime_ns: int, size: int) -> EnvConfig:
+    return EnvConfig._from_dict(load_yaml(path) or {})
@@ -1,13 +1,26 @@
 # stockbot/env/data_adapter.py
+import hashlib
+import os
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
 import numpy as np, pandas as pd
 from datetime import datetime, date
-from typing import Sequence, Optional, Dict
+from functools import lru_cache, reduce
+from operator import attrgetter
+from pathlib import Path
+from typing import Sequence, Optional, Dict, Tuple
 from importlib import import_module
 
 # NOTE: keep this import path aligned with your ingestion package name
 from stockbot.ingestion.ingestion_base import IngestionProvider, BarInterval, AssetType
 from .config import EnvConfig, FeatureConfig
 
+try:
+    import bottleneck as _bn  # type: ignore
+except Exception:  # pragma: no cover - optional C moving-window kernels
+    _bn = None
+
 _INTERVAL_MAP = {
     "1m": "1min", "5m": "5min", "15m": "15min", "30m": "30min", "60m": "60min",
     "1d": "1d", "1w": "1w", "1mo": "1mo"
@@ -29,13 +42,62 @@ def _parse_dt(s):
     return datetime.fromisoformat(str(s))
 
 
+def _rolling(s: pd.Series, window: int, how: str) -> pd.Series:
+    """``s.rolling(window).<how>()`` for how in mean/sum/min/max.
+
+    Uses bottleneck's move_* kernels when installed (same NaN/min-periods
+    semantics, a fraction of pandas' per-call overhead). Rolling std always stays
+    on pandas: bottleneck's running-sum variance leaves ~1e-7 residue on flat
+    windows where pandas reports exactly 0, which the z-scores below rely on.
+    """
+    if _bn is None or window > len(s):
+        return getattr(s.rolling(window), how)()
+    arr = getattr(_bn, f"move_{how}")(s.to_numpy(dtype=np.float64), window)
+    return pd.Series(arr, index=s.index, name=s.name)
+
+
+def _rolling_slope(s: pd.Series, window: int) -> pd.Series:
+    """OLS slope of ``s`` against 0..window-1 over each trailing window.
+
+    The centred x weights sum to zero, so the slope is one dot product per
+    window (a single matmul over a strided view) instead of a Python callback
+    per row through ``rolling().apply``. Windows containing NaN yield NaN.
+    """
+    y = s.to_numpy(dtype=np.float64)
+    res = np.full(y.shape[0], np.nan)
+    if y.shape[0] >= window:
+        x = np.arange(window, dtype=np.float64)
+        xc = x - x.mean()
+        res[window - 1:] = np.lib.stride_tricks.sliding_window_view(y, window) @ (xc / np.sum(xc ** 2))
+    return pd.Series(res, index=s.index, name=s.name)
+
+
+def _pct_change(c: np.ndarray, k: int) -> np.ndarray:
+    """``Series.pct_change(k)`` on a float array, including its default pad-fill of gaps."""
+    nan = np.isnan(c)
+    if nan.any():
+        pos = np.where(nan, 0, np.arange(c.shape[0]))
+        c = c[np.maximum.accumulate(pos)]
+    r = np.full(c.shape[0], np.nan)
+    if c.shape[0] > k:
+        with np.errstate(divide="ignore", invalid="ignore"):
+            np.divide(c[k:], c[:-k], out=r[k:])
+        r[k:] -= 1.0
+    return r
+
+
 def _rsi(s: pd.Series, n: int) -> pd.Series:
-    d = s.diff()
-    up, dn = d.clip(lower=0), -d.clip(upper=0)
-    ema_up = up.ewm(alpha=1 / n, adjust=False).mean()
-    ema_dn = dn.ewm(alpha=1 / n, adjust=False).mean().replace(0, 1e-9)
-    rs = ema_up / ema_dn
-    return 100 - (100 / (1 + rs))
+    # Gains and losses share one two-column ewm pass; the clip/divide steps stay
+    # in numpy so no intermediate Series are built.
+    c = s.to_numpy(dtype=np.float64)
+    d = np.empty_like(c)
+    d[:1] = np.nan
+    np.subtract(c[1:], c[:-1], out=d[1:])
+    updn = np.column_stack((np.maximum(d, 0.0), np.maximum(-d, 0.0)))
+    ema = pd.DataFrame(updn).ewm(alpha=1 / n, adjust=False).mean().to_numpy()
+    ema_up, ema_dn = ema[:, 0], ema[:, 1]
+    ema_dn[ema_dn == 0] = 1e-9
+    return pd.Series(100 - (100 / (1 + ema_up / ema_dn)), index=s.index, name=s.name)
 
 
 def compute_indicators(df: pd.DataFrame, indicators: Sequence[str]) -> pd.DataFrame:
@@ -44,9 +106,59 @@ def compute_indicators(df: pd.DataFrame, indicators: Sequence[str]) -> pd.DataFr
     All NaNs are filled at the end; intermediate rolling NaNs are forward/back filled sensibly.
     """
     out = df.copy()
+    close = out["close"]
+    close_np = close.to_numpy(dtype=np.float64)
     # defensive clip to avoid log of non-positive in synthetic or bad ticks
-    logp = np.log(out["close"].clip(lower=1e-9))
-    logret = logp.diff()
+    logp = np.log(np.maximum(close_np, 1e-9))
+    logret_np = np.empty_like(logp)
+    logret_np[:1] = np.nan
+    np.subtract(logp[1:], logp[:-1], out=logret_np[1:])
+    logret = pd.Series(logret_np, index=out.index)
+
+    # Intermediates shared between indicators (rolling stats, EMAs, true range)
+    # are computed on first use and reused, so each costs one pass over the data.
+    memo: Dict[tuple, pd.Series] = {}
+
+    def shared(key: tuple, fn) -> pd.Series:
+        if key not in memo:
+            memo[key] = fn()
+        return memo[key]
+
+    def ema(span: int) -> pd.Series:
+        return shared(("ema", span), lambda: close.ewm(span=span, adjust=False).mean())
+
+    def roll_mean20() -> pd.Series:
+        return shared(("mean", 20), lambda: _rolling(close, 20, "mean"))
+
+    def roll_std20() -> pd.Series:
+        return shared(("std", 20), lambda: close.rolling(20).std())
+
+    def true_range() -> pd.Series:
+        def _tr():
+            high = out["high"].to_numpy(dtype=np.float64)
+            low = out["low"].to_numpy(dtype=np.float64)
+            c = close.to_numpy(dtype=np.float64)
+            prev_close = np.empty_like(c)
+            prev_close[:1] = np.nan
+            prev_close[1:] = c[:-1]
+            # fmax skips a NaN operand like DataFrame.max(axis=1) does
+            tr = np.fmax(np.fmax(high - low, np.abs(high - prev_close)), np.abs(low - prev_close))
+            return pd.Series(tr, index=out.index)
+        return shared(("tr",), _tr)
+
+    def atr14() -> pd.Series:
+        return shared(("atr", 14), lambda: _rolling(true_range(), 14, "mean"))
+
+    def stoch_k3() -> pd.Series:
+        def _k():
+            low14 = _rolling(out["low"], 14, "min")
+            high14 = _rolling(out["high"], 14, "max")
+            k = (close - low14) / (high14 - low14 + 1e-9)
+            return _rolling(k, 3, "mean")
+        return shared(("stoch_k",), _k)
+
+    def pct10() -> pd.Series:
+        return shared(("pct", 10), lambda: pd.Series(_pct_change(close_np, 10), index=out.index))
 
     # Expand convenience sets/aliases
     inds = list(indicators)
@@ -65,16 +177,16 @@ def compute_indicators(df: pd.DataFrame, indicators: Sequence[str]) -> pd.DataFr
             out["logret"] = logret.fillna(0.0)
 
         elif ind == "logret5":
-            out["logret5"] = logret.rolling(5).sum().fillna(0.0)
+            out["logret5"] = _rolling(logret, 5, "sum").fillna(0.0)
 
         elif ind == "logret20":
-            out["logret20"] = logret.rolling(20).sum().fillna(0.0)
+            out["logret20"] = _rolling(logret, 20, "sum").fillna(0.0)
 
         elif ind == "ret5":
-            out["ret5"] = out["close"].pct_change(5).fillna(0.0)
+            out["ret5"] = pd.Series(_pct_change(close_np, 5), index=out.index).fillna(0.0)
 
         elif ind == "ret10":
-            out["ret10"] = out["close"].pct_change(10).fillna(0.0)
+            out["ret10"] = pct10().fillna(0.0)
 
         elif ind == "vol10":
             out["vol10"] = logret.rolling(10).std().fillna(0.0)
@@ -83,122 +195,172 @@ def compute_indicators(df: pd.DataFrame, indicators: Sequence[str]) -> pd.DataFr
             out["vol20"] = logret.rolling(20).std().fillna(0.0)
 
         elif ind == "rsi14":
-            out["rsi14"] = _rsi(out["close"], 14).fillna(0.0)
+            out["rsi14"] = _rsi(close, 14).fillna(0.0)
 
         elif ind == "roc10":
-            out["roc10"] = out["close"].pct_change(10).fillna(0.0)
+            out["roc10"] = pct10().fillna(0.0)
 
         elif ind == "macd":
-            ema12 = out["close"].ewm(span=12, adjust=False).mean()
-            ema26 = out["close"].ewm(span=26, adjust=False).mean()
-            macd = ema12 - ema26
+            macd = ema(12) - ema(26)
             signal = macd.ewm(span=9, adjust=False).mean()
             out["macd"] = macd.fillna(0.0)
             out["macd_signal"] = signal.fillna(0.0)
 
         elif ind == "stoch_k":
-            low14 = out["low"].rolling(14).min()
-            high14 = out["high"].rolling(14).max()
-            k = (out["close"] - low14) / (high14 - low14 + 1e-9)
-            out["stoch_k"] = k.rolling(3).mean().fillna(0.0)
+            out["stoch_k"] = stoch_k3().fillna(0.0)
 
         elif ind == "stoch_d":
-            low14 = out["low"].rolling(14).min()
-            high14 = out["high"].rolling(14).max()
-            k = (out["close"] - low14) / (high14 - low14 + 1e-9)
-            k = k.rolling(3).mean()
-            out["stoch_d"] = k.rolling(3).mean().fillna(0.0)
+            out["stoch_d"] = _rolling(stoch_k3(), 3, "mean").fillna(0.0)
 
         elif ind == "sma5":
-            out["sma5"] = out["close"].rolling(5).mean().bfill().fillna(0.0)
+            out["sma5"] = _rolling(close, 5, "mean").bfill().fillna(0.0)
 
         elif ind == "sma20":
-            out["sma20"] = out["close"].rolling(20).mean().bfill().fillna(0.0)
+            out["sma20"] = roll_mean20().bfill().fillna(0.0)
 
         elif ind == "sma50":
-            out["sma50"] = out["close"].rolling(50).mean().bfill().fillna(0.0)
+            out["sma50"] = _rolling(close, 50, "mean").bfill().fillna(0.0)
 
         elif ind == "ema12":
-            out["ema12"] = out["close"].ewm(span=12, adjust=False).mean().fillna(0.0)
+            out["ema12"] = ema(12).fillna(0.0)
 
         elif ind == "ema26":
-            out["ema26"] = out["close"].ewm(span=26, adjust=False).mean().fillna(0.0)
+            out["ema26"] = ema(26).fillna(0.0)
 
         elif ind == "slope20":
-            x = np.arange(20)
-            denom = np.sum((x - x.mean()) ** 2)
-
-            def _slope(y):
-                y = np.asarray(y)
-                return np.sum((x - x.mean()) * (y - y.mean())) / denom
-
-            out["slope20"] = out["close"].rolling(20).apply(_slope, raw=True).fillna(0.0)
+            out["slope20"] = shared(("slope", 20), lambda: _rolling_slope(close, 20)).fillna(0.0)
 
         elif ind == "atr14" or ind == "true_range":
-            high, low, close = out["high"], out["low"], out["close"]
-            prev_close = close.shift(1)
-            tr = pd.concat([
-                (high - low),
-                (high - prev_close).abs(),
-                (low - prev_close).abs()
-            ], axis=1).max(axis=1)
-            out["true_range"] = tr.fillna(0.0)
+            out["true_range"] = true_range().fillna(0.0)
             if ind == "atr14":
-                out["atr14"] = tr.rolling(14).mean().fillna(0.0)
+                out["atr14"] = atr14().fillna(0.0)
 
         elif ind == "bbands":
-            m = out["close"].rolling(20).mean()
-            s = out["close"].rolling(20).std()
+            m, s = roll_mean20(), roll_std20()
             out["bb_upper"] = (m + 2 * s).fillna(0.0)
             out["bb_lower"] = (m - 2 * s).fillna(0.0)
 
         elif ind == "bb_upper":
-            m = out["close"].rolling(20).mean()
-            s = out["close"].rolling(20).std()
-            out["bb_upper"] = (m + 2 * s).fillna(0.0)
+            out["bb_upper"] = (roll_mean20() + 2 * roll_std20()).fillna(0.0)
 
         elif ind == "bb_lower":
-            m = out["close"].rolling(20).mean()
-            s = out["close"].rolling(20).std()
-            out["bb_lower"] = (m - 2 * s).fillna(0.0)
+            out["bb_lower"] = (roll_mean20() - 2 * roll_std20()).fillna(0.0)
 
         elif ind == "bb_width":
-            m = out["close"].rolling(20).mean()
-            s = out["close"].rolling(20).std()
+            m, s = roll_mean20(), roll_std20()
             upper = m + 2 * s
             lower = m - 2 * s
             width = (upper - lower) / (m.replace(0, np.nan))
             out["bb_width"] = width.replace([np.inf, -np.inf], 0.0).fillna(0.0)
 
         elif ind == "keltner_width":
-            ema = out["close"].ewm(span=20, adjust=False).mean()
-            prev_close = out["close"].shift(1)
-            tr = pd.concat([
-                (out["high"] - out["low"]),
-                (out["high"] - prev_close).abs(),
-                (out["low"] - prev_close).abs()
-            ], axis=1).max(axis=1)
-            atr = tr.rolling(14).mean()
-            upper = ema + 2 * atr
-            lower = ema - 2 * atr
-            width = (upper - lower) / (ema.replace(0, np.nan))
+            mid = ema(20)
+            atr = atr14()
+            upper = mid + 2 * atr
+            lower = mid - 2 * atr
+            width = (upper - lower) / (mid.replace(0, np.nan))
             out["keltner_width"] = width.replace([np.inf, -np.inf], 0.0).fillna(0.0)
 
         elif ind == "vol_z20":
-            mean = out["volume"].rolling(20).mean()
+            mean = _rolling(out["volume"], 20, "mean")
             std = out["volume"].rolling(20).std().replace(0, np.nan)
             out["vol_z20"] = ((out["volume"] - mean) / std).fillna(0.0)
 
         elif ind == "amihud":
             # |return| / dollar volume (proxy for price impact)
-            dv = (out["close"].abs() * out["volume"].abs()).replace(0, np.nan)
+            dv = (close.abs() * out["volume"].abs()).replace(0, np.nan)
             illiq = logret.abs() / dv
             out["amihud"] = illiq.replace([np.inf, -np.inf], 0.0).fillna(0.0)
 
     return out.fillna(0.0)
 
 
+_BASE_COLS = ("open", "high", "low", "close", "volume")
+_ALIAS_MINIMAL = (
+    "logret",
+    "logret5",
+    "logret20",
+    "vol10",
+    "vol20",
+    "atr14",
+    "bb_width",
+    "keltner_width",
+    "vol_z20",
+    "amihud",
+)
+
+
+@lru_cache(maxsize=64)
+def _expand_indicators(indicators: Tuple[str, ...]) -> Tuple[str, ...]:
+    """OHLCV plus ``indicators`` with meta names expanded.
+
+    "bbands" becomes ["bb_upper", "bb_lower"] and the "minimal" aliases become
+    their constituent features.
+    """
+    expanded: list[str] = []
+    for ind in indicators:
+        if ind in ("minimal", "minimal_core"):
+            expanded.extend(_ALIAS_MINIMAL)
+        elif ind == "bbands":
+            expanded.extend(["bb_upper", "bb_lower"])
+        else:
+            expanded.append(ind)
+    return _BASE_COLS + tuple(expanded)
+
+
+# With STOCKBOT_FEATURE_CACHE=1, engineered frames from recent _build_features
+# calls are kept keyed by input content and feature config, so the same bars seen
+# by several envs (walk-forward folds, eval/train pairs) are only featurised once
+# per process. Entries are (frame, nbytes); the oldest are evicted past the budget.
+_FEATURE_CACHE: "OrderedDict[tuple, Tuple[pd.DataFrame, int]]" = OrderedDict()
+_FEATURE_CACHE_MAX_BYTES = 256 * 1024 * 1024
+_FEATURE_LOCK = threading.Lock()
+
+
+def _feature_cache_enabled() -> bool:
+    return os.environ.get("STOCKBOT_FEATURE_CACHE", "").strip().lower() in ("1", "true", "yes")
+
+
+def _feature_key(df: pd.DataFrame, feat_cfg: FeatureConfig) -> tuple:
+    digest = hashlib.blake2b(
+        pd.util.hash_pandas_object(df, index=True).to_numpy().tobytes(), digest_size=16
+    ).hexdigest()
+    return (
+        digest, tuple(df.columns), tuple(map(str, df.dtypes)), str(df.index.dtype),
+        bool(feat_cfg.use_custom_pipeline), tuple(feat_cfg.indicators),
+    )
+
+
 def _build_features(df: pd.DataFrame, feat_cfg: FeatureConfig) -> pd.DataFrame:
+    """Engineered features for ``df``; with ``STOCKBOT_FEATURE_CACHE=1`` repeated
+    inputs are served from an in-process LRU.
+
+    Always returns a frame the caller owns, so callers may modify the result.
+    """
+    if not _feature_cache_enabled():
+        return _compute_features(df, feat_cfg)
+    try:
+        key = _feature_key(df, feat_cfg)
+    except TypeError:  # unhashable cell values; just compute
+        return _compute_features(df, feat_cfg)
+    with _FEATURE_LOCK:
+        hit = _FEATURE_CACHE.get(key)
+        if hit is not None:
+            _FEATURE_CACHE.move_to_end(key)
+            return hit[0].copy()
+    feats = _compute_features(df, feat_cfg)
+    nbytes = int(feats.memory_usage(index=True).sum())
+    if nbytes <= _FEATURE_CACHE_MAX_BYTES:
+        with _FEATURE_LOCK:
+            _FEATURE_CACHE[key] = (feats, nbytes)
+            total = sum(n for _, n in _FEATURE_CACHE.values())
+            while total > _FEATURE_CACHE_MAX_BYTES:
+                _, (_, n) = _FEATURE_CACHE.popitem(last=False)
+                total -= n
+    return feats.copy()
+
+
+def _compute_features(df: pd.DataFrame, feat_cfg: FeatureConfig) -> pd.DataFrame:
     # try user pipeline first
     if feat_cfg.use_custom_pipeline:
         try:
@@ -212,6 +374,52 @@ def _build_features(df: pd.DataFrame, feat_cfg: FeatureConfig) -> pd.DataFrame:
     return compute_indicators(df, feat_cfg.indicators)
 
 
+def _bars_frame(bars) -> pd.DataFrame:
+    """OHLCV DataFrame indexed by ``ts`` (ascending) from provider PriceBars.
+
+    Each column is filled straight into a float64 array, avoiding a dict per bar
+    and pandas' record-wise type inference.
+    """
+    bars = bars if isinstance(bars, list) else list(bars)
+    n = len(bars)
+    cols = {
+        f: np.fromiter(map(attrgetter(f), bars), dtype=np.float64, count=n)
+        for f in ("open", "high", "low", "close", "volume")
+    }
+    df = pd.DataFrame(cols, index=pd.DatetimeIndex([b.ts for b in bars], name="ts"))
+    if not df.index.is_monotonic_increasing:
+        df = df.sort_index()
+    return df
+
+
+def _downcast_features(df: pd.DataFrame, dtype: np.dtype) -> pd.DataFrame:
+    """Store indicator columns as ``dtype``; OHLCV stays float64 for fills and PnL."""
+    cast = {
+        c: dtype for c, dt in df.dtypes.items()
+        if dt.kind == "f" and dt != dtype and c not in _BASE_COLS
+    }
+    return df.astype(cast, copy=False) if cast else df
+
+
+def _common_index(indexes: Sequence[pd.Index]) -> pd.Index:
+    """Intersection of ``indexes`` (sorted), as ``Index.intersection`` would give."""
+    first = indexes[0]
+    if all(
+        isinstance(ix, pd.DatetimeIndex) and ix.dtype == first.dtype
+        and ix.is_monotonic_increasing and ix.is_unique
+        for ix in indexes
+    ):
+        # Sorted merges over the int64 epoch values instead of Index rebuilds
+        common = reduce(
+            lambda a, b: np.intersect1d(a, b, assume_unique=True), [ix.asi8 for ix in indexes]
+        )
+        out = first.take(np.searchsorted(first.asi8, common))
+        if any(ix.name != first.name for ix in indexes):
+            out = out.rename(None)
+        return out
+    return reduce(lambda a, b: a.intersection(b), indexes)
+
+
 # ---------- Single-asset (kept for StockTradingEnv) ----------
 class BarWindowSource:
     def __init__(self, provider: IngestionProvider, cfg_or_symbol, interval: Optional[BarInterval] = None,
@@ -233,103 +441,174 @@ class BarWindowSource:
             feat_cfg = FeatureConfig()
 
         bars = provider.get_price_bars(symbol, interval, start, end, AssetType.EQUITY, adjusted=bool(adjusted))
-        df = pd.DataFrame([{
-            "ts": b.ts, "open": b.open, "high": b.high, "low": b.low, "close": b.close, "volume": b.volume
-        } for b in bars])
-        if df.empty:
+        if not bars:
             raise RuntimeError(f"No bars for {symbol}")
-        df = df.sort_values("ts").set_index("ts")
-        self.df = _build_features(df, feat_cfg)
+        self.df = _build_features(_bars_frame(bars), feat_cfg)
+        self._arrays: Dict[tuple, np.ndarray] = {}
 
     def slice(self, start_idx: int, end_idx: int) -> pd.DataFrame:
         return self.df.iloc[start_idx:end_idx]
 
+    def as_array(self, cols: Sequence[str]) -> np.ndarray:
+        """``df[cols]`` as a read-only, C-contiguous (T, F) float32 block.
+
+        Built once per column set, so per-step windows are plain row slices.
+        """
+        key = tuple(cols)
+        arr = self._arrays.get(key)
+        if arr is None:
+            arr = np.ascontiguousarray(self.df[list(key)].to_numpy(dtype=np.float32))
+            arr.flags.writeable = False
+            self._arrays[key] = arr
+        return arr
+
+
+# ---------- Feature panel cache ----------
+# With STOCKBOT_PANEL_CACHE=1, engineered panels are pickled under this directory,
+# keyed by everything that determines their content, so repeated env construction
+# (rollout workers, sweeps) skips ingestion and indicator computation.
+_PANEL_CACHE_DIR = Path(os.environ.get("STOCKBOT_PANEL_CACHE_DIR") or Path.home() / ".cache" / "stockbot" / "panels")
+_PANEL_CACHE_VERSION = 1
+# Symbols fetched and featurised concurrently when building a panel
+_FETCH_WORKERS = 8
+
+
+def _code_stamp(use_custom_pipeline: bool) -> tuple:
+    # Editing the feature code invalidates cached panels
+    files = [Path(__file__)]
+    if use_custom_pipeline:
+        files.append(Path(__file__).resolve().parents[1] / "ingestion" / "feature_engineering.py")
+    stamp = []
+    for f in files:
+        try:
+            st = f.stat()
+            stamp.append((f.name, st.st_mtime_ns, st.st_size))
+        except OSError:
+            stamp.append((f.name, None, None))
+    return tuple(stamp)
+
+
+def _panel_cache_path(provider: IngestionProvider, cfg: EnvConfig) -> Optional[Path]:
+    """Cache file for this (provider, query, features) combination, or None.
+
+    Opt-in via ``STOCKBOT_PANEL_CACHE=1``. Ranges that are open-ended or reach
+    today are never cached since the provider may return new bars later, and
+    neither are providers without a ``cache_identity()``.
+    """
+    if os.environ.get("STOCKBOT_PANEL_CACHE", "").strip().lower() not in ("1", "true", "yes"):
+        return None
+    end = _parse_dt(cfg.end)
+    if end is None or end.date() >= date.today():
+        return None
+    ident = getattr(provider, "cache_identity", None)
+    if ident is None:
+        return None
+    feat = cfg.features
+    key = repr((
+        _PANEL_CACHE_VERSION,
+        tuple(ident()),
+        tuple(cfg.symbols), cfg.interval, str(_parse_dt(cfg.start)), str(end),
+        bool(cfg.adjusted), bool(feat.use_custom_pipeline), tuple(feat.indicators), str(feat.dtype),
+        _code_stamp(bool(feat.use_custom_pipeline)),
+    ))
+    return _PANEL_CACHE_DIR / f"{hashlib.blake2b(key.encode(), digest_size=8).hexdigest()}.pkl"
+
+
+def _read_panel_cache(path: Path):
+    try:
+        panel, index, cols = pd.read_pickle(path)
+        return panel, index, cols
+    except Exception:
+        return None
+
+
+def _write_panel_cache(path: Path, payload: tuple) -> None:
+    try:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+        pd.to_pickle(payload, tmp)
+        os.replace(tmp, path)
+    except Exception:
+        pass  # best-effort; an unwritable cache dir just means no reuse
+
 
 # ---------- Multi-asset panel (for PortfolioTradingEnv) ----------
 class PanelSource:
     def __init__(self, provider: IngestionProvider, cfg: EnvConfig):
-        interval = _BAR_MAP[_INTERVAL_MAP[cfg.interval]]
         self.symbols = list(cfg.symbols)
-        frames: Dict[str, pd.DataFrame] = {}
+        cache_path = _panel_cache_path(provider, cfg)
+        cached = _read_panel_cache(cache_path) if cache_path is not None else None
+        if cached is not None:
+            self.panel, self.index, self._cols = cached
+        else:
+            self._build(provider, cfg)
+            if cache_path is not None:
+                _write_panel_cache(cache_path, (self.panel, self.index, self._cols))
+        # (T, N, F) copy of the required features in cfg.features.dtype, in
+        # self.symbols order, so per-step lookback windows are a single strided view
+        self._tensor = np.stack(
+            [self.panel[sym][self._cols].to_numpy() for sym in self.symbols], axis=1
+        ).astype(np.dtype(cfg.features.dtype), copy=False)
+        self._tensor.flags.writeable = False
 
-        # fetch + feature engineering per symbol
-        for sym in self.symbols:
-            bars = provider.get_price_bars(
-                sym, interval, _parse_dt(cfg.start), _parse_dt(cfg.end),
-                AssetType.EQUITY, adjusted=cfg.adjusted
+        # ensure there is enough data for lookback + at least one step
+        min_needed = int(cfg.episode.lookback) + 2
+        if len(self.index) < min_needed:
+            raise RuntimeError(
+                f"Not enough data after features for lookback={cfg.episode.lookback}. "
+                f"Have {len(self.index)} rows; need ≥ {min_needed}. "
+                "Use a longer date range, fewer/shorter-window indicators, or smaller lookback."
             )
-            df = pd.DataFrame([{
-                "ts": b.ts, "open": b.open, "high": b.high, "low": b.low, "close": b.close, "volume": b.volume
-            } for b in bars])
-            if df.empty:
+
+    def _build(self, provider: IngestionProvider, cfg: EnvConfig) -> None:
+        interval = _BAR_MAP[_INTERVAL_MAP[cfg.interval]]
+        start, end = _parse_dt(cfg.start), _parse_dt(cfg.end)
+        feat_dtype = np.dtype(cfg.features.dtype)
+
+        # fetch + feature engineering per symbol; fetches are I/O bound and the
+        # indicator kernels spend most of their time in numpy, so symbols overlap
+        def _load(sym: str) -> pd.DataFrame:
+            bars = provider.get_price_bars(sym, interval, start, end, AssetType.EQUITY, adjusted=cfg.adjusted)
+            if not bars:
                 raise RuntimeError(f"No bars for {sym}")
-            df = df.sort_values("ts").set_index("ts")
-            frames[sym] = _build_features(df, cfg.features)
+            return _downcast_features(_build_features(_bars_frame(bars), cfg.features), feat_dtype)
+
+        if len(self.symbols) > 1:
+            with ThreadPoolExecutor(max_workers=min(_FETCH_WORKERS, len(self.symbols))) as ex:
+                frames = dict(zip(self.symbols, ex.map(_load, self.symbols)))
+        else:
+            frames = {sym: _load(sym) for sym in self.symbols}
 
          # align by intersection of all original indexes first
-        idx = None
-        for df in frames.values():
-            idx = df.index if idx is None else idx.intersection(df.index)
-        if idx is None or len(idx) == 0:
+        idx = _common_index([frames[sym].index for sym in self.symbols])
+        if len(idx) == 0:
             raise RuntimeError("No overlapping timestamps across symbols")
 
-        # drop NaN only on required columns, recompute a new common index
-        # expand meta indicators like "bbands" -> ["bb_upper", "bb_lower"] and
-        # expand the alias "minimal" into its constituent features
-        base_cols = ["open", "high", "low", "close", "volume"]
-        expanded_inds: list[str] = []
-        alias_minimal = [
-            "logret",
-            "logret5",
-            "logret20",
-            "vol10",
-            "vol20",
-            "atr14",
-            "bb_width",
-            "keltner_width",
-            "vol_z20",
-            "amihud",
-        ]
-        for ind in list(cfg.features.indicators):
-            if ind in ("minimal", "minimal_core"):
-                expanded_inds.extend(alias_minimal)
-            elif ind == "bbands":
-                expanded_inds.extend(["bb_upper", "bb_lower"])
-            else:
-                expanded_inds.append(ind)
-        required = base_cols + expanded_inds
-
-        self.panel: Dict[str, pd.DataFrame] = {}
-        for sym in self.symbols:
-            df = frames[sym].reindex(idx)
-            df = df.dropna(subset=required)  # keep rows where all required features exist
-            self.panel[sym] = df
-
-        # recompute the final common index after dropna
-        common = None
-        for df in self.panel.values():
-            common = df.index if common is None else common.intersection(df.index)
-        if common is None or len(common) == 0:
-            raise RuntimeError("No overlapping timestamps across symbols after feature engineering.")
+        required = list(_expand_indicators(tuple(cfg.features.indicators)))
 
-        # reindex all to the final common index
-        for sym in self.symbols:
-            self.panel[sym] = self.panel[sym].reindex(common)
+        # One alignment pass: reindex to the shared index, then keep only rows where
+        # every symbol has all required features (what dropna + re-intersect did)
+        panel: Dict[str, pd.DataFrame] = {sym: frames[sym].reindex(idx) for sym in self.symbols}
+        keep = np.logical_and.reduce(
+            [panel[sym][required].notna().to_numpy().all(axis=1) for sym in self.symbols]
+        )
+        if not keep.any():
+            raise RuntimeError("No overlapping timestamps across symbols after feature engineering.")
+        common = idx
+        if not keep.all():
+            common = idx[keep]
+            panel = {sym: df[keep] for sym, df in panel.items()}
 
+        self.panel = panel
         self.index = common
         self._cols = required
 
-        # ensure there is enough data for lookback + at least one step
-        min_needed = int(cfg.episode.lookback) + 2
-        if len(self.index) < min_needed:
-            raise RuntimeError(
-                f"Not enough data after features for lookback={cfg.episode.lookback}. "
-                f"Have {len(self.index)} rows; need ≥ {min_needed}. "
-                "Use a longer date range, fewer/shorter-window indicators, or smaller lookback."
-            )
-
     def slice(self, start_idx: int, end_idx: int) -> Dict[str, pd.DataFrame]:
         return {s: df.iloc[start_idx:end_idx] for s, df in self.panel.items()}
 
+    def slice_ndarray(self, start_idx: int, end_idx: int) -> np.ndarray:
+        """Rows ``start_idx:end_idx`` as a read-only (rows, N, F) view in ``cfg.features.dtype``."""
+        return self._tensor[start_idx:end_idx]
+
     def cols_required(self) -> Sequence[str]:
         return self._cols
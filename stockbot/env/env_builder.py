@@ -1,8 +1,10 @@
 from __future__ import annotations
 
 from pathlib import Path
-from typing import Dict, Tuple, Any
+from typing import Dict, Tuple, Any, Optional
+import hashlib
 import json
+import os
 import numpy as np
 import pandas as pd
 
@@ -12,6 +14,48 @@ from stockbot.ingestion.feature_engineering import build_features
 from stockbot.features.builder import FeatureSpec
 
 
+_HMM_CACHE_VERSION = 1
+
+
+def _hmm_cache_path(run_path: Path, manifest: Dict, cfg: Dict, train_start, train_end, windows: np.ndarray) -> Optional[Path]:
+    """Return the cache file for a fitted regime HMM, or ``None`` to skip caching."""
+    if os.environ.get("STOCKBOT_HMM_NOCACHE"):
+        return None
+    try:
+        src = Path(__file__).resolve().parents[1] / "signals" / "hmm_regime.py"
+        st = src.stat()
+        code = [st.st_mtime_ns, st.st_size]
+    except OSError:
+        code = None
+    h = hashlib.blake2b(digest_size=8)
+    h.update(json.dumps(
+        [_HMM_CACHE_VERSION, manifest, cfg, train_start, train_end, list(windows.shape), str(windows.dtype), code],
+        sort_keys=True, default=str,
+    ).encode())
+    # Hash every window byte straight from the buffer (no copy when contiguous)
+    h.update(np.ascontiguousarray(windows).data)
+    return run_path.parent / ".hmm_cache" / f"{h.hexdigest()}.npz"
+
+
+def _read_hmm_cache(path: Path) -> Optional[Dict[str, np.ndarray]]:
+    try:
+        with np.load(path) as data:
+            return {k: data[k] for k in data.files}
+    except Exception:
+        return None
+
+
+def _write_hmm_cache(path: Path, fitted: Dict[str, np.ndarray]) -> None:
+    try:  # best-effort; a failed write only costs a refit next time
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+        with open(tmp, "wb") as fh:
+            np.savez(fh, **fitted)
+        os.replace(tmp, path)
+    except Exception:
+        pass
+
+
 def prepare_env(payload: Dict[str, Any], run_dir: str | Path) -> Tuple[Any, Dict[str, Any]]:
     """Prepare windows + metadata for an env run and persist artifacts.
 
@@ -75,25 +119,39 @@ def prepare_env(payload: Dict[str, Any], run_dir: str | Path) -> Tuple[Any, Dict
         from stockbot.signals.hmm_regime import HMMConfig, GaussianDiagHMM  # lazy import
 
         cfg = regime.get("config", {})
-        hmm = GaussianDiagHMM(HMMConfig(**cfg))
-        X2d = windows.reshape(windows.shape[0], -1)
         train_start = regime.get("train_start")
         train_end = regime.get("train_end")
-        if train_start and train_end:
-            ts = pd.to_datetime(meta["timestamps"])
-            mask = (ts >= pd.to_datetime(train_start)) & (ts <= pd.to_datetime(train_end))
-            hmm.fit(X2d[mask])
-        else:
-            hmm.fit(X2d)
-        gamma_seq = hmm.predict_proba(X2d)
+        # Same data + HMM config -> same fit; reuse it across runs
+        cache_path = _hmm_cache_path(run_path, manifest, cfg, train_start, train_end, windows)
+        fitted = _read_hmm_cache(cache_path) if cache_path is not None and cache_path.exists() else None
+        if fitted is None:
+            hmm = GaussianDiagHMM(HMMConfig(**cfg))
+            X2d = windows.reshape(windows.shape[0], -1)  # a view: build_features returns a C-contiguous block
+            if train_start and train_end:
+                ts = pd.to_datetime(meta["timestamps"])
+                mask = (ts >= pd.to_datetime(train_start)) & (ts <= pd.to_datetime(train_end))
+                hmm.fit(X2d[mask])
+            else:
+                hmm.fit(X2d)
+            fitted = {
+                "gamma_seq": hmm.predict_proba(X2d),
+                "transmat": hmm.model.transmat_,
+                "means": hmm.model.means_,
+                "covars": hmm.model.covars_,
+                "feature_mean": hmm.feature_mean_,
+                "feature_std": hmm.feature_std_,
+            }
+            if cache_path is not None:
+                _write_hmm_cache(cache_path, fitted)
+        gamma_seq = fitted["gamma_seq"]
         meta["regime_posteriors"] = gamma_seq
         np.savetxt(run_path / "regime_posteriors.csv", gamma_seq, delimiter=",")
-        np.savetxt(run_path / "transition_matrix.csv", hmm.model.transmat_, delimiter=",")
+        np.savetxt(run_path / "transition_matrix.csv", fitted["transmat"], delimiter=",")
         state_stats = {
-            "means": hmm.model.means_.tolist(),
-            "covars": hmm.model.covars_.tolist(),
-            "feature_mean": hmm.feature_mean_.tolist(),
-            "feature_std": hmm.feature_std_.tolist(),
+            "means": fitted["means"].tolist(),
+            "covars": fitted["covars"].tolist(),
+            "feature_mean": fitted["feature_mean"].tolist(),
+            "feature_std": fitted["feature_std"].tolist(),
         }
         (run_path / "state_stats.json").write_text(json.dumps(state_stats, indent=2))
 
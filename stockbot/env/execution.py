@@ -1,19 +1,24 @@
 from typing import List, Dict, Tuple
 import math
-import statistics
 from collections import defaultdict, deque
+
+import numpy as np
+
 from .orders import Order, Fill
 from .config import ExecConfig, FeeModel
 
+# Below this many orders the per-call numpy overhead outweighs the vector maths
+_VECTOR_MIN_ORDERS = 48
+
 class ExecutionModel:
     def __init__(self, exec_cfg: ExecConfig, fees: FeeModel, participation_cap: float | None = None):
         self.cfg = exec_cfg
         self.fees = fees
-        self._hist: Dict[str, deque[float]] = defaultdict(lambda: deque(maxlen=self.cfg.vol_lookback))
-
-    def _commission(self, qty: float, price: float) -> float:
-        notional = abs(qty) * price
-        return self.fees.commission_per_share * abs(qty) + self.fees.commission_pct_notional * notional
+        # Rolling log-returns over the last ``vol_lookback`` closes, with their
+        # running sum / sum of squares so volatility is O(1) per lookup
+        self._rets: Dict[str, deque[float]] = defaultdict(lambda: deque(maxlen=max(0, self.cfg.vol_lookback - 1)))
+        self._ret_sums: Dict[str, List[float]] = defaultdict(lambda: [0.0, 0.0])
+        self._last_close: Dict[str, float] = {}
 
     def simulate_fills(
         self,
@@ -21,62 +26,147 @@ class ExecutionModel:
         next_bar_prices: Dict[str, Tuple[float,float,float,float]],  # O,H,L,C
         next_bar_volumes: Dict[str, float]
     ) -> List[Fill]:
+        fills: List[Fill] = []
+        if orders:
+            syms = [o.symbol for o in orders]
+            rows = [(*next_bar_prices[s], next_bar_volumes[s], o.qty) for s, o in zip(syms, orders)]
+            fills = self._fill_batch(orders, syms, rows)
+        for sym, (_, _, _, close) in next_bar_prices.items():
+            self._push_close(sym, close)
+        return fills
+
+    def simulate_fills_ohlcv(
+        self,
+        orders: List[Order],
+        ohlcv: np.ndarray,              # (N, 5) O,H,L,C,V of the next bar
+        sym_to_idx: Dict[str, int],     # symbol -> row of ``ohlcv``
+    ) -> List[Fill]:
+        """Array form of :meth:`simulate_fills` for callers holding a dense bar row."""
+        fills: List[Fill] = []
+        bars = ohlcv.tolist()
+        if orders:
+            syms = [o.symbol for o in orders]
+            rows = [(*bars[sym_to_idx[s]], o.qty) for s, o in zip(syms, orders)]
+            fills = self._fill_batch(orders, syms, rows)
+        for sym, i in sym_to_idx.items():
+            self._push_close(sym, bars[i][3])
+        return fills
+
+    def _push_close(self, sym: str, close: float) -> None:
+        prev = self._last_close.get(sym)
+        self._last_close[sym] = close
+        rets = self._rets[sym]
+        if prev is None or not rets.maxlen or prev <= 0 or close <= 0:
+            return
+        r = math.log(close / prev)
+        sums = self._ret_sums[sym]
+        if len(rets) == rets.maxlen:
+            old = rets[0]
+            sums[0] -= old
+            sums[1] -= old * old
+        rets.append(r)
+        sums[0] += r
+        sums[1] += r * r
+
+    def _fill_batch(self, orders: List[Order], syms: List[str], rows: List[tuple]) -> List[Fill]:
+        # ``rows`` holds one (O,H,L,C,V,qty) tuple per order
+        if len(rows) < _VECTOR_MIN_ORDERS:
+            return self._fill_loop(orders, syms, rows)
+        # One (n, 6) array across all orders; Fill objects are only built for
+        # the orders that survive
+        O, H, L, C, V, qty = np.array(rows, dtype=np.float64).T
+        V = np.maximum(1.0, V)
+
+        cap = self.cfg.participation_cap
+        max_qty = cap * V if cap and cap > 0 else np.abs(qty)
+        qty = np.maximum(-max_qty, np.minimum(qty, max_qty))  # clamp to POV
+
+        # lot-size rounding
+        lot = max(1e-9, float(self.cfg.lot_size))
+        aq = np.floor(np.abs(qty) / lot) * lot
+        qty = np.copysign(aq, qty)
+        live = aq >= 1e-8
+
+        market = [o.type == "market" for o in orders]
+        if all(market):
+            px = self._market_px(syms, live, qty, aq, V, O, H, L, C)
+        else:
+            # LIMIT: execute at the open if it gaps through the limit, else at the
+            # limit if the bar's range crosses it; NaN marks "no fill"
+            is_mkt = np.array(market)
+            lim = np.array([np.nan if m or o.limit_price is None else o.limit_price
+                            for m, o in zip(market, orders)], dtype=np.float64)
+            gap = np.where(qty > 0, O <= lim, O >= lim)
+            cross = (L <= lim) & (lim <= H)
+            px = np.where(gap, O, np.where(cross, lim, np.nan))
+            live &= is_mkt | ~np.isnan(px)
+            if is_mkt.any():
+                px = np.where(is_mkt, self._market_px(syms, live & is_mkt, qty, aq, V, O, H, L, C), px)
+
+        # tick rounding on price
+        tick = max(1e-9, float(self.cfg.tick_size))
+        px = np.round(px / tick) * tick
+        commission = self.fees.commission_per_share * aq + self.fees.commission_pct_notional * (aq * px)
+        q_l, px_l, c_l = qty.tolist(), px.tolist(), commission.tolist()
+        return [
+            Fill(orders[i].id, syms[i], q_l[i], px_l[i], c_l[i])
+            for i in np.flatnonzero(live).tolist()
+        ]
+
+    def _fill_loop(self, orders: List[Order], syms: List[str], rows: List[tuple]) -> List[Fill]:
+        # Scalar twin of the array path above: same arithmetic in the same
+        # order, so both give identical fills
         fills: List[Fill] = []
         cap = self.cfg.participation_cap
-        for o in orders:
-            O, H, L, C = next_bar_prices[o.symbol]
-            V = max(1.0, float(next_bar_volumes[o.symbol]))
-            max_qty = cap * V if cap and cap > 0 else abs(o.qty)
-            qty = max(-max_qty, min(o.qty, max_qty))  # clamp to POV
-
-            # lot-size rounding
-            lot = max(1e-9, float(self.cfg.lot_size))
-            qty = math.copysign(math.floor(abs(qty) / lot) * lot, qty)
-            if abs(qty) < 1e-8:
+        lot = max(1e-9, float(self.cfg.lot_size))
+        tick = max(1e-9, float(self.cfg.tick_size))
+        hl_spread = getattr(self.cfg, "spread_source", "fee_model") == "hl"
+        per_share, pct = self.fees.commission_per_share, self.fees.commission_pct_notional
+        for o, sym, (O, H, L, C, V, qty) in zip(orders, syms, rows):
+            V = max(1.0, V)
+            max_qty = cap * V if cap and cap > 0 else abs(qty)
+            qty = max(-max_qty, min(qty, max_qty))  # clamp to POV
+            aq = math.floor(abs(qty) / lot) * lot
+            qty = math.copysign(aq, qty)
+            if aq < 1e-8:
                 continue
 
             if o.type == "market":
-                participation = abs(qty) / V
-                spread_bps = self._spread_bps(o.symbol, O, H, L, C)
-                vol_bps = self._volatility_bps(o.symbol)
-                slip_bps = (spread_bps + vol_bps) * participation
-                slip = (slip_bps * 1e-4) * math.copysign(1.0, qty)
-                px = C * (1.0 + slip)
+                spread_bps = (((H - L) / C) * 1e4 if C != 0 else 0.0) if hl_spread else float(self.fees.slippage_bps)
+                slip_bps = (spread_bps + self._volatility_bps(sym)) * (aq / V)
+                px = C * (1.0 + (slip_bps * 1e-4) * math.copysign(1.0, qty))
             else:
-                # LIMIT: execute if price crosses
-                if qty > 0:  # buy
-                    if O <= o.limit_price:
-                        px = O
-                    elif L <= o.limit_price <= H:
-                        px = o.limit_price
-                    else:
-                        continue
-                else:  # sell
-                    if O >= o.limit_price:
-                        px = O
-                    elif L <= o.limit_price <= H:
-                        px = o.limit_price
-                    else:
-                        continue
-            # tick rounding on price
-            tick = max(1e-9, float(self.cfg.tick_size))
+                lim = o.limit_price
+                if lim is None:
+                    continue
+                if (O <= lim) if qty > 0 else (O >= lim):
+                    px = O
+                elif L <= lim <= H:
+                    px = lim
+                else:
+                    continue
             px = round(px / tick) * tick
-            fills.append(Fill(o.id, o.symbol, qty, px, self._commission(qty, px)))
-        for sym, (_, _, _, close) in next_bar_prices.items():
-            self._hist[sym].append(close)
+            fills.append(Fill(o.id, sym, qty, px, per_share * aq + pct * (aq * px)))
         return fills
 
-    def _spread_bps(self, sym: str, O: float, H: float, L: float, C: float) -> float:
+    def _market_px(self, syms, live, qty, aq, V, O, H, L, C) -> np.ndarray:
+        participation = aq / V
+        spread_bps = self._spread_bps(O, H, L, C)
+        vol_bps = np.array([self._volatility_bps(s) if k else 0.0 for s, k in zip(syms, live.tolist())])
+        slip_bps = (spread_bps + vol_bps) * participation
+        slip = (slip_bps * 1e-4) * np.copysign(1.0, qty)
+        return C * (1.0 + slip)
+
+    def _spread_bps(self, O: np.ndarray, H: np.ndarray, L: np.ndarray, C: np.ndarray):
         if getattr(self.cfg, "spread_source", "fee_model") == "hl":
-            return ((H - L) / C) * 1e4 if C else 0.0
+            with np.errstate(divide="ignore", invalid="ignore"):
+                return np.where(C != 0, ((H - L) / C) * 1e4, 0.0)
         return float(self.fees.slippage_bps)
 
     def _volatility_bps(self, sym: str) -> float:
-        hist = self._hist[sym]
-        if len(hist) < 2:
-            return 0.0
-        rets = [math.log(hist[i] / hist[i - 1]) for i in range(1, len(hist))]
-        if len(rets) < 2:
+        n = len(self._rets.get(sym, ()))
+        if n < 2:
             return 0.0
-        vol = statistics.pstdev(rets)
-        return vol * 1e4
+        s1, s2 = self._ret_sums[sym]
+        mean = s1 / n
+        return math.sqrt(max(0.0, s2 / n - mean * mean)) * 1e4
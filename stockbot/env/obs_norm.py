@@ -16,12 +16,13 @@ def _init_stat(shape):
                        count=1e-6)
 
 def _update_stat(stat: RunningStat, x: np.ndarray):
-    x = x.astype(np.float64)
-    batch_mean = x.mean(axis=0)
-    batch_var  = x.var(axis=0)
+    # One pass over the batch: sums of x and x*x, shifted by the running
+    # mean so the E[x^2] - E[x]^2 form stays well conditioned.
     batch_count = x.shape[0] if x.ndim > 0 else 1.0
+    d = np.subtract(x, stat.mean, dtype=np.float64)
+    delta = np.add.reduce(d, axis=0) / batch_count
+    batch_var = np.maximum(np.einsum("ij,ij->j", d, d) / batch_count - delta**2, 0.0)
 
-    delta = batch_mean - stat.mean
     tot = stat.count + batch_count
     new_mean = stat.mean + delta * (batch_count / tot)
 
@@ -54,10 +55,23 @@ class ObsNorm(gym.ObservationWrapper):
 
         self._win_stat = _init_stat((F,))
         self._port_stat = _init_stat((P,))
+        self._refresh_scale()
 
         # observation_space unchanged (same shapes/ranges)
         self.observation_space = env.observation_space
 
+    def _refresh_scale(self):
+        # 1/std is recomputed only when the stats change
+        self._inv_w = 1.0 / np.sqrt(self._win_stat.var + self.eps)
+        self._inv_p = 1.0 / np.sqrt(self._port_stat.var + self.eps)
+
+    @staticmethod
+    def _normalize(x: np.ndarray, mean: np.ndarray, inv_std: np.ndarray) -> np.ndarray:
+        # centre in float64 (large-magnitude features would lose digits
+        # against a float32 mean), scale and cast straight into the output
+        out = np.empty(x.shape, np.float32)
+        return np.multiply(np.subtract(x, mean), inv_std, out=out, casting="same_kind")
+
     def observation(self, obs):
         win = np.asarray(obs["window"], dtype=np.float32)     # (L,N,F)
         port = np.asarray(obs["portfolio"], dtype=np.float32) # (P,)
@@ -65,13 +79,11 @@ class ObsNorm(gym.ObservationWrapper):
         if self.train:
             _update_stat(self._win_stat, win.reshape(-1, win.shape[-1]))
             _update_stat(self._port_stat, port.reshape(1, -1))
+            self._refresh_scale()
 
-        m_w, s_w = self._win_stat.mean, np.sqrt(self._win_stat.var + self.eps)
-        m_p, s_p = self._port_stat.mean, np.sqrt(self._port_stat.var + self.eps)
-
-        win_n = (win - m_w) / s_w
-        port_n = (port - m_p) / s_p
-        return {"window": win_n.astype(np.float32), "portfolio": port_n.astype(np.float32)}
+        win_n = self._normalize(win, self._win_stat.mean, self._inv_w)
+        port_n = self._normalize(port, self._port_stat.mean, self._inv_p)
+        return {"window": win_n, "portfolio": port_n}
 
     # Optional: serialize/restore stats
     def get_state(self):
@@ -87,3 +99,4 @@ class ObsNorm(gym.ObservationWrapper):
         self._port_stat = RunningStat(np.array(state["port"]["mean"]),
                                       np.array(state["port"]["var"]),
                                       float(state["port"]["count"]))
+        self._refresh_scale()
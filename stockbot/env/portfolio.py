@@ -1,5 +1,5 @@
 from dataclasses import dataclass, field
-from typing import Dict
+from typing import Any, Dict, Tuple, Union
 import numpy as np
 from .orders import Fill
 from .config import MarginConfig, FeeModel
@@ -17,6 +17,8 @@ class Portfolio:
     positions: Dict[str, Position] = field(default_factory=dict)
     equity_peak: float = 0.0
     short_market_value: float = 0.0
+    # column order for the array-valued ``prices`` accepted by snapshot/step_interest
+    symbols: Tuple[str, ...] = ()
 
     def value(self, prices: Dict[str,float]) -> float:
         pv = sum(pos.qty * prices[sym] for sym,pos in self.positions.items())
@@ -38,6 +40,39 @@ class Portfolio:
         eq = max(1e-9, self.value(prices))
         return {sym: (pos.qty*prices[sym])/eq for sym,pos in self.positions.items()}
 
+    def qty_array(self, symbols) -> np.ndarray:
+        """Position quantities as an (N,) float64 array ordered like ``symbols``."""
+        positions = self.positions
+        return np.array([pos.qty if (pos := positions.get(s)) is not None else 0.0 for s in symbols], dtype=np.float64)
+
+    def snapshot(self, prices: np.ndarray) -> Dict[str, Any]:
+        """Equity, exposures and weights from one pass over the positions.
+
+        ``prices`` is an (N,) array aligned with ``symbols``.  Equivalent to
+        calling :meth:`value`, :meth:`gross_exposure`, :meth:`net_exposure`,
+        :meth:`unrealized_pnl` and :meth:`weights` with the matching dict.
+        """
+        positions = self.positions
+        mv = [0.0] * len(self.symbols)
+        net_mv = gross_mv = upnl = 0.0
+        for j, (sym, px) in enumerate(zip(self.symbols, prices.tolist())):
+            pos = positions.get(sym)
+            if pos is None:
+                continue
+            v = pos.qty * px
+            mv[j] = v
+            net_mv += v
+            gross_mv += abs(v)
+            upnl += pos.qty * (px - pos.avg_cost)
+        equity = self.cash + net_mv
+        return {
+            "equity": equity,
+            "gross": gross_mv / equity if equity > 0 else np.inf,
+            "net": net_mv / equity if equity != 0 else 0.0,
+            "unrealized": upnl,
+            "weights": np.array(mv, dtype=np.float64) / max(1e-9, equity),
+        }
+
     def unrealized_pnl(self, prices: Dict[str, float]) -> float:
         """Compute unrealized PnL across all positions."""
         return sum((pos.qty * (prices[sym] - pos.avg_cost)) for sym, pos in self.positions.items())
@@ -62,12 +97,14 @@ class Portfolio:
             # cash decreases on buy, increases on sell; always pay commission
             self.cash -= f.qty * f.price + f.commission
 
-    def step_interest(self, prices: Dict[str, float], dt_years: float):
+    def step_interest(self, prices: Union[Dict[str, float], np.ndarray], dt_years: float):
         # charge interest on negative cash
         if self.cash < 0:
             self.cash *= (1.0 + self.margin.cash_borrow_apr * dt_years)
 
         # borrow fees on short positions
+        if isinstance(prices, np.ndarray):
+            prices = dict(zip(self.symbols, prices.tolist()))
         self.short_market_value = sum(
             -pos.qty * prices[sym]
             for sym, pos in self.positions.items()
@@ -73,7 +73,13 @@ class PortfolioTradingEnv(gym.Env):
         if self._gamma_seq is not None and len(self._gamma_seq) != len(self.src.index):
             raise RuntimeError("regime_gamma length must match panel length")
 
+        # Dense (T, N) close matrix in self.syms order; per-bar price reads index a row
+        self._close = np.column_stack(
+            [self.src.panel[s]["close"].to_numpy(dtype=np.float64) for s in self.syms]
+        )
+
         self._cols = list(required)
+        self._slice_nd = getattr(self.src, "slice_ndarray", None)
         F = len(self._cols)
         extra = 0
         if self._gamma_seq is not None and self._append_gamma:
@@ -100,7 +106,8 @@ class PortfolioTradingEnv(gym.Env):
         else:
             self.action_space = spaces.Box(low=-3.0, high=3.0, shape=(self.N,), dtype=np.float32)
 
-        self.port = Portfolio(cash=cfg.episode.start_cash, margin=self.cfg.margin, fees=self.cfg.fees)
+        self.port = Portfolio(cash=cfg.episode.start_cash, margin=self.cfg.margin, fees=self.cfg.fees,
+                              symbols=tuple(self.syms))
 
         # unified cost/impact parameters shared with backtest
         self.cost = CostParams(
@@ -176,9 +183,17 @@ class PortfolioTradingEnv(gym.Env):
                 float(df["low"].iloc[i]), float(df["close"].iloc[i]))
 
     def _prices(self, i: int) -> Dict[str, float]:
-        return {s: float(self.src.panel[s]["close"].iloc[i]) for s in self.syms}
+        return dict(zip(self.syms, self._close[i].tolist()))
+
+    def _prices_array(self, i: int) -> np.ndarray:
+        """Close prices at bar ``i`` as an (N,) float64 view ordered like ``self.syms``."""
+        return self._close[i]
 
     def _window_obs(self, i: int) -> np.ndarray:
+        if self._slice_nd is not None:
+            # Sources holding a dense (T, N, F) tensor hand back a view; copy it so
+            # the observation is ours to keep or modify
+            return np.array(self._slice_nd(i - self.lookback, i), dtype=np.float32)
         win = []
         for s in self.syms:
             sl = self.src.panel[s].iloc[i - self.lookback:i]
@@ -186,20 +201,20 @@ class PortfolioTradingEnv(gym.Env):
             win.append(arr)
         return np.transpose(np.stack(win, axis=0), (1, 0, 2)).astype(np.float32)
 
-    def _portfolio_obs(self, prices: Dict[str, float]) -> np.ndarray:
-        eq = self.port.value(prices)
+    def _portfolio_obs(self, prices: np.ndarray) -> np.ndarray:
+        snap = self.port.snapshot(prices)
+        eq = snap["equity"]
         cash_frac = float(np.clip(self.port.cash / max(eq, 1e-9), -10, 10))
-        margin_used = self.port.gross_exposure(prices, eq)
+        margin_used = snap["gross"]
         dd = self.port.drawdown(eq)
-        unreal = self.port.unrealized_pnl(prices) / max(self._equity0, 1e-9)
-        realized = (eq - self._equity0 - self.port.unrealized_pnl(prices)) / max(self._equity0, 1e-9)
+        unreal = snap["unrealized"] / max(self._equity0, 1e-9)
+        realized = (eq - self._equity0 - snap["unrealized"]) / max(self._equity0, 1e-9)
         vol = 0.0
         if len(self._ret_hist) > 1:
             window = getattr(self.cfg.reward, "vol_window", 20)
             vol = float(np.std(self._ret_hist[-window:]))
         turnover = float(self._turnover_last)
-        w = self.port.weights(prices)
-        weights = np.array([w.get(s, 0.0) for s in self.syms], dtype=np.float32)
+        weights = snap["weights"].astype(np.float32)
         base = np.concatenate([[cash_frac, margin_used, dd, unreal, realized, vol, turnover], weights])
         if self._gamma_seq is not None and self._append_gamma:
             # Align gamma with the current decision index `self._i`,
@@ -210,7 +225,7 @@ class PortfolioTradingEnv(gym.Env):
         return base.astype(np.float32)
 
     def _obs(self, i):
-        prices = self._prices(i - 1)
+        prices = self._prices_array(i - 1)
         obs = {"window": self._window_obs(i), "portfolio": self._portfolio_obs(prices)}
         if self._gamma_seq is not None and not self._append_gamma:
             obs["gamma"] = self._gamma_seq[i]
@@ -282,7 +297,8 @@ class PortfolioTradingEnv(gym.Env):
         self.port = Portfolio(
             cash=self.cfg.episode.start_cash,
             margin=self.cfg.margin,
-            fees=self.cfg.fees
+            fees=self.cfg.fees,
+            symbols=tuple(self.syms),
         )
         self._equity = self._equity0
         self._equity_peak = self._equity
@@ -311,17 +327,10 @@ class PortfolioTradingEnv(gym.Env):
 
     def step(self, action):
         a = np.asarray(action, dtype=np.float32)
-        prices_prev_close = self._prices(self._i - 1)  # CLOSE[t-1]
-        eq_prev_close = self.port.value(prices_prev_close)
-        prev_w = np.array(
-            [
-                (self.port.positions[sym].qty if sym in self.port.positions else 0.0)
-                * prices_prev_close[sym]
-                for sym in self.syms
-            ],
-            dtype=np.float64,
-        )
-        prev_w = (prev_w / max(eq_prev_close, 1e-9)).astype(np.float32)
+        prices_prev_close = self._prices_array(self._i - 1)  # CLOSE[t-1]
+        snap_prev = self.port.snapshot(prices_prev_close)
+        eq_prev_close = snap_prev["equity"]
+        prev_w = snap_prev["weights"].astype(np.float32)
 
         target_w = self._map_action_to_weights(a)
         if self.min_hold_bars > 0:
@@ -406,6 +415,7 @@ class PortfolioTradingEnv(gym.Env):
             self.trades.append(
                 {
                     "ts": ts_trade,
+                    "ts_ns": ts_trade.value,
                     "symbol": sym,
                     "side": o["side"],
                     "qty": float(o["qty"]),
@@ -435,11 +445,12 @@ class PortfolioTradingEnv(gym.Env):
         self._i += 1
 
         # ---- value portfolio at CLOSE[t]
-        prices_close_t = self._prices(self._i - 1)  # CLOSE[t]
+        prices_close_t = self._prices_array(self._i - 1)  # CLOSE[t]
 
         # ---- apply financing for this bar BEFORE valuing equity
         self.port.step_interest(prices_close_t, dt_years=self._dt_years())
-        eq_close_t = self.port.value(prices_close_t)
+        snap_t = self.port.snapshot(prices_close_t)
+        eq_close_t = snap_t["equity"]
 
         # drawdown and metrics
         self.port.update_peak(eq_close_t)
@@ -464,8 +475,8 @@ class PortfolioTradingEnv(gym.Env):
         if self.cfg.reward.w_vol > 0 and len(self._ret_hist) >= self.cfg.reward.vol_window:
             vol = float(np.std(self._ret_hist[-self.cfg.reward.vol_window:]))
             pen_vol = self.cfg.reward.w_vol * vol
-        gross = self.port.gross_exposure(prices_close_t, eq_close_t)
-        net = self.port.net_exposure(prices_close_t, eq_close_t)
+        gross = snap_t["gross"]
+        net = snap_t["net"]
         lev_cap = self.cfg.margin.max_gross_leverage
         pen_lev = self.cfg.reward.w_leverage * max(0.0, gross - lev_cap)
 
@@ -538,8 +549,7 @@ class PortfolioTradingEnv(gym.Env):
         # Aggregate costs and slippage
         cost_bps_total = (total_cost / max(1e-9, total_notional)) * 10000.0 if total_notional > 0 else 0.0
         try:
-            import numpy as _np
-            slip_arrival = float(_np.mean(arrival_slippages)) if arrival_slippages else 0.0
+            slip_arrival = float(np.mean(arrival_slippages)) if arrival_slippages else 0.0
         except Exception:
             slip_arrival = 0.0
 
@@ -547,13 +557,13 @@ class PortfolioTradingEnv(gym.Env):
         def _markout_bps(offset_bars: int) -> float:
             try:
                 idx = min(len(self.src.index) - 1, (self._i) - 1 + offset_bars)
+                close_row = self._close[idx]  # view; no per-order price dict
                 arr: list[float] = []
                 for o in orders:
-                    sym = self.syms[o["symbol_idx"]]
                     p_ref = float(o["planned_price"]) if float(o["planned_price"]) != 0 else 1e-9
-                    p_close = float(self._prices(idx)[sym])
+                    p_close = float(close_row[o["symbol_idx"]])
                     arr.append((p_close - p_ref) / p_ref * 10000.0)
-                return float(_np.mean(arr)) if arr else 0.0
+                return float(np.mean(arr)) if arr else 0.0
             except Exception:
                 return 0.0
         markouts = {"m1": _markout_bps(1), "m5": _markout_bps(5), "m15": _markout_bps(15)}
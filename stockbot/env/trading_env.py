@@ -33,6 +33,10 @@ class StockTradingEnv(gym.Env):
         if missing:
             raise RuntimeError(f"Missing required feature columns: {missing}")
         self._cols = cols
+        # Dense per-step inputs, read by row index instead of DataFrame iloc
+        self._close = self.src.df["close"].to_numpy(dtype=np.float64)
+        as_array = getattr(self.src, "as_array", None)
+        self._block = as_array(cols) if as_array is not None else None
 
         F = len(self._cols)
         # probability features: [regime_bull, regime_bear, p_up, mu_sigma, vol]
@@ -72,9 +76,11 @@ class StockTradingEnv(gym.Env):
 
     # ---------- helpers ----------
     def _price(self, idx) -> float:
-        return float(self.src.df["close"].iloc[idx])
+        return float(self._close[idx])
 
     def _window_obs(self, idx) -> np.ndarray:
+        if self._block is not None:
+            return self._block[idx - self.lookback:idx].copy()
         sl = self.src.slice(idx - self.lookback, idx)
         arr = sl[self._cols].values.astype(np.float32)
         return arr
@@ -14,6 +14,9 @@ class FeatureSpec:
     normalize_obs: bool
 
 
+_SOURCE_COLS = frozenset({"timestamp", "open", "high", "low", "close", "volume"})
+
+
 def build_features(
     parquet_map: Dict[str, str],
     lookback: int,
@@ -36,8 +39,9 @@ def build_features(
     symbols = list(parquet_map.keys())
     dfs = []
     for sym in symbols:
-        # Files are stored as CSV in the light-weight test environment.
-        df = pd.read_csv(parquet_map[sym])
+        # Files are stored as CSV in the light-weight test environment.  Only
+        # parse the columns the features use (adj_close/splits/dividends are not).
+        df = pd.read_csv(parquet_map[sym], usecols=lambda c: c.lower() in _SOURCE_COLS)
         df = df.set_index("timestamp")
         # Normalize column names to lower-case expected by downstream
         df = df.rename(columns={c: c.lower() for c in df.columns})
@@ -112,16 +116,24 @@ def build_features(
     F = len(feature_cols)
     arr = arr.reshape(T, N, F)
 
-    windows = []
     end_limit = T - spec.embargo_bars
-    for t in range(lookback - 1, end_limit):
-        win = arr[t - lookback + 1 : t + 1].copy()
+    n_win = end_limit - lookback + 1
+    if n_win > 0:
+        # (T - lookback + 1, lookback, N, F) strided view; window k ends at bar k + lookback - 1
+        view = np.moveaxis(np.lib.stride_tricks.sliding_window_view(arr, lookback, axis=0), -1, 1)
+        X = np.ascontiguousarray(view[:n_win])
         if spec.normalize_obs:
-            mean = win.mean(axis=0, keepdims=True)
-            std = win.std(axis=0, keepdims=True) + 1e-8
-            win = (win - mean) / std
-        windows.append(win)
-    X = np.stack(windows, axis=0) if windows else np.empty((0, lookback, N, F))
+            if X.dtype.kind != "f":
+                X = X.astype(np.float64)
+            # per window, in place: small cache-resident reductions beat one
+            # batched pass over the whole (T, lookback, N, F) array
+            for win in X:
+                mean = win.mean(axis=0, keepdims=True)
+                std = win.std(axis=0, keepdims=True) + 1e-8
+                win -= mean
+                win /= std
+    else:
+        X = np.empty((0, lookback, N, F))
 
     meta = {
         "timestamps": combined.index[lookback - 1 : end_limit].tolist(),
@@ -15,6 +15,9 @@ class AlphaVantageProvider(IngestionProvider):
         self._api_key = api_key
         self._base_url = base_url
 
+    def cache_identity(self) -> tuple:
+        return super().cache_identity() + (self._base_url,)
+
     def capabilities(self) -> Dict[str, Any]:
         return {
             "bars": [
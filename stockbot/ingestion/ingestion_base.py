@@ -38,7 +38,7 @@ class BarInterval(str, Enum):
     MONTH_1 = "1mo"
 
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class PriceBar:
     symbol: str
     ts: datetime              # always UTC
@@ -150,6 +150,10 @@ class IngestionProvider(ABC):
     def name(self) -> str:
         return self._name
 
+    def cache_identity(self) -> tuple:
+        """Settings that determine what this provider returns; keys on-disk caches of its data."""
+        return (f"{type(self).__module__}.{type(self).__qualname__}", self._name)
+
     @abstractmethod
     def capabilities(self) -> Dict[str, Any]:
         """
@@ -6,12 +6,15 @@ This mirrors the backtest telemetry schema at a best-effort level so the
 Run Monitor can show live data during training as well.
 """
 
+import hashlib
+import os
+import time
 from typing import Any, Dict, List, Optional
-import math
 
 import numpy as np
 from stable_baselines3.common.callbacks import BaseCallback
 
+from stockbot.telemetry.rolling import RollingReturnStats
 from stockbot.telemetry.writer import TelemetryWriter
 
 
@@ -19,12 +22,17 @@ class TelemetryCallback(BaseCallback):
     def __init__(self):
         super().__init__()
         self.tw = TelemetryWriter()
-        self.roll_vals: List[float] = []
+        self.rolling = RollingReturnStats(window=60)
         self.last_equity: Optional[float] = None
         self.cum_ret: float = 0.0
         self.manifest_hash: Optional[str] = None
 
+    def _on_training_end(self) -> None:
+        self.tw.close()
+
     def _on_step(self) -> bool:
+        if not self.tw.should_emit("bar"):
+            return True
         try:
             env = self.model.get_env()  # type: ignore[attr-defined]
             if env is None:
@@ -41,11 +49,9 @@ class TelemetryCallback(BaseCallback):
 
             # timestamps
             try:
-                ts = u.src.index[u._i - 1]
-                t_iso = ts.to_pydatetime().isoformat()
+                t_ms = int(u.src.index[u._i - 1].value // 1_000_000)
             except Exception:
-                import datetime as _dt
-                t_iso = _dt.datetime.utcnow().isoformat()
+                t_ms = int(time.time() * 1000)
 
             # symbols and prices
             try:
@@ -53,24 +59,22 @@ class TelemetryCallback(BaseCallback):
             except Exception:
                 syms = []
             prices_close = []
+            px = None
             try:
-                pc = u._prices(u._i - 1)
-                prices_close = [float(pc.get(s, float("nan"))) for s in syms]
+                px = np.asarray(u._prices_array(u._i - 1), dtype=np.float64)
+                prices_close = px.tolist()
             except Exception:
                 pass
 
-            # positions snapshot
+            # positions snapshot (one price read, vectorized market value)
             pos_qty: List[float] = []
             pos_mv: List[float] = []
             nav = float(info0.get("equity", 0.0))
             try:
-                pmap = u._prices(u._i - 1)
-                for s in syms:
-                    pos = u.port.positions.get(s)
-                    q = float(getattr(pos, "qty", 0.0)) if pos is not None else 0.0
-                    mv = q * float(pmap.get(s, 0.0))
-                    pos_qty.append(q)
-                    pos_mv.append(float(mv))
+                if px is not None:
+                    q = u.port.qty_array(syms)
+                    pos_qty = q.tolist()
+                    pos_mv = (q * px).tolist()
             except Exception:
                 pass
 
@@ -91,20 +95,9 @@ class TelemetryCallback(BaseCallback):
             if self.last_equity and self.last_equity != 0:
                 bar_ret = (nav - self.last_equity) / max(self.last_equity, 1e-9)
             self.cum_ret += bar_ret
-            self.roll_vals.append(bar_ret)
-            if len(self.roll_vals) > 60:
-                self.roll_vals.pop(0)
+            self.rolling.push(bar_ret)
             self.last_equity = nav
-            try:
-                arr = np.array(self.roll_vals, dtype=float)
-                vol = float(arr.std() * math.sqrt(252)) if arr.size > 1 else 0.0
-                mean = float(arr.mean()) if arr.size > 0 else 0.0
-                sharpe = float((mean / (arr.std() + 1e-12)) * math.sqrt(252)) if arr.size > 1 else 0.0
-                downside = float(arr[arr < 0].std()) if arr.size > 1 and (arr < 0).any() else 0.0
-                sortino = float((mean / (downside + 1e-12)) * math.sqrt(252)) if downside > 0 else 0.0
-                hit_rate = float((arr > 0).mean()) if arr.size > 0 else 0.0
-            except Exception:
-                vol = sharpe = sortino = hit_rate = 0.0
+            rolling = self.rolling.snapshot()
 
             # schema/meta
             try:
@@ -114,8 +107,7 @@ class TelemetryCallback(BaseCallback):
                 schema_obs = f"win{win_shape}-port{port_shape}"
             except Exception:
                 schema_obs = None
-            import os as _os
-            git_sha = _os.environ.get("STOCKBOT_GIT_SHA")
+            git_sha = os.environ.get("STOCKBOT_GIT_SHA")
 
             # Try to compute policy internals (value head & entropy)
             pol_entropy = None
@@ -173,19 +165,18 @@ class TelemetryCallback(BaseCallback):
             # manifest hash (once)
             if self.manifest_hash is None:
                 try:
-                    import hashlib as _hh
                     cfg = getattr(u, "cfg", None)
                     smbls = list(getattr(cfg, "symbols", [])) if cfg else syms
                     start = getattr(cfg, "start", None)
                     end = getattr(cfg, "end", None)
                     interval = getattr(cfg, "interval", None)
                     _m = f"{smbls}|{start}|{end}|{interval}"
-                    self.manifest_hash = _hh.sha1(_m.encode()).hexdigest()[:12]
+                    self.manifest_hash = hashlib.sha1(_m.encode()).hexdigest()[:12]
                 except Exception:
                     self.manifest_hash = None
 
             telem = {
-                "t": t_iso,
+                "t_ms": t_ms,
                 "bar_idx": int(getattr(u, "_i", 0)),
                 "symbols": syms,
                 "prices": {"close": prices_close},
@@ -220,12 +211,7 @@ class TelemetryCallback(BaseCallback):
                     "cum_pct": float(self.cum_ret),
                     "dd_pct": float(-abs(info0.get("drawdown", 0.0))),
                 },
-                "rolling": {
-                    "sharpe": sharpe,
-                    "sortino": sortino,
-                    "vol_realized": vol,
-                    "hit_rate": hit_rate,
-                },
+                "rolling": rolling,
                 "turnover": {"bar_pct": float(info0.get("turnover", 0.0) * 100.0)},
                 "health": {"heartbeat_ms": 0, "status": "OK"},
                 "model": {"git_sha": git_sha},
@@ -235,11 +221,14 @@ class TelemetryCallback(BaseCallback):
             }
             # fills (best-effort from env.trades at current ts)
             try:
-                recent_ts = getattr(u.src.index[u._i - 1], "timestamp", lambda: None)()
-                recent_iso = getattr(u.src.index[u._i - 1], "isoformat", lambda: None)()
+                # Match on int64 epoch-ns; str(Timestamp) never equalled the isoformat text
+                bar_ns = int(u.src.index.asi8[u._i - 1])
                 fills = []
                 for t in getattr(u, "trades", [])[-25:]:
-                    if recent_iso and str(t.get("ts")) != str(recent_iso):
+                    t_ns = t.get("ts_ns")
+                    if t_ns is None:
+                        t_ns = getattr(t.get("ts"), "value", None)
+                    if t_ns != bar_ns:
                         continue
                     fills.append({
                         "sym": t.get("symbol"),
@@ -21,6 +21,26 @@ from hmmlearn.hmm import GaussianHMM
 from sklearn.cluster import KMeans
 
 
+def _diag_log_likelihood(X: np.ndarray, means: np.ndarray, covars: np.ndarray) -> np.ndarray:
+    """Per-state Gaussian log-density ``(T, K)`` for diagonal covariances.
+
+    Expands ``sum((x - mu)**2 / var)`` into two matrix products so the
+    emission matrix never materialises a ``(T, K, D)`` temporary.
+    """
+
+    covars = np.maximum(covars, np.finfo(float).tiny)
+    prec = 1.0 / covars
+    const = means.shape[1] * np.log(2 * np.pi) + np.log(covars).sum(axis=1) + (means ** 2 * prec).sum(axis=1)
+    return X @ (means * prec).T - 0.5 * ((X ** 2) @ prec.T) - 0.5 * const
+
+
+class _DiagGaussianHMM(GaussianHMM):
+    """``GaussianHMM`` with a GEMM-based emission step (used by fit and decode)."""
+
+    def _compute_log_likelihood(self, X):
+        return _diag_log_likelihood(X, self.means_, self._covars_)
+
+
 @dataclass
 class HMMConfig:
     """Configuration for :class:`GaussianDiagHMM`."""
@@ -43,7 +63,7 @@ class GaussianDiagHMM:
 
     def __init__(self, cfg: HMMConfig):
         self.cfg = cfg
-        self.model = GaussianHMM(
+        self.model = _DiagGaussianHMM(
             n_components=cfg.n_states,
             covariance_type="diag",
             n_iter=cfg.max_iter,
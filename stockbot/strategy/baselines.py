@@ -1,5 +1,5 @@
 from __future__ import annotations
-from typing import Any, Tuple
+from typing import Any, Optional, Tuple
 import numpy as np
 import gymnasium as gym
 
@@ -42,15 +42,31 @@ def _box_flat(action_space: gym.Space) -> np.ndarray:
     high = np.broadcast_to(action_space.high, w.shape).astype(np.float32)
     return np.clip(w, low, high)
 
+def _constant_box_action(action_space: gym.Space, fn) -> Optional[np.ndarray]:
+    """``fn(action_space)`` computed once when it is deterministic (1-D Box), else None.
+
+    The env only reads the action (np.asarray / clip produce new arrays), so one
+    array can be returned on every step instead of rebuilt per bar.
+    """
+    if not isinstance(action_space, gym.spaces.Box):
+        return None
+    shape = action_space.shape
+    if shape is None or len(shape) != 1 or shape[0] <= 0:
+        return None  # helper falls back to sampling; keep calling it
+    return fn(action_space)
+
 
 class EqualWeightStrategy(Strategy):
     def __init__(self, action_space: gym.Space):
         self.action_space = action_space
+        self._action = _constant_box_action(action_space, _box_equal_weight)
 
     def reset(self) -> None:
         return
 
     def predict(self, obs: Any, deterministic: bool = True) -> Tuple[Any, dict]:
+        if self._action is not None:
+            return self._action, {}
         if isinstance(self.action_space, gym.spaces.Box):
             return _box_equal_weight(self.action_space), {}
         if isinstance(self.action_space, gym.spaces.Discrete):
@@ -89,11 +105,14 @@ class FlatStrategy(Strategy):
     """Always hold cash / flat exposure if the env allows (0 vector)."""
     def __init__(self, action_space: gym.Space):
         self.action_space = action_space
+        self._action = _constant_box_action(action_space, _box_flat)
 
     def reset(self) -> None:
         return
 
     def predict(self, obs: Any, deterministic: bool = True) -> Tuple[Any, dict]:
+        if self._action is not None:
+            return self._action, {}
         if isinstance(self.action_space, gym.spaces.Box):
             return _box_flat(self.action_space), {}
         if isinstance(self.action_space, gym.spaces.Discrete):
@@ -105,11 +124,14 @@ class FirstLongStrategy(Strategy):
     """Always 100% the first asset, if Box action; else default."""
     def __init__(self, action_space: gym.Space):
         self.action_space = action_space
+        self._action = _constant_box_action(action_space, _box_first_long)
 
     def reset(self) -> None:
         return
 
     def predict(self, obs: Any, deterministic: bool = True) -> Tuple[Any, dict]:
+        if self._action is not None:
+            return self._action, {}
         if isinstance(self.action_space, gym.spaces.Box):
             return _box_first_long(self.action_space), {}
         if isinstance(self.action_space, gym.spaces.Discrete):
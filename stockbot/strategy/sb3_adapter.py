@@ -1,22 +1,121 @@
 from __future__ import annotations
-from typing import Any, Tuple
+from typing import Any, List, Optional, Tuple
+import io
 import os
+import warnings
 
+import numpy as np
+from gymnasium import spaces
 from stable_baselines3.common.base_class import BaseAlgorithm
+from stable_baselines3.common.utils import is_vectorized_observation
 
 from .base_strategy import Strategy
 
+try:  # optional: deterministic inference through ONNX Runtime
+    import onnxruntime as _ort  # type: ignore
+except Exception:  # pragma: no cover - onnxruntime is not a hard dependency
+    _ort = None
+
+
+class _OnnxPolicy:
+    """
+    Deterministic forward pass of an SB3 policy exported to ONNX and run by
+    ONNX Runtime. Skips SB3's per-call obs->tensor conversion and torch dispatch;
+    actions are post-processed (unscale/clip, unbatch) as ``policy.predict`` does.
+    """
+
+    def __init__(self, model: BaseAlgorithm):
+        import torch as th
+
+        policy = model.policy
+        policy.set_training_mode(False)
+        self.obs_space = policy.observation_space
+        self.action_space = policy.action_space
+        self.squash = bool(getattr(policy, "squash_output", False))
+        self.unscale = policy.unscale_action
+        if isinstance(self.obs_space, spaces.Dict):
+            self.keys: Optional[List[str]] = list(self.obs_space.spaces.keys())
+            sample = {k: sp.sample() for k, sp in self.obs_space.spaces.items()}
+            dummy = tuple(th.as_tensor(np.asarray(sample[k], dtype=np.float32)[None]) for k in self.keys)
+            names = self.keys
+        else:
+            self.keys = None
+            dummy = (th.as_tensor(np.asarray(self.obs_space.sample(), dtype=np.float32)[None]),)
+            names = ["obs"]
+        self.names = names
+
+        keys = self.keys
+
+        class _Actor(th.nn.Module):
+            def __init__(self):
+                super().__init__()
+                self.policy = policy
+
+            def forward(self, *obs):
+                o = dict(zip(keys, obs)) if keys is not None else obs[0]
+                return self.policy._predict(o, deterministic=True)
+
+        buf = io.BytesIO()
+        with warnings.catch_warnings():
+            warnings.simplefilter("ignore")
+            th.onnx.export(
+                _Actor(), dummy, buf, input_names=names, output_names=["action"],
+                dynamic_axes={n: {0: "batch"} for n in names}, opset_version=17, dynamo=False,
+            )
+        self.sess = _ort.InferenceSession(buf.getvalue(), providers=["CPUExecutionProvider"])
+
+    def predict(self, obs: Any) -> np.ndarray:
+        vectorized = is_vectorized_observation(obs, self.obs_space)
+        if self.keys is not None:
+            feed = {k: np.asarray(obs[k], dtype=np.float32) for k in self.keys}
+        else:
+            feed = {"obs": np.asarray(obs, dtype=np.float32)}
+        if not vectorized:
+            feed = {k: v[None] for k, v in feed.items()}
+        actions = self.sess.run(None, feed)[0]
+        actions = actions.reshape((-1, *self.action_space.shape))
+        if isinstance(self.action_space, spaces.Box):
+            if self.squash:
+                actions = self.unscale(actions)
+            else:
+                actions = np.clip(actions, self.action_space.low, self.action_space.high)
+        if not vectorized:
+            actions = actions.squeeze(axis=0)
+        return actions
+
+
 class SB3PolicyStrategy(Strategy):
-    """Adapter to use any SB3 model as a Strategy."""
-    def __init__(self, model: BaseAlgorithm, deterministic_default: bool = True):
+    """Adapter to use any SB3 model as a Strategy.
+
+    With ``onnx=True`` (default: env ``STOCKBOT_POLICY_ONNX=1``) deterministic
+    predictions run through ONNX Runtime; if onnxruntime is missing or the
+    export fails, it falls back to ``model.predict``.
+    """
+    def __init__(self, model: BaseAlgorithm, deterministic_default: bool = True, onnx: Optional[bool] = None):
         self.model = model
         self.det_default = deterministic_default
+        if onnx is None:
+            onnx = os.environ.get("STOCKBOT_POLICY_ONNX", "").strip().lower() in ("1", "true", "yes")
+        self._use_onnx = bool(onnx) and _ort is not None
+        self._onnx: Optional[_OnnxPolicy] = None
 
     def reset(self) -> None:
         return
 
+    def _onnx_policy(self) -> Optional[_OnnxPolicy]:
+        if self._onnx is None and self._use_onnx:
+            try:
+                self._onnx = _OnnxPolicy(self.model)
+            except Exception:
+                self._use_onnx = False  # export unsupported for this policy; stay on SB3
+        return self._onnx
+
     def predict(self, obs: Any, deterministic: bool = True) -> Tuple[Any, dict]:
         det = deterministic if deterministic is not None else self.det_default
+        if det and self._use_onnx:
+            fast = self._onnx_policy()
+            if fast is not None:
+                return fast.predict(obs), {}
         action, _ = self.model.predict(obs, deterministic=det)
         return action, {}
 
@@ -0,0 +1,105 @@
+"""
+Rolling return statistics for per-bar telemetry.
+
+Keeps the last ``window`` returns in a ring buffer together with running sums,
+so each bar costs O(1) instead of rebuilding an array and reducing it.
+"""
+
+from __future__ import annotations
+
+import math
+from typing import Dict
+
+
+class RollingReturnStats:
+    """Sharpe / Sortino / realized vol / hit rate over a fixed window of bar returns.
+
+    Values match population statistics over the most recent ``window`` returns
+    (the same definitions the telemetry used when recomputing from an array).
+    """
+
+    def __init__(self, window: int = 60, periods_per_year: int = 252) -> None:
+        self.window = int(window)
+        self._ann = math.sqrt(periods_per_year)
+        self._buf = [0.0] * self.window
+        self._head = 0  # next slot to overwrite
+        self._n = 0
+        self._pushes = 0
+        self._pos_n = 0
+        self._neg_n = 0
+        # Running sums are kept around shifts (re-centred on each resync) so the
+        # variance does not cancel catastrophically when returns are near-constant.
+        self._k = 0.0
+        self._sum = 0.0
+        self._sumsq = 0.0
+        self._neg_k = 0.0
+        self._neg_sum = 0.0
+        self._neg_sumsq = 0.0
+
+    def _add(self, x: float, sign: float) -> None:
+        d = x - self._k
+        self._sum += sign * d
+        self._sumsq += sign * d * d
+        if x < 0:
+            self._neg_n += int(sign)
+            d = x - self._neg_k
+            self._neg_sum += sign * d
+            self._neg_sumsq += sign * d * d
+        elif x > 0:
+            self._pos_n += int(sign)
+
+    def push(self, r: float) -> None:
+        r = float(r)
+        if self._n == self.window:
+            self._add(self._buf[self._head], -1.0)
+        else:
+            self._n += 1
+        self._buf[self._head] = r
+        self._add(r, 1.0)
+        self._head = (self._head + 1) % self.window
+        self._pushes += 1
+        if self._pushes % self.window == 0:
+            self._resync()
+
+    def _resync(self) -> None:
+        # Re-sum once per window so add/subtract rounding never accumulates.
+        vals = self._buf[: self._n] if self._n < self.window else self._buf
+        neg = [x for x in vals if x < 0]
+        self._k = math.fsum(vals) / len(vals)
+        self._sum = math.fsum(x - self._k for x in vals)
+        self._sumsq = math.fsum((x - self._k) ** 2 for x in vals)
+        self._neg_k = math.fsum(neg) / len(neg) if neg else 0.0
+        self._neg_sum = math.fsum(x - self._neg_k for x in neg)
+        self._neg_sumsq = math.fsum((x - self._neg_k) ** 2 for x in neg)
+
+    def _lost_precision(self) -> bool:
+        n, m = self._n, self._neg_n
+        d = self._sum / n
+        if self._sumsq / n - d * d < self._sumsq / n * 1e-4:
+            return self._sumsq > 0.0
+        if m > 1:
+            nd = self._neg_sum / m
+            return self._neg_sumsq / m - nd * nd < self._neg_sumsq / m * 1e-4 and self._neg_sumsq > 0.0
+        return False
+
+    def snapshot(self) -> Dict[str, float]:
+        n = self._n
+        if n == 0:
+            return {"sharpe": 0.0, "sortino": 0.0, "vol_realized": 0.0, "hit_rate": 0.0}
+        if self._lost_precision():
+            # The window's spread collapsed relative to the shift (e.g. returns went
+            # flat); re-centre so the variances below are exact again.
+            self._resync()
+        d = self._sum / n
+        mean = self._k + d
+        std = math.sqrt(max(self._sumsq / n - d * d, 0.0))
+        downside = 0.0
+        if n > 1 and self._neg_n > 1:
+            nd = self._neg_sum / self._neg_n
+            downside = math.sqrt(max(self._neg_sumsq / self._neg_n - nd * nd, 0.0))
+        return {
+            "sharpe": (mean / (std + 1e-12)) * self._ann if n > 1 else 0.0,
+            "sortino": (mean / (downside + 1e-12)) * self._ann if downside > 0 else 0.0,
+            "vol_realized": std * self._ann if n > 1 else 0.0,
+            "hit_rate": self._pos_n / n,
+        }
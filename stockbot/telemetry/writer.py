@@ -4,14 +4,57 @@ from __future__ import annotations
 Lightweight telemetry writer for per-bar runtime events.
 
 Writes JSONL lines to files referenced by env vars so subprocesses can
-append without needing in-process pub/sub.
+append without needing in-process pub/sub. Records are queued and encoded
+on a background thread, so the trading loop never blocks on JSON or disk.
 """
 
+import atexit
 import json
 import os
+import queue
+import threading
 import time
+import weakref
+from enum import IntEnum
 from pathlib import Path
-from typing import Any, Dict, Optional
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+try:
+    import numpy as _np  # type: ignore
+except Exception:  # pragma: no cover - numpy is optional for the writer
+    _np = None
+
+try:
+    import orjson as _orjson  # type: ignore
+except Exception:  # pragma: no cover - optional fast JSON encoder
+    _orjson = None
+
+# Max records encoded and appended per write() by the background thread
+_BATCH_MAX = 256
+# Bound on queued records; emitters block (backpressure) rather than grow memory
+_QUEUE_MAX = 8192
+_LINE_MAX = 10_000
+
+
+class TelemetryLevel(IntEnum):
+    """How much telemetry to emit; compared as ints so checks stay cheap."""
+    OFF = 0
+    STANDARD = 1
+    VERBOSE = 2
+
+
+def _level_from_env(var: str) -> TelemetryLevel:
+    raw = os.environ.get(var, "").strip()
+    if not raw:
+        return TelemetryLevel.STANDARD
+    try:
+        return TelemetryLevel[raw.upper()]
+    except KeyError:
+        pass
+    try:
+        return TelemetryLevel(int(raw))
+    except ValueError:
+        return TelemetryLevel.STANDARD
 
 
 def _path_from_env(var: str) -> Optional[Path]:
@@ -34,13 +77,30 @@ class TelemetryWriter:
       - STOCKBOT_EVENT_PATH: file for event lines (gate triggers, halts, etc.)
       - STOCKBOT_ROLLUP_PATH: file for periodic rollups
       - STOCKBOT_RUN_ID: current run id (optional, included in records)
+      - STOCKBOT_TELEMETRY_LEVEL: off | standard | verbose (or 0/1/2; default standard)
+      - STOCKBOT_TELEMETRY_SYNC: set to 1 to encode and write inline instead of on a thread
+
+    Hot loops should check ``should_emit`` (or use ``emit_bar_supplier``) before
+    building a payload, so nothing is constructed when it would not be written.
+    Payloads are serialized later on the writer thread, so callers must not
+    mutate a dict after emitting it. Call ``flush`` before reading the files back.
     """
 
     def __init__(self) -> None:
         self.run_id = os.environ.get("STOCKBOT_RUN_ID") or None
+        self.level = _level_from_env("STOCKBOT_TELEMETRY_LEVEL")
         self.telemetry_path = _path_from_env("STOCKBOT_TELEMETRY_PATH")
         self.event_path = _path_from_env("STOCKBOT_EVENT_PATH")
         self.rollup_path = _path_from_env("STOCKBOT_ROLLUP_PATH")
+        self._sync = os.environ.get("STOCKBOT_TELEMETRY_SYNC", "").strip().lower() in ("1", "true", "yes")
+        self._q: Optional[queue.Queue] = None
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+        self._paths = {
+            "bar": self.telemetry_path,
+            "event": self.event_path,
+            "rollup": self.rollup_path or self.telemetry_path,
+        }
         # ensure files exist so proxies can stream immediately
         try:
             if self.telemetry_path and not self.telemetry_path.exists():
@@ -52,24 +112,93 @@ class TelemetryWriter:
         except Exception:
             pass
 
+    def should_emit(self, kind: str, level: TelemetryLevel = TelemetryLevel.STANDARD) -> bool:
+        """True if a record of ``kind`` (bar | event | rollup) at ``level`` would be written."""
+        return self.level >= level and self._paths.get(kind) is not None
+
+    def _encode(self, obj: Dict[str, Any]) -> bytes:
+        # ensure a small header for schema/run id
+        rec = dict(obj)
+        if self.run_id and "run_id" not in rec:
+            rec["run_id"] = self.run_id
+        line = _dumps(rec)
+        # keep each line under ~10KB
+        if len(line) > _LINE_MAX:
+            rec["_truncated"] = True
+            line = _dumps(rec)
+        return line + b"\n"
+
+    def _write(self, items: List[Tuple[Path, Dict[str, Any]]]) -> None:
+        # Group by file so each batch costs one open + one write() per path
+        chunks: Dict[Path, List[bytes]] = {}
+        for path, obj in items:
+            try:
+                chunks.setdefault(path, []).append(self._encode(obj))
+            except Exception:
+                # best-effort; never raise from writer
+                pass
+        for path, lines in chunks.items():
+            try:
+                with path.open("ab") as f:
+                    f.write(b"".join(lines))
+            except Exception:
+                pass
+
+    def _drain(self, q: queue.Queue) -> None:
+        while True:
+            item = q.get()
+            batch = [item]
+            while len(batch) < _BATCH_MAX:
+                try:
+                    batch.append(q.get_nowait())
+                except queue.Empty:
+                    break
+            stop = None in batch
+            try:
+                self._write([b for b in batch if b is not None])
+            finally:
+                for _ in batch:
+                    q.task_done()
+            if stop:
+                return
+
+    def _queue(self) -> queue.Queue:
+        with self._lock:
+            if self._q is None:
+                self._q = queue.Queue(maxsize=_QUEUE_MAX)
+                self._thread = threading.Thread(
+                    target=self._drain, args=(self._q,), name="telemetry-writer", daemon=True
+                )
+                self._thread.start()
+                _LIVE_WRITERS.add(self)
+            return self._q
+
     def _append(self, path: Optional[Path], obj: Dict[str, Any]) -> None:
-        if path is None:
+        if path is None or self.level is TelemetryLevel.OFF:
             return
-        try:
-            # ensure a small header for schema/run id
-            rec = dict(obj)
-            if self.run_id and "run_id" not in rec:
-                rec["run_id"] = self.run_id
-            line = json.dumps(rec, default=_json_default)
-            # keep each line under ~10KB
-            if len(line) > 10_000:
-                rec["_truncated"] = True
-                line = json.dumps(rec, default=_json_default)
-            with path.open("a", encoding="utf-8") as f:
-                f.write(line + "\n")
-        except Exception:
-            # best-effort; never raise from writer
-            pass
+        if self._sync:
+            self._write([(path, obj)])
+            return
+        self._queue().put((path, obj))
+
+    def flush(self) -> None:
+        """Block until every record emitted so far has been written."""
+        q = self._q
+        if q is not None:
+            q.join()
+
+    def close(self) -> None:
+        """Flush pending records and stop the background thread."""
+        with self._lock:
+            q, t = self._q, self._thread
+            self._q = self._thread = None
+        if q is None:
+            return
+        q.put(None)
+        q.join()
+        if t is not None:
+            t.join(timeout=5.0)
+        _LIVE_WRITERS.discard(self)
 
     def emit_bar(self, payload: Dict[str, Any]) -> None:
         payload = dict(payload)
@@ -77,6 +206,21 @@ class TelemetryWriter:
         payload.setdefault("emitted_at", int(time.time() * 1000))
         self._append(self.telemetry_path, payload)
 
+    def emit_bar_supplier(
+        self,
+        supplier: Callable[[], Dict[str, Any]],
+        level: TelemetryLevel = TelemetryLevel.STANDARD,
+    ) -> None:
+        """Build the bar payload via ``supplier`` only if it will be recorded."""
+        if not self.should_emit("bar", level):
+            return
+        try:
+            payload = supplier()
+        except Exception:
+            # best-effort; never raise from writer
+            return
+        self.emit_bar(payload)
+
     def emit_event(self, payload: Dict[str, Any]) -> None:
         payload = dict(payload)
         payload.setdefault("kind", "event")
@@ -90,15 +234,34 @@ class TelemetryWriter:
         self._append(self.rollup_path or self.telemetry_path, payload)
 
 
+_LIVE_WRITERS: "weakref.WeakSet[TelemetryWriter]" = weakref.WeakSet()
+
+
+@atexit.register
+def _flush_live_writers() -> None:
+    # Daemon threads die with the interpreter; drain whatever is still queued.
+    for tw in list(_LIVE_WRITERS):
+        try:
+            tw.close()
+        except Exception:
+            pass
+
+
+def _dumps(rec: Dict[str, Any]) -> bytes:
+    if _orjson is not None:
+        # numpy values go through _json_default (not OPT_SERIALIZE_NUMPY) so float32
+        # scalars keep the float64 text the stdlib path has always produced
+        return _orjson.dumps(rec, default=_json_default, option=_orjson.OPT_NON_STR_KEYS)
+    return json.dumps(rec, default=_json_default).encode("utf-8")
+
+
 def _json_default(o: Any):
-    try:
-        import numpy as _np  # type: ignore
-        if isinstance(o, (_np.floating, _np.integer)):
-            return float(o)
+    if _np is not None:
+        # Payloads may carry raw ndarrays (e.g. regime gamma); convert once here
         if isinstance(o, _np.ndarray):
             return o.tolist()
-    except Exception:
-        pass
+        if isinstance(o, (_np.floating, _np.integer)):
+            return float(o)
     if hasattr(o, "isoformat"):
         try:
             return o.isoformat()
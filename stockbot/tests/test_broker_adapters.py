@@ -0,0 +1,80 @@
+import sys
+import threading
+import time
+from pathlib import Path
+
+import pytest
+
+sys.path.append(str(Path(__file__).resolve().parents[2]))
+
+from stockbot.env.broker_adapters import LiveBrokerAdapter
+from stockbot.env.config import FeeModel
+from stockbot.env.orders import Order
+
+
+class _Prov:
+    def __init__(self):
+        self.submitted = []
+
+    def submit_order(self, symbol, qty, side, type_, time_in_force, **kw):
+        if symbol == "BAD":
+            raise RuntimeError("rejected")
+        self.submitted.append(symbol)
+        return {"id": symbol}
+
+
+def _order(sym):
+    return Order(0, None, sym, "buy", 1.0)
+
+
+def test_wait_mode_errors_stay_with_their_caller():
+    prov = _Prov()
+    ad = LiveBrokerAdapter(prov, FeeModel(), sync_mode="wait", flush_window_ms=200.0)
+    errors = {}
+
+    def place(sym):
+        try:
+            ad.place_orders([_order(sym)])
+            errors[sym] = None
+        except Exception as e:
+            errors[sym] = e
+
+    threads = [threading.Thread(target=place, args=(s,)) for s in ("GOOD", "BAD")]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert errors["GOOD"] is None
+    assert isinstance(errors["BAD"], RuntimeError)
+    assert prov.submitted == ["GOOD"]
+
+
+def test_async_flush_reraises_failed_submits():
+    ad = LiveBrokerAdapter(_Prov(), FeeModel(), sync_mode="async", flush_window_ms=5.0)
+    ad.place_orders([_order("BAD")])
+    time.sleep(0.1)  # let the batch window close before flushing
+    with pytest.raises(RuntimeError, match="rejected"):
+        ad.flush()
+    ad.place_orders([_order("GOOD")])
+    ad.flush()  # earlier errors are reported once
+
+
+def test_sync_keeps_order_and_accepted_ids_on_error():
+    prov = _Prov()
+    ad = LiveBrokerAdapter(prov, FeeModel())
+    with pytest.raises(RuntimeError, match="rejected"):
+        ad.place_orders([_order(s) for s in ("A", "BAD", "B", "C")])
+    assert prov.submitted == ["A", "B", "C"]
+    assert [r.order_id for r in ad.last_submits] == ["A", "B", "C"]
+
+
+def test_close_submits_queued_orders():
+    prov = _Prov()
+    ad = LiveBrokerAdapter(prov, FeeModel(), sync_mode="async", flush_window_ms=500.0)
+    ad.place_orders([_order("A"), _order("BAD")])
+    ad.place_orders([_order("B")])
+    flusher = ad._flusher
+    ad.close()
+    assert prov.submitted == ["A", "B"] and not flusher.is_alive()
+    with pytest.raises(RuntimeError, match="rejected"):
+        ad.flush()  # close() leaves submission errors for flush to report
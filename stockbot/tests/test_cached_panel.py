@@ -0,0 +1,66 @@
+import json
+import sys
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+sys.path.append(str(Path(__file__).resolve().parents[2]))
+
+from stockbot.env.cached_panel import CachedPanelSource
+from stockbot.env.config import EnvConfig, EpisodeConfig, FeatureConfig
+
+
+def _write_run(root: Path, T=40, L=4, syms=("AAA", "BBB"), nan_at=None):
+    cols = ["open", "high", "low", "close", "volume"]
+    rng = np.random.default_rng(0)
+    bars = (100 + rng.normal(size=(T + L, len(syms), len(cols)))).astype(np.float32)
+    if nan_at is not None:
+        bars[nan_at + L - 1, 1, 3] = np.nan  # BBB close at window-end bar nan_at
+    X = np.stack([bars[t:t + L] for t in range(T)])  # (T, L, N, F)
+    np.savez_compressed(root / "windows.npz", X=X)
+    ts = pd.date_range("2021-01-01", periods=T, freq="D")
+    (root / "meta.json").write_text(json.dumps({
+        "timestamps": [str(t) for t in ts], "symbols": list(syms), "feature_names": cols,
+    }))
+    (root / "dataset_manifest.json").write_text(json.dumps({"parquet_map": {}}))
+    return X[:, -1], ts
+
+
+def test_windows_panel_current_bar_and_tensor_view(tmp_path):
+    cur, ts = _write_run(tmp_path, nan_at=7)
+    src = CachedPanelSource(tmp_path / "dataset_manifest.json", EnvConfig(episode=EpisodeConfig(lookback=4)))
+
+    keep = np.ones(len(ts), dtype=bool)
+    keep[7] = False  # a NaN for one symbol drops the bar for all of them
+    assert list(src.index) == list(ts[keep])
+    for si, sym in enumerate(src.symbols):
+        np.testing.assert_array_equal(src.panel[sym].to_numpy(), cur[keep, si, :])
+
+    view = src.slice_ndarray(3, 10)
+    assert view.shape == (7, 2, 5) and view.dtype == np.float32 and not view.flags.writeable
+    frames = src.slice(3, 10)
+    for si, sym in enumerate(src.symbols):
+        np.testing.assert_array_equal(view[:, si, :], frames[sym][src.cols_required()].to_numpy())
+
+
+def test_csv_panel_keeps_prices_float64(tmp_path):
+    T = 60
+    rng = np.random.default_rng(1)
+    parquet_map = {}
+    for sym in ("AAA", "BBB"):
+        px = 100 * np.exp(np.cumsum(rng.normal(0, 0.01, T)))
+        path = tmp_path / f"{sym}.csv"
+        pd.DataFrame({
+            "timestamp": pd.date_range("2021-01-01", periods=T, freq="D"),
+            "open": px, "high": px * 1.01, "low": px * 0.99, "close": px, "volume": 1e5,
+        }).to_csv(path, index=False)
+        parquet_map[sym] = str(path)
+    (tmp_path / "dataset_manifest.json").write_text(json.dumps({"parquet_map": parquet_map}))
+
+    cfg = EnvConfig(episode=EpisodeConfig(lookback=4), features=FeatureConfig(use_custom_pipeline=False, indicators=("logret", "rsi14")))
+    src = CachedPanelSource(tmp_path / "dataset_manifest.json", cfg)
+    for sym in src.symbols:
+        df = src.panel[sym]
+        assert all(df[c].dtype == np.float64 for c in ("open", "high", "low", "close", "volume"))
+        assert df["rsi14"].dtype == np.float32
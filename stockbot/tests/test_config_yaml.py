@@ -0,0 +1,62 @@
+import os
+import sys
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).resolve().parents[2]))
+
+from stockbot.env.config import EnvConfig, invalidate, load_yaml
+
+
+def test_load_yaml_cache_tracks_edits_and_isolates_callers(tmp_path):
+    invalidate()
+    p = tmp_path / "env.yaml"
+    p.write_text("symbols: [AAA, BBB]\nepisode:\n  lookback: 32\n")
+
+    first = load_yaml(p)
+    first["symbols"].append("ZZZ")  # caller mutation must not leak into the cache
+    assert load_yaml(p)["symbols"] == ["AAA", "BBB"]
+    assert EnvConfig.from_yaml(p).episode.lookback == 32
+
+    p.write_text("symbols: [CCC]\nepisode:\n  lookback: 16\n")
+    st = p.stat()
+    os.utime(p, ns=(st.st_atime_ns, st.st_mtime_ns + 1_000_000))
+    assert load_yaml(p)["symbols"] == ["CCC"]
+    assert EnvConfig.from_yaml(p).episode.lookback == 16
+
+
+def test_load_yaml_json_sidecar(tmp_path, monkeypatch):
+    cfg_dir, cache = tmp_path / "cfg", tmp_path / "cache"
+    cfg_dir.mkdir()
+    p = cfg_dir / "env.yaml"
+    p.write_text("symbols: [AAA]\nfees:\n  taker_fee_bps: 1.5\n")
+
+    # Off unless a cache dir is configured
+    monkeypatch.delenv("STOCKBOT_YAML_CACHE_DIR", raising=False)
+    invalidate()
+    load_yaml(p)
+    assert sorted(x.name for x in cfg_dir.iterdir()) == ["env.yaml"]
+    assert not cache.exists()
+
+    monkeypatch.setenv("STOCKBOT_YAML_CACHE_DIR", str(cache))
+    invalidate()
+    want = load_yaml(p)
+    sides = list(cache.glob("env.yaml.*.json"))
+    assert len(sides) == 1
+
+    invalidate()
+    assert load_yaml(p) == want  # served from the sidecar
+
+    keep = cache / "env.yaml.backup.json"
+    keep.write_text("{}")
+    p.write_text("symbols: [BBB]\n")
+    invalidate()
+    assert load_yaml(p) == {"symbols": ["BBB"]}
+    assert [s.name for s in cache.glob("env.yaml.*.json") if s != keep] != [sides[0].name]
+    assert not sides[0].exists()
+    assert keep.exists()  # only <name>.<hash>.json files are pruned
+
+    # YAML dates do not survive JSON, so such files never get a sidecar
+    d = cfg_dir / "dated.yaml"
+    d.write_text("start: 2018-01-01\n")
+    assert str(load_yaml(d)["start"]) == "2018-01-01"
+    assert not list(cache.glob("dated.yaml.*.json"))
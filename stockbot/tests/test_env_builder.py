@@ -0,0 +1,57 @@
+import sys
+from pathlib import Path
+
+import numpy as np
+
+sys.path.append(str(Path(__file__).resolve().parents[2]))
+
+from stockbot.env.env_builder import _hmm_cache_path, prepare_env
+from stockbot.signals.hmm_regime import GaussianDiagHMM, _diag_log_likelihood
+
+
+def _payload():
+    return {
+        "dataset": {"symbols": ["AAA", "BBB"], "interval": "1d", "start_date": "2020-01-01", "end_date": "2020-04-30", "lookback": 4},
+        "regime": {"enabled": True, "config": {"n_states": 2, "seed": 0, "max_iter": 5}},
+    }
+
+
+def test_prepare_env_reuses_cached_hmm(tmp_path, monkeypatch):
+    monkeypatch.delenv("STOCKBOT_HMM_NOCACHE", raising=False)
+    fits = []
+    real_fit = GaussianDiagHMM.fit
+    monkeypatch.setattr(GaussianDiagHMM, "fit", lambda self, X: fits.append(1) or real_fit(self, X))
+
+    _, first = prepare_env(_payload(), tmp_path / "run1")
+    _, second = prepare_env(_payload(), tmp_path / "run2")
+    assert len(fits) == 1 and len(list((tmp_path / ".hmm_cache").glob("*.npz"))) == 1
+    np.testing.assert_array_equal(second["regime_posteriors"], first["regime_posteriors"])
+    for name in ("regime_posteriors.csv", "transition_matrix.csv", "state_stats.json"):
+        assert (tmp_path / "run2" / name).read_text() == (tmp_path / "run1" / name).read_text()
+
+    # a different HMM config is a different fit
+    payload = _payload()
+    payload["regime"]["config"]["n_states"] = 3
+    prepare_env(payload, tmp_path / "run3")
+    assert len(fits) == 2
+
+
+def test_hmm_cache_key_covers_every_window_value(tmp_path, monkeypatch):
+    monkeypatch.delenv("STOCKBOT_HMM_NOCACHE", raising=False)
+    w = np.zeros((50, 4, 2, 3), dtype=np.float32)
+    edited = w.copy()
+    edited[17, 2, 1, 1] = 1.0
+    args = (tmp_path / "run", {"m": 1}, {"n_states": 2}, None, None)
+    assert _hmm_cache_path(*args, w) != _hmm_cache_path(*args, edited)
+    assert _hmm_cache_path(*args, w) == _hmm_cache_path(*args, w.copy())
+
+
+def test_diag_log_likelihood_matches_hmmlearn():
+    from hmmlearn.stats import log_multivariate_normal_density
+
+    rng = np.random.default_rng(0)
+    X = rng.normal(size=(50, 12))
+    means = rng.normal(size=(3, 12))
+    covars = rng.uniform(1e-5, 2.0, size=(3, 12))
+    want = log_multivariate_normal_density(X, means, covars, "diag")
+    np.testing.assert_allclose(_diag_log_likelihood(X, means, covars), want, rtol=1e-10)
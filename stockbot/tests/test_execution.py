@@ -0,0 +1,85 @@
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.append(str(Path(__file__).resolve().parents[2]))
+
+from stockbot.env.config import ExecConfig, FeeModel
+from stockbot.env import execution
+from stockbot.env.execution import ExecutionModel
+from stockbot.env.orders import Order
+
+
+def _order(i, sym, qty, typ="market", limit=None):
+    return Order(i, None, sym, "buy" if qty > 0 else "sell", qty, typ, limit)
+
+
+@pytest.mark.parametrize("vector_min", [0, 10**9], ids=["array", "loop"])
+def test_simulate_fills_clamps_rounds_and_prices(monkeypatch, vector_min):
+    monkeypatch.setattr(execution, "_VECTOR_MIN_ORDERS", vector_min)
+    em = ExecutionModel(
+        ExecConfig(participation_cap=0.1, lot_size=10, tick_size=0.05),
+        FeeModel(commission_per_share=0.01, commission_pct_notional=0.0, slippage_bps=100.0),
+    )
+    prices = {
+        "AAA": (100.0, 101.0, 99.0, 100.0),
+        "BBB": (50.0, 51.0, 49.0, 50.5),
+        "CCC": (20.0, 20.5, 19.5, 20.2),
+    }
+    volumes = {"AAA": 1_000.0, "BBB": 1e6, "CCC": 1e6}
+    orders = [
+        _order(1, "AAA", 250.0),                   # capped at 10% of volume -> 100
+        _order(2, "BBB", -37.0),                   # lot rounding -> -30
+        _order(3, "CCC", 5.0),                     # rounds to zero lots -> dropped
+        _order(4, "BBB", 40.0, "limit", 49.5),     # range crosses the limit -> fills at limit
+        _order(5, "CCC", -40.0, "limit", 19.0),    # opens above a sell limit -> fills at open
+        _order(6, "AAA", 40.0, "limit", 98.0),     # never trades down to the limit
+    ]
+    fills = em.simulate_fills(orders, prices, volumes)
+    got = {f.order_id: f for f in fills}
+    assert sorted(got) == [1, 2, 4, 5]
+
+    # market: slip = spread_bps * participation (no vol history yet)
+    assert got[1].qty == 100.0
+    assert got[1].price == pytest.approx(100.1)  # 100 * (1 + 100bps * 0.1)
+    assert got[1].commission == pytest.approx(1.0)
+    assert got[2].qty == -30.0
+    assert got[2].price == pytest.approx(50.5)  # tiny slip rounds away on the 0.05 tick
+    assert (got[4].qty, got[4].price) == (40.0, pytest.approx(49.5))
+    assert (got[5].qty, got[5].price) == (-40.0, pytest.approx(20.0))
+
+
+def test_rolling_volatility_matches_pstdev():
+    import math
+    import statistics
+
+    em = ExecutionModel(ExecConfig(vol_lookback=5), FeeModel())
+    closes = [100.0, 101.0, 99.5, 102.0, 101.2, 98.7, 99.9, 103.4]
+    for c in closes:
+        em.simulate_fills([], {"AAA": (c, c, c, c)}, {"AAA": 1.0})
+    tail = closes[-5:]
+    rets = [math.log(b / a) for a, b in zip(tail, tail[1:])]
+    assert em._volatility_bps("AAA") == pytest.approx(statistics.pstdev(rets) * 1e4, rel=1e-9)
+    assert em._volatility_bps("BBB") == 0.0
+
+
+def test_simulate_fills_ohlcv_matches_dict_form():
+    import numpy as np
+
+    cfg = ExecConfig(participation_cap=0.1, lot_size=10, tick_size=0.05)
+    fees = FeeModel(commission_per_share=0.01, slippage_bps=100.0)
+    syms = ["AAA", "BBB", "CCC"]
+    bars = [
+        np.array([[100.0, 101.0, 99.0, 100.0, 1e3], [50.0, 51.0, 49.0, 50.5, 1e6], [20.0, 20.5, 19.5, 20.2, 1e6]]),
+        np.array([[100.5, 102.0, 99.5, 101.7, 1e3], [50.4, 50.9, 48.1, 48.3, 1e6], [20.2, 20.3, 19.0, 19.2, 1e6]]),
+    ]
+    orders = [_order(1, "AAA", 250.0), _order(2, "BBB", -37.0), _order(3, "CCC", -40.0, "limit", 19.0)]
+    by_dict, by_array = ExecutionModel(cfg, fees), ExecutionModel(cfg, fees)
+    sym_to_idx = {s: i for i, s in enumerate(syms)}
+    for bar in bars:
+        prices = {s: tuple(bar[i, :4]) for i, s in enumerate(syms)}
+        volumes = {s: bar[i, 4] for i, s in enumerate(syms)}
+        want = by_dict.simulate_fills(orders, prices, volumes)
+        got = by_array.simulate_fills_ohlcv(orders, bar, sym_to_idx)
+        assert [vars(f) for f in got] == [vars(f) for f in want]
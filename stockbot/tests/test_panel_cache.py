@@ -0,0 +1,114 @@
+import sys
+from datetime import date, datetime, timedelta
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pytest
+
+sys.path.append(str(Path(__file__).resolve().parents[2]))
+
+from stockbot.env import data_adapter as da
+from stockbot.env.config import EnvConfig, EpisodeConfig, FeatureConfig
+from stockbot.ingestion.ingestion_base import PriceBar
+
+
+class _Prov:
+    def __init__(self, source="a"):
+        self.calls = 0
+        self.source = source
+
+    def cache_identity(self):
+        return ("fake", self.source)
+
+    def get_price_bars(self, sym, interval, start, end, asset_type=None, adjusted=True, limit=None):
+        self.calls += 1
+        rng = np.random.default_rng(sum(map(ord, sym)))
+        px = 100 * np.exp(np.cumsum(rng.normal(0, 0.01, 120)))
+        t0 = datetime(2020, 1, 1)
+        return [
+            PriceBar(sym, t0 + timedelta(days=i), p, p * 1.01, p * 0.99, p, 1e5, interval, "fake")
+            for i, p in enumerate(px)
+        ]
+
+
+def _cfg(end="2020-05-01", dtype="float32", **kw):
+    return EnvConfig(
+        symbols=("AAA", "BBB"), start="2020-01-01", end=end,
+        episode=EpisodeConfig(lookback=8),
+        features=FeatureConfig(use_custom_pipeline=False, indicators=("logret", "rsi14"), dtype=dtype),
+        **kw,
+    )
+
+
+def test_panel_cache_reuses_features(tmp_path, monkeypatch):
+    monkeypatch.setattr(da, "_PANEL_CACHE_DIR", tmp_path)
+    prov = _Prov()
+
+    # off unless opted in
+    monkeypatch.delenv("STOCKBOT_PANEL_CACHE", raising=False)
+    da.PanelSource(prov, _cfg())
+    assert prov.calls == 2 and not list(tmp_path.glob("*.pkl"))
+
+    monkeypatch.setenv("STOCKBOT_PANEL_CACHE", "1")
+    first = da.PanelSource(prov, _cfg())
+    assert prov.calls == 4 and len(list(tmp_path.glob("*.pkl"))) == 1
+    second = da.PanelSource(prov, _cfg())
+    assert prov.calls == 4  # served from cache
+    assert second.index.equals(first.index) and list(second.cols_required()) == list(first.cols_required())
+    for sym in first.symbols:
+        pd.testing.assert_frame_equal(second.panel[sym], first.panel[sym])
+
+    # a different query or provider config is a different entry
+    da.PanelSource(prov, _cfg(adjusted=False))
+    assert prov.calls == 6
+    other = _Prov(source="b")
+    da.PanelSource(other, _cfg())
+    assert other.calls == 2
+
+    # ranges reaching today may still grow, so they are never cached
+    n = len(list(tmp_path.glob("*.pkl")))
+    da.PanelSource(prov, _cfg(end=date.today().isoformat()))
+    assert len(list(tmp_path.glob("*.pkl"))) == n
+
+
+@pytest.mark.parametrize("dtype", ["float32", "float64"])
+def test_panel_tensor_matches_frames(tmp_path, monkeypatch, dtype):
+    monkeypatch.setattr(da, "_PANEL_CACHE_DIR", tmp_path)
+    src = da.PanelSource(_Prov(), _cfg(dtype=dtype))
+    cols = list(src.cols_required())
+    win = src.slice_ndarray(10, 18)
+    assert win.shape == (8, 2, len(cols)) and win.dtype == np.dtype(dtype) and not win.flags.writeable
+    for j, sym in enumerate(src.symbols):
+        want = src.slice(10, 18)[sym][cols].to_numpy().astype(dtype)
+        np.testing.assert_array_equal(win[:, j, :], want)
+
+
+def test_build_features_memoized_per_content(monkeypatch):
+    monkeypatch.setattr(da, "_FEATURE_CACHE", da.OrderedDict())
+    calls = []
+    real = da._compute_features
+    monkeypatch.setattr(da, "_compute_features", lambda df, fc: calls.append(1) or real(df, fc))
+    feat = FeatureConfig(use_custom_pipeline=False, indicators=("logret", "rsi14"))
+    bars = da._bars_frame(_Prov().get_price_bars("AAA", None, None, None))
+
+    # off unless opted in
+    monkeypatch.delenv("STOCKBOT_FEATURE_CACHE", raising=False)
+    da._build_features(bars, feat)
+    da._build_features(bars, feat)
+    assert len(calls) == 2 and not da._FEATURE_CACHE
+
+    monkeypatch.setenv("STOCKBOT_FEATURE_CACHE", "1")
+    first = da._build_features(bars, feat)
+    first["rsi14"] = -1.0  # results are copies; mutating one must not leak
+    second = da._build_features(bars.copy(), feat)
+    assert len(calls) == 3 and (second["rsi14"] != -1.0).all()
+
+    bars.iloc[-1, bars.columns.get_loc("close")] *= 1.01
+    da._build_features(bars, feat)
+    assert len(calls) == 4
+
+    # the byte budget evicts the oldest entries
+    monkeypatch.setattr(da, "_FEATURE_CACHE_MAX_BYTES", int(second.memory_usage(index=True).sum()))
+    da._build_features(bars.iloc[:-1], feat)
+    assert len(da._FEATURE_CACHE) == 1
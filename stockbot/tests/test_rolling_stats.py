@@ -0,0 +1,54 @@
+import sys
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pytest
+
+sys.path.append(str(Path(__file__).resolve().parents[2]))
+
+from stockbot.backtest.run import _rolling_metrics
+from stockbot.telemetry.rolling import RollingReturnStats
+
+
+def _reference(vals, window=60):
+    arr = np.asarray(vals[-window:], dtype=float)
+    mean = float(arr.mean())
+    downside = float(arr[arr < 0].std()) if arr.size > 1 and (arr < 0).any() else 0.0
+    return {
+        "sharpe": float(mean / (arr.std() + 1e-12) * 252 ** 0.5) if arr.size > 1 else 0.0,
+        "sortino": float(mean / (downside + 1e-12) * 252 ** 0.5) if downside > 0 else 0.0,
+        "vol_realized": float(arr.std() * 252 ** 0.5) if arr.size > 1 else 0.0,
+        "hit_rate": float((arr > 0).mean()),
+    }
+
+
+def test_rolling_stats_match_array_recompute():
+    rng = np.random.default_rng(0)
+    rets = rng.normal(0.0, 0.01, 400)
+    rets[rng.random(400) < 0.2] = 0.0
+    rets[250:] = 0.0  # strategy goes flat: spread collapses inside the window
+    rets[300] = -0.02
+
+    stats = RollingReturnStats(window=60)
+    seen = []
+    for r in rets:
+        stats.push(r)
+        seen.append(float(r))
+        got, want = stats.snapshot(), _reference(seen)
+        for k in want:
+            assert got[k] == pytest.approx(want[k], rel=1e-9, abs=1e-12), (len(seen), k)
+
+
+def test_rolling_metrics_match_pandas():
+    rng = np.random.default_rng(1)
+    eq = 100 * np.exp(np.cumsum(rng.normal(0.0, 0.01, 400)))
+    eqdf = pd.DataFrame({"ts": pd.date_range("2020-01-01", periods=eq.size), "equity": eq})
+    rets = eqdf["equity"].pct_change().fillna(0.0)
+    want = pd.DataFrame({
+        "ts": eqdf["ts"],
+        "roll_sharpe_63": rets.rolling(63).mean() / (rets.rolling(63).std() + 1e-12) * np.sqrt(252),
+        "roll_vol_63": rets.rolling(63).std() * np.sqrt(252),
+        "roll_maxdd_252": 1.0 - eqdf["equity"] / (eqdf["equity"].rolling(252, min_periods=1).max() + 1e-9),
+    })
+    pd.testing.assert_frame_equal(_rolling_metrics(eqdf), want, rtol=1e-9)
@@ -0,0 +1,57 @@
+import json
+import sys
+from pathlib import Path
+
+import numpy as np
+
+sys.path.append(str(Path(__file__).resolve().parents[2]))
+
+from stockbot.telemetry.writer import TelemetryLevel, TelemetryWriter
+
+
+def test_level_off_skips_supplier(tmp_path, monkeypatch):
+    path = tmp_path / "telemetry.jsonl"
+    monkeypatch.setenv("STOCKBOT_TELEMETRY_PATH", str(path))
+    monkeypatch.setenv("STOCKBOT_TELEMETRY_LEVEL", "off")
+    tw = TelemetryWriter()
+    assert tw.level is TelemetryLevel.OFF
+    assert not tw.should_emit("bar")
+
+    calls = []
+    tw.emit_bar_supplier(lambda: calls.append(1) or {"bar_idx": 0})
+    tw.emit_bar({"bar_idx": 1})
+    tw.flush()
+    assert calls == []
+    assert path.read_text() == ""
+
+
+def test_supplier_builds_only_when_recorded(tmp_path, monkeypatch):
+    path = tmp_path / "telemetry.jsonl"
+    monkeypatch.setenv("STOCKBOT_TELEMETRY_PATH", str(path))
+    monkeypatch.delenv("STOCKBOT_TELEMETRY_LEVEL", raising=False)
+    monkeypatch.delenv("STOCKBOT_EVENT_PATH", raising=False)
+    tw = TelemetryWriter()
+    assert tw.should_emit("bar")
+    assert not tw.should_emit("event")
+    assert not tw.should_emit("bar", TelemetryLevel.VERBOSE)
+
+    tw.emit_bar_supplier(lambda: {"bar_idx": 0})
+    tw.emit_bar_supplier(lambda: 1 / 0)  # supplier errors never propagate
+    tw.flush()
+    rows = [json.loads(line) for line in path.read_text().splitlines()]
+    assert [r["bar_idx"] for r in rows] == [0]
+    assert rows[0]["kind"] == "bar"
+
+
+def test_background_writes_keep_emit_order(tmp_path, monkeypatch):
+    path = tmp_path / "telemetry.jsonl"
+    monkeypatch.setenv("STOCKBOT_TELEMETRY_PATH", str(path))
+    monkeypatch.delenv("STOCKBOT_TELEMETRY_LEVEL", raising=False)
+    monkeypatch.delenv("STOCKBOT_TELEMETRY_SYNC", raising=False)
+    tw = TelemetryWriter()
+    for i in range(1000):
+        tw.emit_bar({"bar_idx": i, "gamma": np.array([0.25, 0.75])})
+    tw.close()
+    rows = [json.loads(line) for line in path.read_text().splitlines()]
+    assert [r["bar_idx"] for r in rows] == list(range(1000))
+    assert rows[0]["gamma"] == [0.25, 0.75]
@@ -0,0 +1,32 @@
+import sys
+from pathlib import Path
+
+import pandas as pd
+import pytest
+
+sys.path.append(str(Path(__file__).resolve().parents[2]))
+
+from stockbot.backtest.trades import TRADE_COLUMNS, build_trades_fifo
+
+
+def test_fifo_partial_close_and_flip():
+    fills = pd.DataFrame({
+        "ts": pd.to_datetime(["2024-01-01", "2024-01-02", "2024-01-05", "2024-01-03", "2024-01-08"]),
+        "symbol": ["AAA", "AAA", "AAA", "BBB", "BBB"],
+        "qty": [10.0, 5.0, -20.0, -4.0, 4.0],
+        "price": [100.0, 110.0, 120.0, 50.0, 45.0],
+        "commission": [1.0, 1.0, 2.0, 0.5, 0.5],
+    })
+    trades = build_trades_fifo(fills)
+    assert list(trades.columns) == TRADE_COLUMNS
+
+    aaa = trades[trades["symbol"] == "AAA"].reset_index(drop=True)
+    # the sell closes both long lots oldest-first; the 5 left over opens a short
+    assert aaa["qty"].tolist() == [10.0, 5.0]
+    assert aaa["gross_pnl"].tolist() == pytest.approx([200.0, 50.0])
+    assert aaa["holding_days"].tolist() == [4.0, 3.0]
+    assert aaa["net_pnl"].tolist() == pytest.approx([200.0 - 1.0 - 2.0, 50.0 - 1.0 - 2.0])
+
+    bbb = trades[trades["symbol"] == "BBB"].iloc[0]
+    assert bbb["side"] == "short"
+    assert bbb["gross_pnl"] == pytest.approx(20.0)